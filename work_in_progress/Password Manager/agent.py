@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""agent.py - Unlock agent holding an opened vault for the CLI clients.
+
+Agent is started once with the passphrase, opens the vault and then serves
+requests of the command line clients over a local Unix domain socket, so the
+clients skip key derivation and opening of the vault. Agent exits when the
+vault is locked by a client or when no request arrives within the idle
+timeout. Key material is wiped on exit.
+
+Socket is created in a directory accessible only to the owner, with the file
+mode 0600, and on Linux peer credentials of every connection are checked, so
+only processes of the same user can talk to the agent. Agent serves only the
+vault it was started for; requests for other vault files are refused, so the
+client falls back to opening the vault itself.
+
+Messages are JSON objects prefixed by their length (uint32, big endian). A
+request holds the operation name, the vault path and operation arguments. A
+response holds either 'result' or 'error', and 'kind' of the error.
+
+Example:
+    >>> server = AgentServer(socket_path(), 'vault.bkp', material, 900)
+    >>> server.serve()
+
+    >>> vault = AgentVault.connect(socket_path(), 'vault.bkp')
+    >>> vault.get('GitHub')
+    {'title': 'GitHub', ...}
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * agent.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from __future__ import annotations
+import json
+import os
+import socket
+import struct
+import tempfile
+import key_cache as kc
+import trigram_index as ti
+import vault as vt
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+SOCKET_ENV = 'PM_AGENT_SOCK'
+SOCKET_NAME = 'agent.sock'
+DEFAULT_TIMEOUT = 900
+
+# Clients are served one at a time, so a client that stalls mid request is
+# dropped after this many seconds instead of blocking the others.
+CONNECTION_TIMEOUT = 5
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+# Operations served by the agent. Client supplied arguments of each of the
+# operations.
+OPERATIONS = {
+    'ping': (),
+    'get': ('title', ),
+    'entries': (),
+    'search': ('field', 'query', 'prefix'),
+    'fuzzy': ('query', 'limit'),
+    'add': ('entry', ),
+    'update': ('entry', ),
+    'delete': ('title', ),
+    'lock': (),
+    }
+
+_LENGTH = struct.Struct('>I')
+_PEER_CREDENTIALS = struct.Struct('3i')
+
+
+# ==============================================================================
+# Messaging Section
+# ==============================================================================
+
+def socket_path() -> str:
+    """Returns path of the agent socket. Path is taken from the PM_AGENT_SOCK
+    environment variable if set, otherwise socket is placed in the per user
+    runtime directory.
+
+    Returns:
+        str: path of the agent socket.
+    """
+
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+
+    runtime = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+
+    return os.path.join(
+        runtime,
+        'password_manager-{0}'.format(os.getuid()),
+        SOCKET_NAME
+        )
+
+def _receive_exactly(connection: socket.socket, size: int) -> bytes:
+    """Returns exactly size bytes read from the connection. Raises
+    ConnectionError if connection is closed before.
+    """
+
+    data = bytearray()
+
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('Agent connection closed')
+        data += chunk
+
+    return bytes(data)
+
+def send_message(connection: socket.socket, message: dict):
+    """Send length prefixed JSON message over the connection.
+
+    Args:
+        connection (socket): connected socket.
+        message (dict): message to be sent.
+    """
+
+    data = json.dumps(message).encode('utf-8')
+    connection.sendall(_LENGTH.pack(len(data)) + data)
+
+def receive_message(connection: socket.socket) -> dict:
+    """Returns length prefixed JSON message read from the connection. Raises
+    ValueError on malformed message.
+
+    Args:
+        connection (socket): connected socket.
+
+    Returns:
+        dict: received message.
+    """
+
+    length = _LENGTH.unpack(_receive_exactly(connection, _LENGTH.size))[0]
+
+    if length > MAX_MESSAGE_SIZE:
+        raise ValueError('Agent message is too large')
+
+    message = json.loads(_receive_exactly(connection, length))
+
+    if not isinstance(message, dict):
+        raise ValueError('Agent message is not an object')
+
+    return message
+
+
+# ==============================================================================
+# Client Section
+# ==============================================================================
+
+def agent_request(path: str, op: str, vault_path: str, **args):
+    """Send request to the agent and return result of the operation.
+
+    Raises OSError if agent is not running or does not serve given vault, in
+    which case client should open the vault itself. Errors of the operation
+    itself are raised as KeyError or ValueError, the same way Vault raises
+    them, or as OSError holding the agent's error message if the agent failed
+    to read or save the vault file.
+
+    Args:
+        path (str): path of the agent socket.
+        op (str): operation name.
+        vault_path (str): path of the vault file.
+        **args: operation arguments.
+
+    Returns:
+        result of the operation.
+    """
+
+    if op not in OPERATIONS:
+        raise ValueError('Unknown agent operation "{0}"'.format(op))
+
+    request = {'op': op, 'vault': os.path.realpath(vault_path)}
+    request.update(args)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        send_message(connection, request)
+        response = receive_message(connection)
+
+    if 'error' not in response:
+        return response.get('result')
+
+    kind = response.get('kind')
+
+    if kind == 'KeyError':
+        raise KeyError(response['error'])
+
+    if kind == 'ValueError':
+        raise ValueError(response['error'])
+
+    if kind == 'OSError':
+        raise OSError(response['error'])
+
+    raise ConnectionRefusedError(response['error'])
+
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+
+class AgentServer():
+    """Unlock agent serving requests for a single vault.
+
+    Vault is opened and socket is bound by the constructor, so clients can
+    connect as soon as the object exists, even if 'serve()' is called later
+    (e.g. after forking). Vault is reopened if its file was changed by another
+    process. When serving ends, vault is closed, key material wiped and socket
+    removed.
+    """
+
+    def __init__(
+            self: AgentServer,
+            path: str,
+            vault_path: str,
+            material: kc.KeyMaterial,
+            timeout: float
+            ):
+        self._path = path
+        self._vault_path = os.path.realpath(vault_path)
+        self._material = material
+        self._vault = vt.Vault.open(self._vault_path, material)
+        self._timeout = timeout
+        self._running = False
+
+        try:
+            self._socket = self._bind()
+        except BaseException:
+            self._vault.close()
+            raise
+
+        self._stat = self._file_stat()
+
+    def _bind(self: AgentServer) -> socket.socket:
+        """Returns listening socket bound to the agent socket path. Socket
+        directory is created if it does not exist.
+        """
+
+        path = self._path
+        directory = os.path.dirname(path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+        if os.stat(directory).st_uid != os.getuid():
+            raise PermissionError(
+                'Agent socket directory "{0}" is not owned by the user'
+                .format(directory)
+                )
+
+        os.chmod(directory, 0o700)
+        self._remove_stale_socket()
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_mask = os.umask(0o177)
+
+        try:
+            listener.bind(path)
+            listener.listen()
+
+        except OSError:
+            listener.close()
+            raise
+
+        finally:
+            os.umask(old_mask)
+
+        return listener
+
+    def _remove_stale_socket(self: AgentServer):
+        """Remove socket left behind by an agent that is no longer running.
+        Raises FileExistsError if another agent is listening on the socket.
+        """
+
+        if not os.path.exists(self._path):
+            return
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self._path)
+            except OSError:
+                os.unlink(self._path)
+                return
+
+        raise FileExistsError(
+            'Agent is already running on "{0}"'.format(self._path)
+            )
+
+    def _file_stat(self: AgentServer) -> tuple:
+        """Returns identity of the current state of the vault file.
+        """
+
+        info = os.stat(self._vault_path)
+
+        return (info.st_ino, info.st_size, info.st_mtime_ns)
+
+    def _refresh(self: AgentServer):
+        """Reopen the vault if the file was changed by another process.
+        """
+
+        if self._file_stat() != self._stat:
+            self._vault.close()
+            self._vault = vt.Vault.open(self._vault_path, self._material)
+            self._stat = self._file_stat()
+
+    def _peer_allowed(self: AgentServer, connection: socket.socket) -> bool:
+        """Returns whether or not connected peer runs as the same user. Peer
+        credentials are checked only where the platform provides them.
+        """
+
+        if not hasattr(socket, 'SO_PEERCRED'):
+            return True
+
+        credentials = connection.getsockopt(
+            socket.SOL_SOCKET,
+            socket.SO_PEERCRED,
+            _PEER_CREDENTIALS.size
+            )
+        _, uid, _ = _PEER_CREDENTIALS.unpack(credentials)
+
+        return uid == os.getuid()
+
+    def _save(self: AgentServer):
+        """Save staged change and remember the new state of the file. If
+        saving fails, staged change is discarded.
+        """
+
+        try:
+            self._vault.save()
+
+        finally:
+            if self._vault.modified:
+                self._vault.close()
+                self._vault = vt.Vault.open(self._vault_path, self._material)
+
+        self._stat = self._file_stat()
+
+    def handle(self: AgentServer, request: dict):
+        """Execute single request and return its result. Raises KeyError or
+        ValueError if the operation fails and ConnectionRefusedError if the
+        request is for another vault.
+
+        Args:
+            request (dict): decoded client request.
+
+        Returns:
+            result of the operation.
+        """
+
+        op = request.get('op')
+
+        if op not in OPERATIONS:
+            raise ValueError('Unknown agent operation "{0}"'.format(op))
+
+        if request.get('vault') != self._vault_path:
+            raise ConnectionRefusedError('Vault is not unlocked by the agent')
+
+        args = {name: request.get(name) for name in OPERATIONS[op]}
+
+        if op == 'ping':
+            return True
+
+        if op == 'lock':
+            self._running = False
+            return None
+
+        self._refresh()
+
+        if op == 'get':
+            return self._vault.get(args['title'])
+
+        if op == 'entries':
+            return list(self._vault.entries())
+
+        if op == 'search':
+            return list(self._vault.search(
+                args['field'],
+                args['query'],
+                bool(args['prefix'])
+                ))
+
+        if op == 'fuzzy':
+            return self._vault.fuzzy_search(args['query'], args['limit'])
+
+        if op == 'add':
+            self._vault.add(args['entry'])
+        elif op == 'update':
+            self._vault.update(args['entry'])
+        else:
+            self._vault.delete(args['title'])
+
+        self._save()
+
+        return None
+
+    def _serve_connection(self: AgentServer, connection: socket.socket):
+        """Read single request from the connection and send the response.
+        """
+
+        if not self._peer_allowed(connection):
+            return
+
+        try:
+            request = receive_message(connection)
+            response = {'result': self.handle(request)}
+
+        except (KeyError, ValueError, TypeError) as error:
+            response = {
+                'error': error.args[0] if error.args else str(error),
+                'kind': 'KeyError' if isinstance(error, KeyError)
+                    else 'ValueError',
+                }
+
+        except ConnectionRefusedError as error:
+            response = {'error': str(error), 'kind': 'refused'}
+
+        # Failure to read or save the vault file is reported to the client,
+        # instead of dropping the connection.
+        except OSError as error:
+            response = {'error': str(error), 'kind': 'OSError'}
+
+        send_message(connection, response)
+
+    def serve(self: AgentServer):
+        """Serve requests until the vault is locked or the idle timeout
+        expires. Vault is closed and socket removed on return.
+        """
+
+        self._running = True
+        self._socket.settimeout(self._timeout)
+
+        try:
+            while self._running:
+                try:
+                    connection, _ = self._socket.accept()
+                except socket.timeout:
+                    break
+
+                with connection:
+                    connection.settimeout(CONNECTION_TIMEOUT)
+                    try:
+                        self._serve_connection(connection)
+                    except OSError:
+                        pass
+
+        finally:
+            self.close()
+
+    def close(self: AgentServer):
+        """Close the vault, wipe key material and remove the socket.
+        """
+
+        self._running = False
+        self._vault.close()
+        self._material.wipe()
+        self._socket.close()
+
+        try:
+            os.unlink(self._path)
+        except FileNotFoundError:
+            pass
+
+
+class AgentVault():
+    """Client side stand-in for the Vault served by the unlock agent.
+
+    It offers the part of the Vault interface used by the program actions.
+    Changes are saved by the agent as soon as they are made, so 'save()' and
+    'close()' have no effect. Use class method 'connect()' to obtain
+    AgentVault object.
+    """
+
+    def __init__(self: AgentVault, path: str, vault_path: str):
+        self._path = path
+        self._vault_path = vault_path
+
+    def __enter__(self: AgentVault) -> AgentVault:
+        return self
+
+    def __exit__(self: AgentVault, exc_type, exc_value, traceback):
+        self.close()
+
+    @classmethod
+    def connect(cls, path: str, vault_path: str):
+        """Returns AgentVault for given vault file if the agent listening on
+        the socket serves it, otherwise None.
+        """
+
+        vault = cls(path, vault_path)
+
+        try:
+            vault._request('ping')
+
+        except OSError:
+            return None
+
+        return vault
+
+    def _request(self: AgentVault, op: str, **args):
+        return agent_request(self._path, op, self._vault_path, **args)
+
+    @property
+    def path(self: AgentVault) -> str:
+        """Return path of the vault file.
+        """
+
+        return self._vault_path
+
+    def get(self: AgentVault, title: str) -> dict:
+        """Return entry with given title. Raises KeyError if there is no such
+        entry.
+        """
+
+        return self._request('get', title=title)
+
+    def entries(self: AgentVault) -> list:
+        """Returns list of all entries stored in the vault.
+        """
+
+        return self._request('entries')
+
+    def search(
+            self: AgentVault,
+            field: str,
+            query: str,
+            prefix: bool = False
+            ) -> list:
+        """Returns list of entries whose field matches the query.
+        """
+
+        return self._request('search', field=field, query=query, prefix=prefix)
+
+    def fuzzy_search(
+            self: AgentVault,
+            query: str,
+            limit: int = ti.DEFAULT_LIMIT
+            ) -> list:
+        """Returns (title, score) tuples of entries whose title or URL
+        resembles the query, best matches first. Agent keeps the trigram index
+        between requests.
+        """
+
+        return [
+            tuple(match)
+            for match in self._request('fuzzy', query=query, limit=limit)
+            ]
+
+    def add(self: AgentVault, entry: dict):
+        """Add new entry to the vault.
+        """
+
+        self._request('add', entry=entry)
+
+    def update(self: AgentVault, entry: dict):
+        """Replace existing entry with the same title.
+        """
+
+        self._request('update', entry=entry)
+
+    def delete(self: AgentVault, title: str):
+        """Remove entry with given title.
+        """
+
+        self._request('delete', title=title)
+
+    def lock(self: AgentVault):
+        """Stop the agent, wiping its key material.
+        """
+
+        self._request('lock')
+
+    def save(self: AgentVault):
+        """Changes are saved by the agent, so it does nothing.
+        """
+
+    def close(self: AgentVault):
+        """Agent keeps the vault open, so it does nothing.
+        """
@@ -53,9 +53,22 @@
 # Modules import section
 # ==============================================================================
 
+from __future__ import annotations
 import argparse
-import actions as ac
+import agent as ag
+import blind_index as bi
+import breach_check as bc
+import csv_import as ci
+import diceware as dw
+import kdf
+import os
+import password_generator as pg
+import program_actions as ac
+import trigram_index as ti
 import validators as vd
+import vault as vt
+import vault_ciphers as vcp
+import vault_codecs as vc
 
 
 # ==============================================================================
@@ -296,6 +309,33 @@ class MainApp():
     AppDoc object passed as argument it raises TypeError.
     """
 
+    # Program action to be executed for each of the subcommands. None stands
+    # for no subcommand given.
+    _command_actions = {
+        None: ac.MainAction,
+        'create': ac.CreateDatabaseAction,
+        'get': ac.GetEntryAction,
+        'list': ac.ListEntriesAction,
+        'search': ac.SearchEntriesAction,
+        'audit-breached': ac.AuditBreachedAction,
+        'audit-reuse': ac.AuditReuseAction,
+        'add': ac.AddEntryAction,
+        'update': ac.UpdateEntryAction,
+        'delete': ac.DeleteEntryAction,
+        'compact': ac.CompactDatabaseAction,
+        'import': ac.ImportEntriesAction,
+        'agent': ac.StartAgentAction,
+        'lock': ac.LockAgentAction,
+        'rekey': ac.RekeyDatabaseAction,
+        'sync': ac.SyncDatabaseAction,
+        'passwd': ac.ChangePassphraseAction,
+        'member-add': ac.AddMemberAction,
+        'member-remove': ac.RemoveMemberAction,
+        'generate': ac.GeneratePasswordsAction,
+        'passphrase': ac.GeneratePassphrasesAction,
+        'calibrate': ac.CalibrateAction,
+        }
+
     def __init__(self: MainApp, doc: AppDoc):
 
         if not isinstance(doc, AppDoc):
@@ -319,6 +359,11 @@ class MainApp():
         # this list for that purpose.
         self._arg_groups = []
 
+        # Subcommand parsers are created on demand and are stored by the
+        # command name.
+        self._subparsers = None
+        self._commands = dict()
+
         self._action = None
 
     @property
@@ -364,15 +409,51 @@ class MainApp():
 
         return group
 
+    def addCommand(self, name, help=None):
+        """Adds a subcommand to application object. Arguments specific to
+        the subcommand are added by passing command name as 'command'
+        parameter to addArgument method.
+        """
+
+        if self._subparsers is None:
+            self._subparsers = self._parser.add_subparsers(
+                title='commands',
+                dest='command',
+                metavar='COMMAND'
+                )
+
+        if name in self._commands:
+            raise ValueError(
+                'Command \'{0}\' already exists'.format(name)
+                )
+
+        self._commands[name] = self._subparsers.add_parser(
+            name,
+            help=help,
+            description=help
+            )
+
     def addArgument(self, *args, **kwargs):
         """Wrapper for add_argument methods of the argparse module. If
         parameter group is supplied with valid group name, argument will
-        be added to that group. If group parameter is omitted argument
-        will be added to parser object. In a case of invalid group name
-        it rise ValueError exception.
+        be added to that group. If parameter command is supplied with valid
+        command name, argument will be added to that command's parser. If
+        both parameters are omitted argument will be added to parser object.
+        In a case of invalid group or command name it rise ValueError
+        exception.
         """
 
-        if 'group' not in kwargs or kwargs['group'] is None:
+        command = kwargs.pop('command', None)
+
+        if command is not None:
+            if command not in self._commands:
+                raise ValueError(
+                    'Trying to reference nonexisten command'
+                    )
+
+            self._commands[command].add_argument(*args, **kwargs)
+
+        elif 'group' not in kwargs or kwargs['group'] is None:
             self._parser.add_argument(*args, **kwargs)
 
         else:
@@ -408,15 +489,20 @@ class MainApp():
             self._action.addVersionString(self._doc.version)
 
         else:
-            self._action = ac.MainAction(self._parser.exit)
+            command = getattr(arguments, 'command', None)
+            self._action = MainApp._command_actions[command](
+                self._parser.exit
+                )
             self._action.addAppName(self._doc.appname)
+            uses_database = MainApp._command_actions[command].uses_database
 
             db_file = vd.ProgramOption(
                 vd.UserInput(arguments.ps_db_file),
                 vd.ValidateFileInput(
-                    accept_none=False,
-                    existent=True,
+                    accept_none=not uses_database,
+                    existent=command != 'create',
                     file_type='bkp',
+                    signature=None if command == 'create' else vt.SIGNATURE
                     )
                 )
             self._action.addUserOption(
@@ -426,13 +512,282 @@ class MainApp():
 
             passphrase = vd.ProgramOption(
                 vd.UserInput(arguments.passphrase),
-                vd.ValidateStringInput()
+                vd.ValidateStringInput(
+                    accept_none=not uses_database
+                        or MainApp._command_actions[command].uses_agent
+                    )
                 )
             self._action.addUserOption(
                 'passphrase',
                 passphrase
                 )
 
+            if hasattr(arguments, 'title'):
+                title = vd.ProgramOption(
+                    vd.UserInput(arguments.title),
+                    vd.ValidateStringInput(accept_empty=False)
+                    )
+                self._action.addUserOption('title', title)
+
+            if hasattr(arguments, 'query'):
+                query = vd.ProgramOption(
+                    vd.UserInput(arguments.query),
+                    vd.ValidateStringInput(accept_empty=False)
+                    )
+                self._action.addUserOption('query', query)
+
+                field = vd.ProgramOption(
+                    vd.UserInput(arguments.field),
+                    vd.ValidateUserChoice(bi.SEARCH_FIELDS, False)
+                    )
+                self._action.addUserOption('field', field)
+
+                prefix = vd.ProgramOption(
+                    vd.UserInput(arguments.prefix),
+                    vd.ValidateUserChoice((True, False), False)
+                    )
+                self._action.addUserOption('prefix', prefix)
+
+                fuzzy = vd.ProgramOption(
+                    vd.UserInput(arguments.fuzzy),
+                    vd.ValidateUserChoice((True, False), False)
+                    )
+                self._action.addUserOption('fuzzy', fuzzy)
+
+                limit = vd.ProgramOption(
+                    vd.UserInput(arguments.limit),
+                    vd.ValidateNumericalInput(
+                        min_val=1,
+                        max_val=ti.MAX_LIMIT,
+                        incl_min=True,
+                        incl_max=True
+                        )
+                    )
+                self._action.addUserOption('limit', limit)
+
+            if hasattr(arguments, 'csv_file'):
+                csv_file = vd.ProgramOption(
+                    vd.UserInput(arguments.csv_file),
+                    vd.ValidateFileInput(
+                        accept_none=False,
+                        existent=True,
+                        file_type='csv',
+                        )
+                    )
+                self._action.addUserOption('csv_file', csv_file)
+
+            if hasattr(arguments, 'workers'):
+                workers = vd.ProgramOption(
+                    vd.UserInput(arguments.workers),
+                    vd.ValidateNumericalInput(
+                        min_val=1,
+                        max_val=ci.MAX_WORKERS,
+                        incl_min=True,
+                        incl_max=True
+                        )
+                    )
+                self._action.addUserOption('workers', workers)
+
+            if hasattr(arguments, 'new_passphrase'):
+                new_passphrase = vd.ProgramOption(
+                    vd.UserInput(arguments.new_passphrase),
+                    vd.ValidateStringInput(
+                        accept_none=command == 'rekey',
+                        accept_empty=False
+                        )
+                    )
+                self._action.addUserOption('new_passphrase', new_passphrase)
+
+            if hasattr(arguments, 'other_file'):
+                other_file = vd.ProgramOption(
+                    vd.UserInput(arguments.other_file),
+                    vd.ValidateFileInput(
+                        accept_none=False,
+                        existent=True,
+                        signature=vt.SIGNATURE
+                        )
+                    )
+                self._action.addUserOption('other_file', other_file)
+
+                other_passphrase = vd.ProgramOption(
+                    vd.UserInput(arguments.other_passphrase),
+                    vd.ValidateStringInput(
+                        accept_none=True,
+                        accept_empty=False
+                        )
+                    )
+                self._action.addUserOption(
+                    'other_passphrase',
+                    other_passphrase
+                    )
+
+            if hasattr(arguments, 'member'):
+                member = vd.ProgramOption(
+                    vd.UserInput(arguments.member),
+                    vd.ValidateStringInput(accept_empty=False)
+                    )
+                self._action.addUserOption('member', member)
+
+            if hasattr(arguments, 'codec'):
+                codec = vd.ProgramOption(
+                    vd.UserInput(arguments.codec),
+                    vd.ValidateUserChoice(tuple(vc.CODECS), False)
+                    )
+                self._action.addUserOption('codec', codec)
+
+            if hasattr(arguments, 'cipher'):
+                cipher = vd.ProgramOption(
+                    vd.UserInput(arguments.cipher),
+                    vd.ValidateUserChoice(tuple(vcp.CIPHERS), True)
+                    )
+                self._action.addUserOption('cipher', cipher)
+
+            if hasattr(arguments, 'kdf'):
+                kdf_name = vd.ProgramOption(
+                    vd.UserInput(arguments.kdf),
+                    vd.ValidateUserChoice(tuple(kdf.KDFS), False)
+                    )
+                self._action.addUserOption('kdf', kdf_name)
+
+            if hasattr(arguments, 'kdf_cost'):
+                kdf_cost = vd.ProgramOption(
+                    vd.UserInput(arguments.kdf_cost),
+                    vd.ValidateNumericalInput(
+                        accept_none=True,
+                        min_val=min(kdf.MIN_COST.values()),
+                        max_val=max(kdf.MAX_COST.values()),
+                        incl_min=True,
+                        incl_max=True
+                        )
+                    )
+                self._action.addUserOption('kdf_cost', kdf_cost)
+
+            if hasattr(arguments, 'unlock_time'):
+                unlock_time = vd.ProgramOption(
+                    vd.UserInput(arguments.unlock_time),
+                    vd.ValidateNumericalInput(
+                        min_val=1,
+                        max_val=60000,
+                        incl_min=True,
+                        incl_max=True
+                        )
+                    )
+                self._action.addUserOption('unlock_time', unlock_time)
+
+            if hasattr(arguments, 'member_passphrase'):
+                member_passphrase = vd.ProgramOption(
+                    vd.UserInput(arguments.member_passphrase),
+                    vd.ValidateStringInput(accept_empty=False)
+                    )
+                self._action.addUserOption(
+                    'member_passphrase',
+                    member_passphrase
+                    )
+
+            if hasattr(arguments, 'count'):
+                count = vd.ProgramOption(
+                    vd.UserInput(arguments.count),
+                    vd.ValidateNumericalInput(
+                        min_val=1,
+                        max_val=pg.MAX_COUNT,
+                        incl_min=True,
+                        incl_max=True
+                        )
+                    )
+                self._action.addUserOption('count', count)
+
+            if hasattr(arguments, 'length'):
+                length = vd.ProgramOption(
+                    vd.UserInput(arguments.length),
+                    vd.ValidateNumericalInput(
+                        min_val=pg.MIN_LENGTH,
+                        max_val=pg.MAX_LENGTH,
+                        incl_min=True,
+                        incl_max=True
+                        )
+                    )
+                self._action.addUserOption('length', length)
+
+                alphabet = vd.ProgramOption(
+                    vd.UserInput(arguments.alphabet),
+                    vd.ValidateUserChoice(tuple(pg.ALPHABETS), False)
+                    )
+                self._action.addUserOption('alphabet', alphabet)
+
+                min_per_class = vd.ProgramOption(
+                    vd.UserInput(arguments.min_per_class),
+                    vd.ValidateNumericalInput(
+                        min_val=0,
+                        max_val=pg.MAX_LENGTH,
+                        incl_min=True,
+                        incl_max=True
+                        )
+                    )
+                self._action.addUserOption('min_per_class', min_per_class)
+
+            if hasattr(arguments, 'breach_file'):
+                breach_file = vd.ProgramOption(
+                    vd.UserInput(arguments.breach_file),
+                    vd.ValidateFileInput(accept_none=False, existent=True)
+                    )
+                self._action.addUserOption('breach_file', breach_file)
+
+                build_index = vd.ProgramOption(
+                    vd.UserInput(arguments.build_index),
+                    vd.ValidateUserChoice((True, False), False)
+                    )
+                self._action.addUserOption('build_index', build_index)
+
+            if hasattr(arguments, 'wordlist'):
+                wordlist = vd.ProgramOption(
+                    vd.UserInput(arguments.wordlist),
+                    vd.ValidateFileInput(accept_none=False, existent=True)
+                    )
+                self._action.addUserOption('wordlist', wordlist)
+
+                words = vd.ProgramOption(
+                    vd.UserInput(arguments.words),
+                    vd.ValidateNumericalInput(
+                        min_val=1,
+                        max_val=dw.MAX_WORDS,
+                        incl_min=True,
+                        incl_max=True
+                        )
+                    )
+                self._action.addUserOption('words', words)
+
+                separator = vd.ProgramOption(
+                    vd.UserInput(arguments.separator),
+                    vd.ValidateStringInput()
+                    )
+                self._action.addUserOption('separator', separator)
+
+            if hasattr(arguments, 'timeout'):
+                timeout = vd.ProgramOption(
+                    vd.UserInput(arguments.timeout),
+                    vd.ValidateNumericalInput(
+                        min_val=0,
+                        max_val=24 * 60 * 60,
+                        incl_min=False,
+                        incl_max=True
+                        )
+                    )
+                self._action.addUserOption('timeout', timeout)
+
+                foreground = vd.ProgramOption(
+                    vd.UserInput(arguments.foreground),
+                    vd.ValidateUserChoice((True, False), False)
+                    )
+                self._action.addUserOption('foreground', foreground)
+
+            for field in ('username', 'password', 'url', 'notes'):
+                if hasattr(arguments, field):
+                    value = vd.ProgramOption(
+                        vd.UserInput(getattr(arguments, field)),
+                        vd.ValidateStringInput(accept_none=True)
+                        )
+                    self._action.addUserOption(field, value)
+
             self._action.validateOptionArguments()
 
     def run(self):
@@ -487,5 +842,398 @@ if __name__ == '__main__':
         group='app specific options'
         )
 
+    # Add subcommands for working with password database entries.
+    program.addCommand('create', 'create new password database file')
+    program.addCommand('list', 'list titles of all entries')
+    program.addCommand('search', 'find entries by title, URL or user name')
+    program.addCommand(
+        'audit-breached',
+        'list entries whose password was seen in breaches'
+        )
+    program.addCommand(
+        'audit-reuse',
+        'list groups of entries with the same or similar passwords'
+        )
+    program.addCommand('get', 'print single entry')
+    program.addCommand('add', 'add new entry')
+    program.addCommand('update', 'update fields of an existing entry')
+    program.addCommand('delete', 'remove an entry')
+    program.addCommand(
+        'compact',
+        'reclaim space taken by changed and removed entries'
+        )
+    program.addCommand('import', 'import entries from browser CSV export')
+    program.addCommand(
+        'agent',
+        'unlock database and serve it to other commands in the background'
+        )
+    program.addCommand('lock', 'stop the agent serving the database')
+    program.addCommand(
+        'rekey',
+        're-encrypt database under a new data key'
+        )
+    program.addCommand(
+        'sync',
+        'merge changes between the database and another copy of it'
+        )
+    program.addCommand('passwd', 'change passphrase of the database')
+    program.addCommand('member-add', 'give new member access to the database')
+    program.addCommand('member-remove', 'remove member access to the database')
+    program.addCommand('generate', 'print randomly generated passwords')
+    program.addCommand(
+        'passphrase',
+        'print Diceware passphrases made of random words of a wordlist'
+        )
+    program.addCommand(
+        'calibrate',
+        'find key derivation cost unlocking the database in given time'
+        )
+
+    for command in ('get', 'add', 'update', 'delete'):
+        program.addArgument(
+            'title',
+            action='store',
+            type=str,
+            help='entry title',
+            metavar='TITLE',
+            command=command
+            )
+
+    program.addArgument(
+        'query',
+        action='store',
+        type=str,
+        help='searched value, or word prefix if --prefix is given',
+        metavar='QUERY',
+        command='search'
+        )
+    program.addArgument(
+        '--field',
+        action='store',
+        type=str,
+        default='title',
+        choices=bi.SEARCH_FIELDS,
+        help='entry field to search (default: title)',
+        dest='field',
+        command='search'
+        )
+    program.addArgument(
+        '--prefix',
+        action='store_true',
+        help='match words starting with the query',
+        dest='prefix',
+        command='search'
+        )
+    program.addArgument(
+        '--fuzzy',
+        action='store_true',
+        help='find titles and URLs resembling the query, best matches first',
+        dest='fuzzy',
+        command='search'
+        )
+    program.addArgument(
+        '--limit',
+        action='store',
+        type=int,
+        default=ti.DEFAULT_LIMIT,
+        help='maximum number of fuzzy matches (default: {0})'
+            .format(ti.DEFAULT_LIMIT),
+        metavar='N',
+        dest='limit',
+        command='search'
+        )
+    program.addArgument(
+        'breach_file',
+        action='store',
+        type=str,
+        help='Pwned Passwords SHA-1 file ordered by hash',
+        metavar='HIBP_FILE',
+        command='audit-breached'
+        )
+    program.addArgument(
+        '--build-index',
+        action='store_true',
+        help='build fan-out index of the file (stored next to it as '
+            + '"HIBP_FILE{0}") that speeds up later audits'
+            .format(bc.INDEX_SUFFIX),
+        dest='build_index',
+        command='audit-breached'
+        )
+
+    for command in ('add', 'update'):
+        for field in ('username', 'password', 'url', 'notes'):
+            program.addArgument(
+                '--{0}'.format(field),
+                action='store',
+                type=str,
+                help='entry {0}'.format(field),
+                metavar=field.upper(),
+                dest=field,
+                command=command
+                )
+
+    program.addArgument(
+        'csv_file',
+        action='store',
+        type=str,
+        help='password export file in CSV format',
+        metavar='CSV_FILE',
+        command='import'
+        )
+    program.addArgument(
+        '--member',
+        action='store',
+        type=str,
+        default=vt.OWNER,
+        help='name of the database member (default: {0})'.format(vt.OWNER),
+        metavar='NAME',
+        dest='member',
+        command='create'
+        )
+    program.addArgument(
+        '--codec',
+        action='store',
+        type=str,
+        default=vc.DEFAULT_CODEC,
+        choices=tuple(vc.CODECS),
+        help='codec compressing entries before encryption (default: {0})'
+            .format(vc.DEFAULT_CODEC),
+        dest='codec',
+        command='create'
+        )
+    program.addArgument(
+        '--cipher',
+        action='store',
+        type=str,
+        default=vcp.DEFAULT_CIPHER,
+        choices=tuple(vcp.CIPHERS),
+        help='cipher encrypting entries (default: {0})'.format(
+            vcp.DEFAULT_CIPHER
+            ),
+        dest='cipher',
+        command='create'
+        )
+    program.addArgument(
+        '--kdf-cost',
+        action='store',
+        type=int,
+        help='cost of the passphrase key derivation, e.g. as found by '
+            + '\'calibrate\' (default: {0})'.format(
+                ', '.join(
+                    '{0} for {1}'.format(cost, name)
+                    for name, cost in kdf.DEFAULT_COST.items()
+                    )
+                ),
+        metavar='N',
+        dest='kdf_cost',
+        command='create'
+        )
+
+    for command in ('create', 'calibrate'):
+        program.addArgument(
+            '--kdf',
+            action='store',
+            type=str,
+            default=kdf.DEFAULT_KDF,
+            choices=tuple(kdf.KDFS),
+            help='passphrase key derivation function (default: {0})'.format(
+                kdf.DEFAULT_KDF
+                ),
+            dest='kdf',
+            command=command
+            )
+
+    program.addArgument(
+        '--unlock-time',
+        action='store',
+        type=int,
+        default=kdf.DEFAULT_UNLOCK_TIME,
+        help='time in milliseconds unlocking the database should take '
+            + '(default: {0})'.format(kdf.DEFAULT_UNLOCK_TIME),
+        metavar='MS',
+        dest='unlock_time',
+        command='calibrate'
+        )
+
+    for command in ('member-add', 'member-remove'):
+        program.addArgument(
+            'member',
+            action='store',
+            type=str,
+            help='member name',
+            metavar='NAME',
+            command=command
+            )
+
+    program.addArgument(
+        'member_passphrase',
+        action='store',
+        type=str,
+        help='passphrase of the new member',
+        metavar='MEMBER_PASSPHRASE',
+        command='member-add'
+        )
+
+    program.addArgument(
+        'new_passphrase',
+        action='store',
+        type=str,
+        help='new passphrase for passwords database file',
+        metavar='NEW_PASSPHRASE',
+        command='passwd'
+        )
+    program.addArgument(
+        '--new-passphrase',
+        action='store',
+        type=str,
+        help='new passphrase for passwords database file (default: keep '
+            + 'the current one)',
+        metavar='NEW_PASSPHRASE',
+        dest='new_passphrase',
+        command='rekey'
+        )
+    program.addArgument(
+        '--cipher',
+        action='store',
+        type=str,
+        choices=tuple(vcp.CIPHERS),
+        help='cipher encrypting entries of the re-encrypted file (default: '
+            + 'keep the current one)',
+        dest='cipher',
+        command='rekey'
+        )
+
+    program.addArgument(
+        'other_file',
+        action='store',
+        type=str,
+        help='another copy of the passwords database file',
+        metavar='OTHER_FILE',
+        command='sync'
+        )
+    program.addArgument(
+        '--other-passphrase',
+        action='store',
+        type=str,
+        help='passphrase for the other copy (default: the same passphrase)',
+        metavar='PASSPHRASE',
+        dest='other_passphrase',
+        command='sync'
+        )
+
+    for command in ('import', 'rekey'):
+        program.addArgument(
+            '--workers',
+            action='store',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='number of worker processes encrypting entries '
+                + '(default: number of CPUs)',
+            metavar='N',
+            dest='workers',
+            command=command
+            )
+
+    program.addArgument(
+        'count',
+        action='store',
+        type=int,
+        help='number of passwords to generate',
+        metavar='COUNT',
+        command='generate'
+        )
+    program.addArgument(
+        'wordlist',
+        action='store',
+        type=str,
+        help='wordlist file holding one word per line, optionally preceded '
+            + 'by its dice roll (e.g. the EFF long wordlist)',
+        metavar='WORDLIST',
+        command='passphrase'
+        )
+    program.addArgument(
+        '--count',
+        action='store',
+        type=int,
+        default=1,
+        help='number of passphrases to generate (default: 1)',
+        metavar='N',
+        dest='count',
+        command='passphrase'
+        )
+    program.addArgument(
+        '--words',
+        action='store',
+        type=int,
+        default=dw.DEFAULT_WORDS,
+        help='number of words of a passphrase (default: {0})'
+            .format(dw.DEFAULT_WORDS),
+        metavar='N',
+        dest='words',
+        command='passphrase'
+        )
+    program.addArgument(
+        '--separator',
+        action='store',
+        type=str,
+        default=dw.DEFAULT_SEPARATOR,
+        help='text put between the words (default: a space)',
+        metavar='TEXT',
+        dest='separator',
+        command='passphrase'
+        )
+    program.addArgument(
+        '--length',
+        action='store',
+        type=int,
+        default=pg.DEFAULT_LENGTH,
+        help='number of characters of a password (default: {0})'
+            .format(pg.DEFAULT_LENGTH),
+        metavar='N',
+        dest='length',
+        command='generate'
+        )
+    program.addArgument(
+        '--alphabet',
+        action='store',
+        type=str,
+        default=pg.DEFAULT_ALPHABET,
+        choices=tuple(pg.ALPHABETS),
+        help='characters to generate passwords from (default: {0})'
+            .format(pg.DEFAULT_ALPHABET),
+        dest='alphabet',
+        command='generate'
+        )
+    program.addArgument(
+        '--min-per-class',
+        action='store',
+        type=int,
+        default=1,
+        help='minimum number of characters of each character class of the '
+            + 'alphabet, e.g. digits, in a password (default: 1)',
+        metavar='N',
+        dest='min_per_class',
+        command='generate'
+        )
+
+    program.addArgument(
+        '--timeout',
+        action='store',
+        type=int,
+        default=ag.DEFAULT_TIMEOUT,
+        help='idle time in seconds after which the agent locks the database '
+            + '(default: {0})'.format(ag.DEFAULT_TIMEOUT),
+        metavar='SECONDS',
+        dest='timeout',
+        command='agent'
+        )
+    program.addArgument(
+        '--foreground',
+        action='store_true',
+        help='serve from the foreground process',
+        dest='foreground',
+        command='agent'
+        )
+
     program.passArgumentOptions()
     program.run()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""benchmarks.py - Performance benchmarks for Password Manager.
+
+Each benchmark is implemented as a function taking parsed command line
+arguments and printing its results to the stdout. Benchmark to be run is
+selected by its name given as the first positional argument.
+
+Example:
+    $ python3 benchmarks.py key_cache --records 10000
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * benchmarks.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from cryptography.fernet import Fernet
+import argparse
+import json
+import random
+import secrets
+import time
+import kdf
+import key_cache as kc
+import password_generator as pg
+import program_actions as pa
+import vault as vt
+import vault_ciphers as vcp
+import vault_codecs as vc
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+# Maximum number of timed calls deriving a key, each taking a fraction of a
+# second.
+KDF_CALLS = 10
+
+
+# ==============================================================================
+# Utility Functions Section
+# ==============================================================================
+
+def _time_per_call(func, count: int) -> float:
+    """Returns average time in microseconds spent in single call of func.
+
+    Args:
+        func (callable): function to be timed. It is called with record index
+            as the only argument.
+        count (int): number of calls.
+
+    Returns:
+        float: average time per call in microseconds.
+    """
+
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / count * 1e6
+
+def _print_result(label: str, per_record: float, baseline: float = None):
+    """Print single benchmark result line.
+    """
+
+    if baseline is None:
+        print('{0:<32} {1:10.2f} us/record'.format(label, per_record))
+    else:
+        print('{0:<32} {1:10.2f} us/record ({2:.2f}x)'.format(
+            label,
+            per_record,
+            baseline / per_record
+            ))
+
+
+# ==============================================================================
+# Benchmarks Section
+# ==============================================================================
+
+def bench_key_cache(args):
+    """Compare per record encryption and decryption cost with and without
+    key cache. Key is derived with the default key derivation parameters,
+    so calls without cache are timed on at most KDF_CALLS records.
+    """
+
+    password = 'correct horse battery staple'
+    parameters = kdf.KdfParameters.new().to_bytes()
+    kdf_calls = min(args.records, KDF_CALLS)
+    records = [
+        'record {0:08d} {1}'.format(i, 'x' * args.record_size)
+        for i in range(args.records)
+        ]
+
+    print('Records: {0}, record size: {1} characters'.format(
+        args.records,
+        args.record_size
+        ))
+
+    # Key derivation alone.
+    uncached = _time_per_call(
+        lambda i: pa._get_fernet(password, parameters),
+        kdf_calls
+        )
+    with pa._new_key_cache() as cache:
+        cached = _time_per_call(
+            lambda i: pa._get_fernet(password, parameters, cache),
+            args.records
+            )
+    _print_result('key derivation (no cache)', uncached)
+    _print_result('key derivation (cache)', cached, uncached)
+
+    # Encryption.
+    uncached = _time_per_call(
+        lambda i: pa._encrypt_content(records[i], password, parameters),
+        kdf_calls
+        )
+    with pa._new_key_cache() as cache:
+        cached = _time_per_call(
+            lambda i: pa._encrypt_content(
+                records[i],
+                password,
+                parameters,
+                cache
+                ),
+            args.records
+            )
+    _print_result('encrypt (no cache)', uncached)
+    _print_result('encrypt (cache)', cached, uncached)
+
+    # Decryption.
+    with pa._new_key_cache() as cache:
+        tokens = [
+            pa._encrypt_content(record, password, parameters, cache)
+            for record in records
+            ]
+    uncached = _time_per_call(
+        lambda i: pa._decrypt_content(tokens[i], password, parameters),
+        kdf_calls
+        )
+    with pa._new_key_cache() as cache:
+        cached = _time_per_call(
+            lambda i: pa._decrypt_content(
+                tokens[i],
+                password,
+                parameters,
+                cache
+                ),
+            args.records
+            )
+    _print_result('decrypt (no cache)', uncached)
+    _print_result('decrypt (cache)', cached, uncached)
+
+
+def bench_generator(args):
+    """Compare per password cost of generating passwords one character at a
+    time with secrets.choice() and in batches, with and without NumPy.
+    """
+
+    length = pg.DEFAULT_LENGTH
+    alphabet = ''.join(pg.ALPHABETS[pg.DEFAULT_ALPHABET])
+
+    print('Passwords: {0}, length: {1}'.format(args.records, length))
+
+    def batched(count):
+        for _ in pg.generate_lines(count, length):
+            pass
+
+    per_character = _time_per_call(
+        lambda i: ''.join(secrets.choice(alphabet) for _ in range(length)),
+        args.records
+        )
+    _print_result('secrets.choice', per_character)
+
+    # Generator falls back to pure Python when NumPy is not installed.
+    numpy, pg._numpy = pg._numpy, lambda: None
+    try:
+        start = time.perf_counter()
+        batched(args.records)
+        python = (time.perf_counter() - start) / args.records * 1e6
+    finally:
+        pg._numpy = numpy
+    _print_result('batched (python)', python, per_character)
+
+    if pg._numpy() is not None:
+        start = time.perf_counter()
+        batched(args.records)
+        vectorized = (time.perf_counter() - start) / args.records * 1e6
+        _print_result('batched (numpy)', vectorized, per_character)
+
+
+def _vault_entries(count: int, notes_size: int) -> list:
+    """Returns list of vault entries resembling real ones: site logins with
+    generated passwords, most without notes and some with notes of about
+    given size holding prose, recovery codes or connection settings.
+    """
+
+    generator = random.Random(2026)
+    words = (
+        'account recovery security question answer backup phone email '
+        + 'server port license key support pin shared family old new '
+        + 'work personal billing admin login expires renew contact'
+        ).split()
+    alphabet = ''.join(pg.ALPHABETS[pg.DEFAULT_ALPHABET])
+    entries = list()
+
+    for i in range(count):
+        site = 'site{0}'.format(i)
+        kind = generator.random()
+        notes = ''
+
+        if kind < 0.2:
+            notes = ' '.join(
+                generator.choice(words)
+                for _ in range(notes_size // 7)
+                )
+        elif kind < 0.3:
+            notes = '\n'.join(
+                '{0:04x}-{1:04x}'.format(
+                    generator.getrandbits(16),
+                    generator.getrandbits(16)
+                    )
+                for _ in range(notes_size // 10)
+                )
+        elif kind < 0.4:
+            notes = '\n'.join(
+                '{0} = {1}'.format(
+                    generator.choice(words),
+                    generator.randint(1, 65535)
+                    )
+                for _ in range(notes_size // 12)
+                )
+
+        entries.append(vt.new_entry(
+            site,
+            username='user{0}@example.com'.format(generator.randint(1, 99)),
+            password=''.join(
+                generator.choice(alphabet)
+                for _ in range(pg.DEFAULT_LENGTH)
+                ),
+            url='https://www.{0}.com/login'.format(site),
+            notes=notes
+            ))
+
+    return entries
+
+def bench_codecs(args):
+    """Compare size of sealed vault records and per record cost of sealing
+    and opening them with every record codec.
+    """
+
+    entries = _vault_entries(args.records, args.record_size)
+    material = kc.KeyMaterial(Fernet.generate_key())
+
+    print('Records: {0}, notes size: {1} characters'.format(
+        args.records,
+        args.record_size
+        ))
+
+    baseline = None
+
+    for codec in vc.CODECS:
+        sealed = list()
+        seal = _time_per_call(
+            lambda i: sealed.append(vt.seal_entry(material, entries[i], codec)),
+            args.records
+            )
+        unseal = _time_per_call(
+            lambda i: vt.open_entry(material, sealed[i][1]),
+            args.records
+            )
+        size = sum(len(raw) for _, raw, _ in sealed)
+
+        if baseline is None:
+            baseline = size
+
+        print('{0:<8} {1:10.1f} bytes/record ({2:5.1f}%) {3:8.2f} us seal '
+            '{4:8.2f} us open'.format(
+                codec,
+                size / args.records,
+                100 * size / baseline,
+                seal,
+                unseal
+                ))
+
+def bench_ciphers(args):
+    """Compare per record cost and throughput of encrypting and decrypting
+    vault records with every record cipher against Fernet.
+    """
+
+    entries = _vault_entries(args.records, args.record_size)
+    material = kc.KeyMaterial(Fernet.generate_key())
+    plain = [
+        vc.encode(vc.DEFAULT_CODEC, json.dumps(entry).encode('utf-8'))
+        for entry in entries
+        ]
+    total = sum(len(record) for record in plain)
+
+    print('Records: {0}, average record size: {1:.1f} bytes'.format(
+        args.records,
+        total / args.records
+        ))
+
+    baseline = None
+
+    for cipher in vcp.CIPHERS:
+        sealed = list()
+        encrypt = _time_per_call(
+            lambda i: sealed.append(vcp.encrypt(material, cipher, plain[i])),
+            args.records
+            )
+        decrypt = _time_per_call(
+            lambda i: vcp.decrypt(material, cipher, sealed[i]),
+            args.records
+            )
+        overhead = sum(len(raw) for raw in sealed) - total
+
+        if baseline is None:
+            baseline = encrypt + decrypt
+
+        print('{0:<18} {1:6.1f} bytes added {2:8.2f} us encrypt '
+            '{3:8.2f} us decrypt {4:8.1f} MB/s ({5:.2f}x)'.format(
+                cipher,
+                overhead / args.records,
+                encrypt,
+                decrypt,
+                2 * total / args.records / (encrypt + decrypt),
+                baseline / (encrypt + decrypt)
+                ))
+
+
+BENCHMARKS = {
+    'key_cache': bench_key_cache,
+    'generator': bench_generator,
+    'codecs': bench_codecs,
+    'ciphers': bench_ciphers,
+    }
+
+
+# ==============================================================================
+# Script main body
+# ==============================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        prog='benchmarks.py',
+        description='Run Password Manager performance benchmarks.'
+        )
+    parser.add_argument(
+        'benchmark',
+        choices=sorted(BENCHMARKS.keys()),
+        help='name of the benchmark to run'
+        )
+    parser.add_argument(
+        '--records',
+        type=int,
+        default=10000,
+        help='number of records to process (default: 10000)'
+        )
+    parser.add_argument(
+        '--record-size',
+        type=int,
+        default=200,
+        dest='record_size',
+        help='approximate size of a single record in characters '
+            + '(default: 200)'
+        )
+
+    arguments = parser.parse_args()
+    BENCHMARKS[arguments.benchmark](arguments)
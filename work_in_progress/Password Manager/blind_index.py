@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""blind_index.py - Keyed blind index tokens for searching encrypted entries.
+
+Blind index makes it possible to find vault entries by their title, URL or
+user name without decrypting the vault. Searchable fields are normalized and
+split into words, and for each word an HMAC token is computed for every prefix
+of length MIN_PREFIX up to MAX_PREFIX characters. An additional token is
+computed for the complete normalized field value. Words are runs of letters
+and digits of any script, so punctuation separates words. Prefix queries are
+normalized and split into words the same way, and a query of several words
+finds entries having a word starting with each of them. Tokens are keyed with
+a subkey of the vault key, so they can not be computed without the passphrase.
+
+Tokens are truncated to TOKEN_SIZE bytes. Truncation, prefixes longer than
+MAX_PREFIX characters and stale tokens all produce false candidates only, so
+searches must confirm candidates against decrypted entries using 'matches()'.
+
+Blind index reveals which entries share a field value or a word prefix to
+anyone holding the vault file. It does not reveal the values themselves.
+
+Example:
+    >>> token = prefix_token(key, 'title', 'git')
+    >>> tokens = entry_tokens(key, {'title': 'GitHub', 'url': 'github.com'})
+    >>> token in tokens
+    True
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * blind_index.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from urllib.parse import urlsplit
+import hashlib as hl
+import hmac
+import re
+import unicodedata
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+SEARCH_FIELDS = ('title', 'url', 'username')
+TOKEN_SIZE = 8
+MIN_PREFIX = 3
+MAX_PREFIX = 8
+BLIND_INDEX_LABEL = b'blind-index'
+
+_WORD_SEPARATOR = re.compile(r'[\W_]+')
+
+
+# ==============================================================================
+# Tokenization Section
+# ==============================================================================
+
+def normalize(field: str, value: str) -> str:
+    """Returns normalized form of field value used for indexing and searching.
+
+    Values are brought to Unicode normal form NFKC, case folded and stripped
+    of surrounding whitespace. URLs are reduced to the host name without the 'www.' prefix, so searches are not
+    affected by the scheme, port or path.
+
+    Args:
+        field (str): name of the entry field.
+        value (str): field value.
+
+    Returns:
+        str: normalized value.
+    """
+
+    value = unicodedata.normalize('NFKC', value).strip().casefold()
+
+    if field == 'url' and value:
+        host = urlsplit(value if '//' in value else '//' + value).hostname
+        value = host or value
+        if value.startswith('www.'):
+            value = value[4:]
+
+    return value
+
+def _words(value: str) -> list:
+    """Returns list of words of the normalized value.
+    """
+
+    return [word for word in _WORD_SEPARATOR.split(value) if word]
+
+def _query_words(field: str, query: str) -> list:
+    """Returns list of words of the prefix query, normalized as the indexed
+    words are. Raises ValueError if no word is at least MIN_PREFIX characters
+    long.
+    """
+
+    words = _words(normalize(field, query))
+
+    if not words or max(len(word) for word in words) < MIN_PREFIX:
+        raise ValueError(
+            'Search prefix must be at least {0} characters long'
+            .format(MIN_PREFIX)
+            )
+
+    return words
+
+def _token(key: bytes, kind: bytes, field: str, value: str) -> bytes:
+    """Returns truncated HMAC token for given kind, field and value.
+    """
+
+    message = b'\x00'.join((
+        kind,
+        field.encode('utf-8'),
+        value.encode('utf-8')
+        ))
+
+    return hmac.new(key, message, hl.sha256).digest()[:TOKEN_SIZE]
+
+def exact_token(key: bytes, field: str, value: str) -> bytes:
+    """Returns token for exact match of the complete field value.
+
+    Args:
+        key (bytes): blind index key.
+        field (str): name of the entry field.
+        value (str): field value, normalized or not.
+
+    Returns:
+        bytes: blind index token.
+    """
+
+    return _token(key, b'exact', field, normalize(field, value))
+
+def prefix_token(key: bytes, field: str, prefix: str) -> bytes:
+    """Returns token for words of the field value starting with given prefix.
+
+    Prefix is normalized and split into words as indexed values are, and the
+    token is computed for the longest word, truncated to MAX_PREFIX
+    characters. Raises ValueError if no word of the prefix is at least
+    MIN_PREFIX characters long.
+
+    Args:
+        key (bytes): blind index key.
+        field (str): name of the entry field.
+        prefix (str): word prefix, normalized or not.
+
+    Returns:
+        bytes: blind index token.
+    """
+
+    longest = max(_query_words(field, prefix), key=len)
+
+    return _token(key, b'prefix', field, longest[:MAX_PREFIX])
+
+def entry_tokens(key: bytes, entry: dict) -> set:
+    """Returns set of all blind index tokens for given entry.
+
+    Args:
+        key (bytes): blind index key.
+        entry (dict): vault entry.
+
+    Returns:
+        set: blind index tokens.
+    """
+
+    tokens = set()
+
+    for field in SEARCH_FIELDS:
+        value = normalize(field, entry.get(field, ''))
+
+        if not value:
+            continue
+
+        tokens.add(_token(key, b'exact', field, value))
+
+        for word in _words(value):
+            for length in range(MIN_PREFIX, min(len(word), MAX_PREFIX) + 1):
+                tokens.add(_token(key, b'prefix', field, word[:length]))
+
+    return tokens
+
+def search_token(key: bytes, field: str, query: str, prefix: bool) -> bytes:
+    """Returns token to be looked up for given search query.
+
+    Args:
+        key (bytes): blind index key.
+        field (str): name of the entry field.
+        query (str): searched value or word prefix.
+        prefix (bool): whether to search for word prefix or exact value.
+
+    Returns:
+        bytes: blind index token.
+    """
+
+    if field not in SEARCH_FIELDS:
+        raise ValueError('Field "{0}" is not searchable'.format(field))
+
+    if prefix:
+        return prefix_token(key, field, query)
+
+    return exact_token(key, field, query)
+
+def matches(entry: dict, field: str, query: str, prefix: bool) -> bool:
+    """Returns whether or not decrypted entry matches search query.
+
+    Args:
+        entry (dict): decrypted vault entry.
+        field (str): name of the entry field.
+        query (str): searched value or word prefix.
+        prefix (bool): whether to search for word prefix or exact value.
+
+    Returns:
+        bool: True if entry matches the query.
+    """
+
+    value = normalize(field, entry.get(field, ''))
+
+    if not prefix:
+        return value == normalize(field, query)
+
+    words = _words(value)
+
+    return all(
+        any(word.startswith(prefix) for word in words)
+        for prefix in _query_words(field, query)
+        )
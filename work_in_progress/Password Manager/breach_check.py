@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""breach_check.py - Offline check of passwords against Pwned Passwords.
+
+Pwned Passwords SHA-1 file ordered by hash (e.g. pwned-passwords-sha1-ordered-
+by-hash-v8.txt) holds one 'HASH:COUNT' line for every breached password, where
+HASH is the upper case hex SHA-1 digest of the password and COUNT the number
+of times it was seen in breaches. The file is tens of GB large, so it is
+memory mapped and searched in place: binary search jumps to the middle of the
+byte range, skips to the next line and compares its hash, until the range is
+small enough to be scanned line by line. Only the pages visited by the search
+are ever read.
+
+Optional fan-out index, built once with 'build_index()' and stored next to the
+file, holds the offset of the first line of every 16 bit hash prefix (512 KiB
+for 65536 prefixes). Search then starts from the range of the prefix, which
+saves the first sixteen steps of every binary search. Index records size and
+modification time of the file and is ignored once the file changes.
+
+Hashes are looked up in sorted order, so consecutive searches tend to visit
+pages that were read by the previous ones.
+
+Example:
+    >>> with BreachFile('pwned-passwords-sha1-ordered-by-hash-v8.txt') as f:
+    >>>     f.count(hashed_password('password'))
+    9545824
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * breach_check.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from __future__ import annotations
+from array import array
+import hashlib as hl
+import mmap
+import os
+import struct
+import sys
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+HASH_SIZE = 40
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'PMHIBPX1'
+FANOUT_BITS = 16
+
+# Byte ranges smaller than this are scanned line by line.
+SCAN_SIZE = 256
+
+_INDEX_HEADER = struct.Struct('>8sQQH')
+
+
+# ==============================================================================
+# Hashing Utilities Section
+# ==============================================================================
+
+def hashed_password(password: str) -> bytes:
+    """Returns hashed password in the form used by Pwned Passwords.
+
+    This function takes a password string and returns a hashed version of it.
+    The hashing algorithm used is sha1, with the digest given as upper case
+    hex string.
+
+    Args:
+        password (str): password string to be hashed.
+
+    Returns:
+        bytes: ASCII encoded, upper case hex SHA-1 digest.
+    """
+
+    digest = hl.sha1(password.encode('utf-8')).hexdigest()
+
+    return digest.upper().encode('ascii')
+
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+
+class BreachFile():
+    """Memory mapped Pwned Passwords SHA-1 file ordered by hash.
+
+    Fan-out index stored next to the file is used if it matches the file. Use
+    it as a context manager or call 'close()' to unmap the file.
+    """
+
+    def __init__(self: BreachFile, path: str):
+        self._path = path
+        self._file = open(path, 'rb')
+        self._map = None
+        self._fanout = None
+
+        try:
+            if os.fstat(self._file.fileno()).st_size:
+                self._map = mmap.mmap(
+                    self._file.fileno(),
+                    0,
+                    access=mmap.ACCESS_READ
+                    )
+                self._map.madvise(mmap.MADV_RANDOM)
+
+            self._fanout = self._load_index()
+
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self: BreachFile) -> BreachFile:
+        return self
+
+    def __exit__(self: BreachFile, exc_type, exc_value, traceback):
+        self.close()
+
+    def _identity(self: BreachFile) -> tuple:
+        """Return (size, modification time) of the file.
+        """
+
+        info = os.fstat(self._file.fileno())
+
+        return info.st_size, info.st_mtime_ns
+
+    def _load_index(self: BreachFile):
+        """Return fan-out index of the file, or None if there is no index
+        matching the file.
+        """
+
+        try:
+            with open(self._path + INDEX_SUFFIX, 'rb') as index_file:
+                magic, size, mtime, bits = _INDEX_HEADER.unpack(
+                    index_file.read(_INDEX_HEADER.size)
+                    )
+                if magic != INDEX_MAGIC \
+                        or (size, mtime) != self._identity() \
+                        or bits != FANOUT_BITS:
+                    return None
+
+                fanout = array('Q')
+                fanout.frombytes(index_file.read())
+
+        except (OSError, struct.error):
+            return None
+
+        if len(fanout) != (1 << FANOUT_BITS) + 1:
+            return None
+
+        # Offsets are stored in big endian order.
+        if sys.byteorder == 'little':
+            fanout.byteswap()
+
+        return fanout
+
+    @property
+    def indexed(self: BreachFile) -> bool:
+        """Return whether or not fan-out index is used.
+        """
+
+        return self._fanout is not None
+
+    def _line_hash(self: BreachFile, start: int) -> bytes:
+        """Return hash of the line starting at given offset.
+        """
+
+        return self._map[start:start + HASH_SIZE].upper()
+
+    def _lower_bound(self: BreachFile, digest: bytes, low: int, high: int):
+        """Return offset of the first line within the byte range whose hash is
+        not less than the digest. Both ends of the range have to be line
+        starts (or the end of the file).
+        """
+
+        while high - low > SCAN_SIZE:
+            middle = self._map.find(b'\n', (low + high) // 2, high) + 1
+
+            if middle <= 0 or middle >= high:
+                break
+
+            if self._line_hash(middle) < digest:
+                low = middle
+            else:
+                high = middle
+
+        while low < high and self._line_hash(low) < digest:
+            end = self._map.find(b'\n', low, high)
+            low = high if end < 0 else end + 1
+
+        return low
+
+    def _range(self: BreachFile, digest: bytes) -> tuple:
+        """Return byte range of the lines that may hold the digest.
+        """
+
+        if self._fanout is None:
+            return 0, len(self._map)
+
+        prefix = int(digest[:FANOUT_BITS // 4], 16)
+
+        return self._fanout[prefix], self._fanout[prefix + 1]
+
+    def count(self: BreachFile, digest: bytes) -> int:
+        """Return number of times the password with given SHA-1 digest was
+        seen in breaches, or 0 if it was not.
+
+        Args:
+            digest (bytes): hex SHA-1 digest (see hashed_password()).
+
+        Returns:
+            int: breach count.
+        """
+
+        if self._map is None:
+            return 0
+
+        digest = digest.upper()
+        low, high = self._range(digest)
+        start = self._lower_bound(digest, low, high)
+
+        if start >= high or self._line_hash(start) != digest:
+            return 0
+
+        end = self._map.find(b'\n', start)
+        line = self._map[start:len(self._map) if end < 0 else end]
+
+        try:
+            return int(line[HASH_SIZE + 1:].strip() or b'1')
+        except ValueError:
+            return 1
+
+    def counts(self: BreachFile, digests) -> dict:
+        """Return mapping of given digests to their breach counts. Digests are
+        looked up in sorted order.
+        """
+
+        return {digest: self.count(digest) for digest in sorted(set(digests))}
+
+    def close(self: BreachFile):
+        """Unmap and close the file.
+        """
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        self._file.close()
+
+
+# ==============================================================================
+# Functions Section
+# ==============================================================================
+
+def build_index(path: str) -> str:
+    """Build fan-out index of the Pwned Passwords file and store it next to the
+    file. Offsets are found by binary search, so the file is not read as a
+    whole.
+
+    Args:
+        path (str): path of the Pwned Passwords SHA-1 file ordered by hash.
+
+    Returns:
+        str: path of the index file.
+    """
+
+    with BreachFile(path) as pwned:
+        pwned._fanout = None
+        fanout = array('Q')
+        size = len(pwned._map) if pwned._map is not None else 0
+        low = 0
+
+        for prefix in range(1 << FANOUT_BITS):
+            digest = '{0:0{1}X}'.format(prefix, FANOUT_BITS // 4) \
+                .encode('ascii')
+            if pwned._map is not None:
+                low = pwned._lower_bound(digest, low, size)
+            fanout.append(low)
+
+        fanout.append(size)
+        header = _INDEX_HEADER.pack(
+            INDEX_MAGIC,
+            *pwned._identity(),
+            FANOUT_BITS
+            )
+
+    if sys.byteorder == 'little':
+        fanout.byteswap()
+
+    index_path = path + INDEX_SUFFIX
+
+    with open(index_path + '.tmp', 'wb') as index_file:
+        index_file.write(header)
+        fanout.tofile(index_file)
+
+    os.replace(index_path + '.tmp', index_path)
+
+    return index_path
+
+def audit(entries, pwned: BreachFile) -> list:
+    """Returns entries whose password was seen in breaches.
+
+    Args:
+        entries: iterable of vault entries.
+        pwned (BreachFile): opened Pwned Passwords file.
+
+    Returns:
+        list: (title, breach count) tuples ordered by descending count.
+    """
+
+    digests = dict()
+
+    for entry in entries:
+        if entry.get('password'):
+            digests.setdefault(
+                hashed_password(entry['password']),
+                list()
+                ).append(entry['title'])
+
+    counts = pwned.counts(digests)
+
+    return sorted(
+        (
+            (title, counts[digest])
+            for digest, titles in digests.items()
+            if counts[digest]
+            for title in titles
+            ),
+        key=lambda item: (-item[1], item[0])
+        )
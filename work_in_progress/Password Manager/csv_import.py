@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""csv_import.py - Bulk import of browser password exports into the vault.
+
+CSV file is read as a stream of rows. Each row is mapped to a vault entry
+using the column names of the common browser exports (Chrome, Firefox, Safari,
+Bitwarden and similar), validated, and given a unique title. Rows are then
+sealed (encrypted and tokenized) in batches across a pool of worker processes,
+and sealed entries are staged in the vault in the order in which they appear
+in the CSV file. Only a bounded number of batches is in flight at any time,
+so reading and sealing do not hold the whole CSV file in memory. Sealed
+entries, however, stay staged in the vault until it is saved, so the whole
+import is written as a single commit group, applied completely or not at all,
+and memory it takes grows with the number of imported entries.
+
+Example:
+    >>> report = import_csv('export.csv', vault, workers=4)
+    >>> report.imported
+    12345
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * csv_import.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import blind_index as bi
+import key_cache as kc
+import parallel as pl
+import validators as vd
+import vault as vt
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+DEFAULT_BATCH_SIZE = 512
+MAX_WORKERS = 64
+
+# Column names used by browser exports for each of the entry fields, in order
+# of preference. Column names are matched case insensitively.
+COLUMNS = {
+    'title': ('title', 'name'),
+    'url': ('url', 'login_uri', 'origin', 'website'),
+    'username': ('username', 'login_username', 'login', 'user'),
+    'password': ('password', 'login_password'),
+    'notes': ('notes', 'note', 'extra', 'comment'),
+    }
+
+
+# ==============================================================================
+# Worker Process Section
+# ==============================================================================
+
+# Key material, record codec and record cipher of the worker process, set up
+# by the pool initializer.
+_worker_material = None
+_worker_formats = None
+
+def _init_worker(key: bytes, codec: str, cipher: str):
+    """Pool initializer setting up key material and record formats in the
+    worker process.
+    """
+
+    global _worker_material, _worker_formats
+    _worker_material = kc.KeyMaterial(key)
+    _worker_formats = (codec, cipher)
+
+def _seal_batch(entries: list) -> list:
+    """Returns list of sealed entries for given batch of entries. Runs in the
+    worker process.
+    """
+
+    return [
+        vt.seal_entry(_worker_material, entry, *_worker_formats)
+        for entry in entries
+        ]
+
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+
+class ImportReport():
+    """Outcome of a CSV import.
+
+    Holds number of imported entries and a list of (line number, message)
+    tuples describing rows that were skipped.
+    """
+
+    def __init__(self: ImportReport):
+        self.imported = 0
+        self.skipped = list()
+
+    def skip(self: ImportReport, line: int, message: str):
+        """Record skipped row.
+        """
+
+        self.skipped.append((line, message))
+
+
+# ==============================================================================
+# Import Functions Section
+# ==============================================================================
+
+def _column_map(fieldnames: list) -> dict:
+    """Returns mapping of entry fields to CSV column names.
+    """
+
+    available = {name.strip().casefold(): name for name in fieldnames or ()}
+    mapping = dict()
+
+    for field, candidates in COLUMNS.items():
+        for candidate in candidates:
+            if candidate in available:
+                mapping[field] = available[candidate]
+                break
+
+    if 'password' not in mapping:
+        raise ValueError('CSV file has no password column')
+
+    return mapping
+
+def read_rows(csv_file, report: ImportReport):
+    """Yields (line number, entry) for valid rows of the CSV file. Invalid rows
+    are recorded in the report and skipped. Titles are not made unique here.
+
+    Args:
+        csv_file: text stream of the CSV file.
+        report (ImportReport): report collecting skipped rows.
+
+    Yields:
+        tuple: line number and entry dictionary.
+    """
+
+    reader = csv.DictReader(csv_file)
+    mapping = _column_map(reader.fieldnames)
+    required = vd.ValidateStringInput(accept_none=False, accept_empty=False)
+
+    for row in reader:
+        line = reader.line_num
+        entry = {
+            field: (row.get(column) or '').strip()
+            for field, column in mapping.items()
+            }
+
+        if not entry.get('title'):
+            entry['title'] = bi.normalize('url', entry.get('url', ''))
+
+        for field in ('title', 'password'):
+            if not required.validate(vd.UserInput(entry.get(field) or None)):
+                report.skip(line, 'Missing {0}: {1}'.format(
+                    field,
+                    required.message
+                    ))
+                break
+        else:
+            yield line, entry
+
+def _unique_title(entry: dict, vault: vt.Vault, taken: set) -> str:
+    """Returns title for the entry that is not yet used in the vault or by
+    earlier rows of the import.
+    """
+
+    title = entry['title']
+    candidates = [title]
+
+    if entry.get('username'):
+        candidates.append('{0} ({1})'.format(title, entry['username']))
+
+    for candidate in candidates:
+        if candidate not in taken and candidate not in vault:
+            return candidate
+
+    number = 2
+    while True:
+        candidate = '{0} ({1})'.format(candidates[-1], number)
+        if candidate not in taken and candidate not in vault:
+            return candidate
+        number += 1
+
+def _batches(rows, vault: vt.Vault, batch_size: int):
+    """Yields batches of entries with unique titles.
+    """
+
+    taken = set()
+    batch = list()
+
+    for _, entry in rows:
+        entry['title'] = _unique_title(entry, vault, taken)
+        taken.add(entry['title'])
+        batch.append(entry)
+
+        if len(batch) == batch_size:
+            yield batch
+            batch = list()
+
+    if batch:
+        yield batch
+
+def _remembered(batches, passwords: deque):
+    """Yields given batches, appending list of passwords of every batch to
+    the passwords queue.
+    """
+
+    for batch in batches:
+        passwords.append([entry.get('password') for entry in batch])
+        yield batch
+
+def import_csv(
+        csv_path: str,
+        vault: vt.Vault,
+        workers: int = 1,
+        batch_size: int = DEFAULT_BATCH_SIZE
+        ) -> ImportReport:
+    """Imports entries from browser password export into the vault.
+
+    Entries are staged, and kept in memory, in the vault; call vault.save()
+    to write them. With more than one worker, entries are sealed in a pool
+    of worker processes.
+
+    Args:
+        csv_path (str): path of the CSV file.
+        vault (Vault): opened vault.
+        workers (int): number of worker processes.
+        batch_size (int): number of entries sealed in a single task.
+
+    Returns:
+        ImportReport: number of imported entries and skipped rows.
+    """
+
+    validator = vd.ValidateFileInput(existent=True, file_type='csv')
+
+    if not validator.validate(vd.UserInput(csv_path)):
+        raise ValueError(validator.message)
+
+    report = ImportReport()
+    material = vault.material
+
+    with open(csv_path, newline='', encoding='utf-8-sig') as csv_file:
+        batches = _batches(read_rows(csv_file, report), vault, batch_size)
+
+        if workers > 1:
+            # Passwords of the batches in flight, in the order of the
+            # batches, to be added to the password history of the vault.
+            passwords = deque()
+            batches = _remembered(batches, passwords)
+
+            with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(material.key, vault.codec, vault.cipher)
+                    ) as executor:
+                for sealed in pl.ordered_map(
+                        executor,
+                        _seal_batch,
+                        batches,
+                        2 * workers
+                        ):
+                    for item, password in zip(sealed, passwords.popleft()):
+                        vault.add_sealed(item, password)
+                    report.imported += len(sealed)
+        else:
+            for batch in batches:
+                for entry in batch:
+                    vault.add_sealed(
+                        vt.seal_entry(
+                            material,
+                            entry,
+                            vault.codec,
+                            vault.cipher
+                            ),
+                        entry.get('password')
+                        )
+                report.imported += len(batch)
+
+    return report
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""diceware.py - Diceware passphrases from large memory mapped wordlists.
+
+Wordlist is a text file holding one word per line. Lines of the EFF wordlists
+start with the dice roll of the word, separated from it by a tab or a space,
+so only the text following the last tab or space of a line is taken as the
+word. Empty lines are skipped.
+
+Wordlist file is memory mapped and is never read into a list of words.
+Instead, a compact index of the start and end offsets of every word (two
+arrays of 32 bit offsets, or 64 bit ones for files larger than 4 GiB) is built
+in a single pass over the mapping, vectorized with NumPy when it is installed.
+Picking a random word is then a lookup in the index followed by a slice of the
+mapping. Random word numbers for a whole batch of passphrases are drawn at
+once (see password_generator.random_below()).
+
+Example:
+    >>> with Wordlist('eff_large_wordlist.txt') as wordlist:
+    >>>     passphrase = wordlist.passphrase(6)
+    >>>     bits = wordlist.entropy(6)
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * diceware.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from __future__ import annotations
+from array import array
+from functools import lru_cache
+import math
+import mmap
+import os
+import password_generator as pg
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+DEFAULT_WORDS = 6
+MAX_WORDS = 64
+DEFAULT_SEPARATOR = ' '
+
+# Number of passphrases generated in a single batch.
+BATCH_PASSPHRASES = 1 << 14
+
+_SEPARATORS = b'\t '
+
+
+# ==============================================================================
+# Functions Section
+# ==============================================================================
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """Returns NumPy module, imported on first call, or None if NumPy is not
+    installed.
+    """
+
+    try:
+        import numpy
+    except ImportError:
+        return None
+
+    return numpy
+
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+
+class Wordlist():
+    """Memory mapped wordlist with an index of word offsets.
+
+    Raises ValueError if the file holds less than two words. Use it as a
+    context manager or call 'close()' to unmap the file.
+    """
+
+    def __init__(self: Wordlist, path: str):
+        self._path = path
+        self._file = open(path, 'rb')
+        self._map = None
+
+        try:
+            if os.fstat(self._file.fileno()).st_size:
+                self._map = mmap.mmap(
+                    self._file.fileno(),
+                    0,
+                    access=mmap.ACCESS_READ
+                    )
+                self._starts, self._ends = self._index()
+            else:
+                self._starts, self._ends = array('I'), array('I')
+
+            if len(self._starts) < 2:
+                raise ValueError(
+                    'Wordlist "{0}" holds less than two words'.format(path)
+                    )
+
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self: Wordlist) -> Wordlist:
+        return self
+
+    def __exit__(self: Wordlist, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self: Wordlist) -> int:
+        return len(self._starts)
+
+    def _index(self: Wordlist) -> tuple:
+        """Return arrays of start and end offsets of all words.
+        """
+
+        typecode = 'I' if len(self._map) < 1 << 32 else 'Q'
+
+        if _numpy() is not None:
+            return self._numpy_index(typecode)
+
+        starts = array(typecode)
+        ends = array(typecode)
+        start = 0
+
+        for line in iter(self._map.readline, b''):
+            end = start + len(line.rstrip(b'\r\n'))
+            word = start + max(
+                line.rfind(separator, 0, end - start)
+                for separator in (b'\t', b' ')
+                ) + 1
+
+            if word < end:
+                starts.append(word)
+                ends.append(end)
+
+            start += len(line)
+
+        return starts, ends
+
+    def _numpy_index(self: Wordlist, typecode: str) -> tuple:
+        """Return arrays of start and end offsets of all words, computed with
+        NumPy.
+        """
+
+        np = _numpy()
+        data = np.frombuffer(self._map, dtype=np.uint8)
+        size = len(data)
+
+        try:
+            newlines = np.flatnonzero(data == ord('\n'))
+            starts = np.concatenate(([0], newlines + 1))
+            ends = np.concatenate((newlines, [size]))
+
+            # Drop the carriage return of CRLF line endings.
+            crlf = ends > starts
+            crlf[crlf] = data[ends[crlf] - 1] == ord('\r')
+            ends = ends - crlf
+
+            # Word starts after the last separator preceding the line end.
+            separators = np.flatnonzero(np.isin(data, list(_SEPARATORS)))
+            if len(separators):
+                last = np.searchsorted(separators, ends) - 1
+                found = last >= 0
+                found[found] = separators[last[found]] >= starts[found]
+                starts[found] = separators[last[found]] + 1
+
+            words = ends > starts
+
+            return (
+                array(typecode, starts[words].astype(typecode).tobytes()),
+                array(typecode, ends[words].astype(typecode).tobytes())
+                )
+
+        finally:
+            # Mapping can not be closed while a view of it exists.
+            del data
+
+    @property
+    def path(self: Wordlist) -> str:
+        """Return path of the wordlist file.
+        """
+
+        return self._path
+
+    def word(self: Wordlist, number: int) -> bytes:
+        """Return word with given number.
+        """
+
+        return self._map[self._starts[number]:self._ends[number]]
+
+    def entropy(self: Wordlist, words: int) -> float:
+        """Return entropy in bits of a passphrase of given number of words.
+        """
+
+        return words * math.log2(len(self))
+
+    def passphrase_lines(
+            self: Wordlist,
+            count: int,
+            words: int = DEFAULT_WORDS,
+            separator: str = DEFAULT_SEPARATOR,
+            batch: int = BATCH_PASSPHRASES
+            ):
+        """Yields blocks of generated passphrases, one passphrase per line.
+
+        Args:
+            count (int): number of passphrases.
+            words (int): number of words of every passphrase.
+            separator (str): text put between the words.
+            batch (int): number of passphrases in a block.
+
+        Yields:
+            bytes: UTF-8 encoded, newline terminated passphrases.
+        """
+
+        if not 1 <= words <= MAX_WORDS:
+            raise ValueError(
+                'Passphrase must have from 1 to {0} words'.format(MAX_WORDS)
+                )
+
+        separator = separator.encode('utf-8')
+        starts = self._starts
+        ends = self._ends
+        wordlist = self._map
+
+        for first in range(0, count, batch):
+            rows = min(batch, count - first)
+            numbers = pg.random_below(rows * words, len(self))
+            if not isinstance(numbers, list):
+                numbers = numbers.tolist()
+
+            yield b''.join(
+                separator.join(
+                    wordlist[starts[number]:ends[number]]
+                    for number in numbers[row:row + words]
+                    ) + b'\n'
+                for row in range(0, rows * words, words)
+                )
+
+    def passphrase(
+            self: Wordlist,
+            words: int = DEFAULT_WORDS,
+            separator: str = DEFAULT_SEPARATOR
+            ) -> str:
+        """Returns single generated passphrase.
+        """
+
+        block = next(self.passphrase_lines(1, words, separator))
+
+        return block.decode('utf-8').rstrip('\n')
+
+    def close(self: Wordlist):
+        """Unmap and close the wordlist file.
+        """
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        self._file.close()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""kdf.py - Tunable passphrase key derivation.
+
+Passphrase key material is derived with a memory hard (scrypt) or iterated
+(PBKDF2-HMAC-SHA256) key derivation function, both from the standard library.
+Parameters of the derivation, i.e. the function, its cost and the salt, are
+stored in the vault preamble (see vault.py), so the passphrase key can be
+derived before anything else is read from the vault, and every vault can use
+its own cost.
+
+Cost is the base 2 logarithm of the scrypt CPU/memory cost parameter N, with
+block size SCRYPT_BLOCK_SIZE and no parallelism, or the number of PBKDF2
+iterations. Derivation with scrypt cost c takes 2 ** c KiB of memory, so cost
+15 takes 32 MiB. Time taken grows with the cost, and 'calibrate()' finds the
+cost at which derivation on the current machine takes a given time, e.g. the
+default 250 ms, trading unlock time against the cost of guessing passphrases.
+
+Derived key is returned in the form accepted by KeyMaterial (32 bytes, url
+safe base64 encoded).
+
+Example:
+    >>> parameters = KdfParameters.new('scrypt', calibrate(250)[0])
+    >>> key = derive_key('correct horse battery staple', parameters)
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * kdf.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from __future__ import annotations
+import base64 as b64
+import hashlib as hl
+import math
+import os
+import struct
+import time
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+# Key derivation function names mapped to the ids stored in the vault file.
+KDFS = {
+    'scrypt': 1,
+    'pbkdf2-sha256': 2,
+    }
+DEFAULT_KDF = 'scrypt'
+
+KEY_SIZE = 32
+SALT_SIZE = 16
+SCRYPT_BLOCK_SIZE = 8
+SCRYPT_PARALLELISM = 1
+
+# Bounds and defaults of the cost of every function.
+MIN_COST = {
+    'scrypt': 10,
+    'pbkdf2-sha256': 10000,
+    }
+MAX_COST = {
+    'scrypt': 22,
+    'pbkdf2-sha256': 100000000,
+    }
+DEFAULT_COST = {
+    'scrypt': 15,
+    'pbkdf2-sha256': 600000,
+    }
+
+DEFAULT_UNLOCK_TIME = 250
+
+# Calibration corrects its estimate at most this many times, until time
+# taken is within the tolerance (fraction of the target time). Every time is
+# the best of a few derivations.
+CALIBRATION_ROUNDS = 4
+CALIBRATION_TOLERANCE = 0.1
+CALIBRATION_REPEATS = 2
+
+_PARAMETERS = struct.Struct('>BI{0}s'.format(SALT_SIZE))
+
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+
+class KdfParameters():
+    """Parameters of passphrase key derivation: name of the function, its cost
+    and the salt.
+
+    Use class methods 'new()' and 'from_bytes()' to obtain KdfParameters
+    object, and 'to_bytes()' to serialize it.
+    """
+
+    def __init__(self: KdfParameters, algorithm: str, cost: int, salt: bytes):
+        if algorithm not in KDFS:
+            raise ValueError(
+                'Unsupported key derivation function {0}'.format(algorithm)
+                )
+
+        if not isinstance(cost, int) \
+                or not MIN_COST[algorithm] <= cost <= MAX_COST[algorithm]:
+            raise ValueError(
+                'Cost of {0} must be between {1} and {2}'.format(
+                    algorithm,
+                    MIN_COST[algorithm],
+                    MAX_COST[algorithm]
+                    )
+                )
+
+        if len(salt) != SALT_SIZE:
+            raise ValueError('Invalid key derivation salt')
+
+        self._algorithm = algorithm
+        self._cost = cost
+        self._salt = bytes(salt)
+
+    @classmethod
+    def new(
+            cls,
+            algorithm: str = DEFAULT_KDF,
+            cost: int = None
+            ) -> KdfParameters:
+        """Return parameters of given function and cost, the default cost of
+        the function if none is given, with a random salt.
+        """
+
+        if algorithm not in KDFS:
+            raise ValueError(
+                'Unsupported key derivation function {0}'.format(algorithm)
+                )
+
+        if cost is None:
+            cost = DEFAULT_COST[algorithm]
+
+        return cls(algorithm, cost, os.urandom(SALT_SIZE))
+
+    @classmethod
+    def from_bytes(cls, data) -> KdfParameters:
+        """Return parameters serialized with 'to_bytes()'. Raises ValueError
+        if data is malformed.
+        """
+
+        if len(data) != _PARAMETERS.size:
+            raise ValueError('Key derivation parameters are corrupted')
+
+        kdf_id, cost, salt = _PARAMETERS.unpack(data)
+
+        return cls(kdf_name(kdf_id), cost, salt)
+
+    def to_bytes(self: KdfParameters) -> bytes:
+        """Return parameters serialized as function id (uint8) | cost
+        (uint32) | salt.
+        """
+
+        return _PARAMETERS.pack(KDFS[self._algorithm], self._cost, self._salt)
+
+    @property
+    def algorithm(self: KdfParameters) -> str:
+        """Return name of the key derivation function.
+        """
+
+        return self._algorithm
+
+    @property
+    def cost(self: KdfParameters) -> int:
+        """Return cost of the key derivation.
+        """
+
+        return self._cost
+
+    @property
+    def salt(self: KdfParameters) -> bytes:
+        """Return key derivation salt.
+        """
+
+        return self._salt
+
+
+# ==============================================================================
+# Functions Section
+# ==============================================================================
+
+def kdf_name(kdf_id: int) -> str:
+    """Returns name of the key derivation function with given id. Raises
+    ValueError if there is no such function.
+    """
+
+    for name, number in KDFS.items():
+        if number == kdf_id:
+            return name
+
+    raise ValueError('Unsupported key derivation function {0}'.format(kdf_id))
+
+def derive_key(passphrase: str, parameters: KdfParameters) -> bytes:
+    """Returns key derived from the passphrase with given parameters.
+
+    Args:
+        passphrase (str): passphrase.
+        parameters (KdfParameters): key derivation parameters.
+
+    Returns:
+        bytes: derived key in the form accepted by KeyMaterial.
+    """
+
+    secret = passphrase.encode('utf-8')
+
+    if parameters.algorithm == 'scrypt':
+        n = 1 << parameters.cost
+        key = hl.scrypt(
+            secret,
+            salt=parameters.salt,
+            n=n,
+            r=SCRYPT_BLOCK_SIZE,
+            p=SCRYPT_PARALLELISM,
+            maxmem=129 * SCRYPT_BLOCK_SIZE * n + (1 << 20),
+            dklen=KEY_SIZE
+            )
+    else:
+        key = hl.pbkdf2_hmac(
+            'sha256',
+            secret,
+            parameters.salt,
+            parameters.cost,
+            KEY_SIZE
+            )
+
+    return b64.urlsafe_b64encode(key)
+
+def derivation_time(algorithm: str, cost: int) -> float:
+    """Returns time in milliseconds taken by a single key derivation with
+    given function and cost on this machine, the best of CALIBRATION_REPEATS
+    derivations.
+    """
+
+    parameters = KdfParameters.new(algorithm, cost)
+    best = None
+
+    for _ in range(CALIBRATION_REPEATS):
+        start = time.perf_counter()
+        derive_key('calibration', parameters)
+        elapsed = (time.perf_counter() - start) * 1e3
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best
+
+def calibrate(
+        target: float = DEFAULT_UNLOCK_TIME,
+        algorithm: str = DEFAULT_KDF
+        ) -> tuple:
+    """Returns cost of given key derivation function at which a derivation on
+    this machine takes about the target time.
+
+    Time is assumed to be proportional to 2 ** cost for scrypt and to the
+    cost for PBKDF2. Cost is estimated from a cheap derivation and corrected
+    by measuring derivations at the estimate, at most CALIBRATION_ROUNDS
+    times, until the time is within CALIBRATION_TOLERANCE of the target.
+    Scrypt cost only comes in powers of two, so its time can be off the
+    target by up to a factor of the square root of two.
+
+    Args:
+        target (float): target derivation time in milliseconds.
+        algorithm (str): key derivation function name, one of KDFS.
+
+    Returns:
+        tuple: (cost, measured derivation time in milliseconds).
+    """
+
+    if algorithm not in KDFS:
+        raise ValueError(
+            'Unsupported key derivation function {0}'.format(algorithm)
+            )
+
+    if target <= 0:
+        raise ValueError('Target derivation time must be positive')
+
+    cost = MIN_COST[algorithm]
+    elapsed = derivation_time(algorithm, cost)
+
+    for _ in range(CALIBRATION_ROUNDS):
+        if abs(elapsed - target) <= CALIBRATION_TOLERANCE * target:
+            break
+
+        if algorithm == 'scrypt':
+            estimate = cost + round(math.log2(target / elapsed))
+        else:
+            estimate = round(cost * target / elapsed, -3)
+
+        estimate = min(
+            max(int(estimate), MIN_COST[algorithm]),
+            MAX_COST[algorithm]
+            )
+
+        if estimate == cost:
+            break
+
+        cost = estimate
+        elapsed = derivation_time(algorithm, cost)
+
+    return cost, elapsed
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""key_cache.py - Session scoped cache of derived encryption keys.
+
+Deriving a Fernet key from a passphrase and building a Fernet object around it
+has to be done only once per passphrase and session. This module provides
+'KeyMaterial', a holder for key material derived from a single passphrase, and
+'KeyCache', a bounded cache of such holders.
+
+Cache has an explicit lifetime. It is opened on construction and it is closed
+either by calling 'close()' or by leaving the 'with' block it was used in. On
+close, and on eviction of the least recently used entry, all key material held
+by the cache is overwritten with zeros.
+
+Example:
+    >>> with KeyCache(derive_key) as cache:
+    >>>     for record in records:
+    >>>         token = cache.fernet(passphrase).encrypt(record)
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * key_cache.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from __future__ import annotations
+from collections import OrderedDict
+from cryptography.fernet import Fernet
+import hashlib as hl
+import hmac
+import os
+
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+
+class KeyMaterial():
+    """Key material derived from a single passphrase.
+
+    Holds derived key in a mutable buffer, so it can be wiped when no longer
+    needed, together with the Fernet object built around it. Once wiped, object
+    can not be used anymore and any attempt to access key material raises
+    ValueError.
+
+    Note that Fernet object, and AEAD objects built with 'aead()', keep their
+    own copies of the keys that can not be wiped. Wiping only drops the
+    references to them.
+    """
+
+    def __init__(self: KeyMaterial, key: bytes):
+        if not isinstance(key, (bytes, bytearray)):
+            raise TypeError(
+                'Trying to pass non \'bytes\' value as argument \'{0}({1})\''
+                .format(type(key).__name__, key)
+                )
+
+        self._key = bytearray(key)
+        self._fernet = Fernet(bytes(self._key))
+        self._subkeys = dict()
+        self._aeads = dict()
+
+    def _assert_not_wiped(self: KeyMaterial):
+        """Raise ValueError if key material was already wiped.
+        """
+
+        if self._fernet is None:
+            raise ValueError('Key material was already wiped')
+
+    @property
+    def key(self: KeyMaterial) -> bytes:
+        """Return derived key.
+        """
+
+        self._assert_not_wiped()
+
+        return bytes(self._key)
+
+    @property
+    def fernet(self: KeyMaterial) -> Fernet:
+        """Return Fernet object built around derived key.
+        """
+
+        self._assert_not_wiped()
+
+        return self._fernet
+
+    def subkey(self: KeyMaterial, label: bytes) -> bytes:
+        """Return 32 bytes long key derived from the key material for given
+        purpose label. Subkeys for different labels are independent of each
+        other and of the Fernet key.
+        """
+
+        self._assert_not_wiped()
+
+        subkey = self._subkeys.get(label)
+
+        if subkey is None:
+            subkey = bytearray(
+                hmac.new(bytes(self._key), label, hl.sha256).digest()
+                )
+            self._subkeys[label] = subkey
+
+        return bytes(subkey)
+
+    def aead(self: KeyMaterial, algorithm, label: bytes):
+        """Return AEAD object of given class (e.g. AESGCM) keyed with the
+        subkey for given purpose label. Object is built on first use and kept
+        until the key material is wiped.
+        """
+
+        self._assert_not_wiped()
+
+        aead = self._aeads.get((algorithm, label))
+
+        if aead is None:
+            aead = algorithm(self.subkey(label))
+            self._aeads[(algorithm, label)] = aead
+
+        return aead
+
+    @property
+    def wiped(self: KeyMaterial) -> bool:
+        """Return whether or not key material was wiped.
+        """
+
+        return self._fernet is None
+
+    def wipe(self: KeyMaterial):
+        """Overwrite derived key and its subkeys with zeros and drop references
+        to the Fernet and AEAD objects.
+        """
+
+        for buffer in (self._key, *self._subkeys.values()):
+            for i in range(len(buffer)):
+                buffer[i] = 0
+
+        self._subkeys.clear()
+        self._aeads.clear()
+        self._fernet = None
+
+
+class KeyCache():
+    """Bounded cache of key material derived from passphrases.
+
+    Constructor takes key derivation function, which accepts passphrase string
+    and returns key as bytes, and maximum number of entries to be held in the
+    cache. When cache is full the least recently used entry is evicted and
+    wiped. If key derivation parameters (bytes, e.g. serialized KdfParameters
+    of a vault) are given with a passphrase, they are passed on to the key
+    derivation function as the second argument, and key material is cached
+    per passphrase and parameters.
+
+    Passphrases are not stored in the cache. Entries are looked up by an HMAC
+    of the passphrase, keyed with a random per cache salt, and the parameters.
+    """
+
+    def __init__(self: KeyCache, derive, max_entries: int = 4):
+        if not callable(derive):
+            raise TypeError(
+                'Trying to pass non callable object as argument \'{0}({1})\''
+                .format(type(derive).__name__, derive)
+                )
+
+        if not isinstance(max_entries, int) or isinstance(max_entries, bool):
+            raise TypeError(
+                'Trying to pass non \'int\' value as argument \'{0}({1})\''
+                .format(type(max_entries).__name__, max_entries)
+                )
+
+        if max_entries < 1:
+            raise ValueError(
+                'Maximum number of cache entries must be a positive integer'
+                )
+
+        self._derive = derive
+        self._max_entries = max_entries
+        self._salt = os.urandom(16)
+        self._entries = OrderedDict()
+        self._closed = False
+
+    def __enter__(self: KeyCache) -> KeyCache:
+        return self
+
+    def __exit__(self: KeyCache, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self: KeyCache) -> int:
+        return len(self._entries)
+
+    def _lookup_key(
+            self: KeyCache,
+            password: str,
+            parameters: bytes = None
+            ) -> bytes:
+        """Return key under which key material for given passphrase and key
+        derivation parameters is stored.
+        """
+
+        return hmac.new(
+            self._salt,
+            password.encode('utf-8'),
+            hl.sha256
+            ).digest() + (parameters or b'')
+
+    @property
+    def closed(self: KeyCache) -> bool:
+        """Return whether or not the cache was closed.
+        """
+
+        return self._closed
+
+    @property
+    def max_entries(self: KeyCache) -> int:
+        """Return maximum number of entries held by the cache.
+        """
+
+        return self._max_entries
+
+    def material(
+            self: KeyCache,
+            password: str,
+            parameters: bytes = None
+            ) -> KeyMaterial:
+        """Return key material for given passphrase and key derivation
+        parameters.
+
+        Key is derived only on the first request for given passphrase and
+        parameters. Any subsequent request is served from the cache, until the
+        entry gets evicted or the cache is closed.
+        """
+
+        if self._closed:
+            raise ValueError('Operation on a closed key cache')
+
+        lookup = self._lookup_key(password, parameters)
+        material = self._entries.get(lookup)
+
+        if material is not None:
+            self._entries.move_to_end(lookup)
+            return material
+
+        if parameters is None:
+            material = KeyMaterial(self._derive(password))
+        else:
+            material = KeyMaterial(self._derive(password, parameters))
+        self._entries[lookup] = material
+
+        while len(self._entries) > self._max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            evicted.wipe()
+
+        return material
+
+    def key(self: KeyCache, password: str, parameters: bytes = None) -> bytes:
+        """Return derived key for given passphrase and key derivation
+        parameters.
+        """
+
+        return self.material(password, parameters).key
+
+    def fernet(
+            self: KeyCache,
+            password: str,
+            parameters: bytes = None
+            ) -> Fernet:
+        """Return Fernet object for given passphrase and key derivation
+        parameters.
+        """
+
+        return self.material(password, parameters).fernet
+
+    def clear(self: KeyCache):
+        """Wipe and remove all entries from the cache. Cache remains open.
+        """
+
+        while self._entries:
+            _, material = self._entries.popitem()
+            material.wipe()
+
+    def close(self: KeyCache):
+        """Wipe all entries and close the cache. Closing already closed cache
+        has no effect.
+        """
+
+        self.clear()
+        self._salt = None
+        self._closed = True
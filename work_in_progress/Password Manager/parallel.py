@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""parallel.py - Helpers for running vault work on a pool of processes.
+
+Example:
+    >>> with ProcessPoolExecutor() as executor:
+    ...     for result in ordered_map(executor, func, batches, 8):
+    ...         consume(result)
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * parallel.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from collections import deque
+from itertools import islice
+
+
+# ==============================================================================
+# Functions Section
+# ==============================================================================
+
+def batched(iterable, size: int):
+    """Yields lists of up to size consecutive items of the iterable.
+
+    Args:
+        iterable: items to be batched.
+        size (int): maximum number of items in a batch.
+
+    Yields:
+        list: batch of items.
+    """
+
+    iterator = iter(iterable)
+
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def ordered_map(executor, func, iterable, window: int):
+    """Yields results of func applied to items of iterable, in the order of
+    the items. Unlike Executor.map(), at most window items are in flight at
+    any time, so the iterable is consumed lazily and memory usage does not
+    depend on its length.
+
+    Args:
+        executor (Executor): executor running the calls.
+        func (callable): function to be applied.
+        iterable: function arguments.
+        window (int): maximum number of pending calls.
+
+    Yields:
+        results of the calls.
+    """
+
+    in_flight = deque()
+
+    for item in iterable:
+        in_flight.append(executor.submit(func, item))
+        if len(in_flight) >= window:
+            yield in_flight.popleft().result()
+
+    while in_flight:
+        yield in_flight.popleft().result()
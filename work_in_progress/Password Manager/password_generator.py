@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""password_generator.py - Bulk generation of random passwords.
+
+Passwords are generated in batches. Characters of a batch are mapped from a
+single large buffer of random bytes read from os.urandom() by unbiased
+rejection sampling: with n characters to choose from, bytes not below the
+largest multiple of n that fits in a byte are dropped, and the remaining ones
+are taken modulo n.
+
+Passwords are built to meet the requirements instead of being drawn until
+they do, so generation takes the same time whatever the requirements: the
+required number of characters is drawn from each character class of the
+alphabet, the rest of the password from the whole alphabet, and characters of
+the password are then shuffled with an unbiased Fisher-Yates shuffle.
+
+Sampling and shuffling run vectorized in NumPy when it is installed.
+Otherwise bytes are mapped with bytes.translate(), which does the same
+rejection sampling in a single pass, and passwords are shuffled one by one.
+Importing NumPy takes longer than most commands of the app, so it is imported
+on first use (see _numpy()).
+
+Example:
+    >>> for block in generate_lines(1000000, length=24):
+    >>>     sys.stdout.buffer.write(block)
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * password_generator.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from functools import lru_cache
+import os
+import string
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+LOWER = string.ascii_lowercase
+UPPER = string.ascii_uppercase
+DIGITS = string.digits
+SYMBOLS = '!#$%&()*+,-./:;<=>?@[]^_{|}~'
+
+# Alphabets offered to the user, given as tuples of their character classes.
+ALPHABETS = {
+    'full': (LOWER, UPPER, DIGITS, SYMBOLS),
+    'alnum': (LOWER, UPPER, DIGITS),
+    'alpha': (LOWER, UPPER),
+    'lower': (LOWER, ),
+    'hex': (DIGITS, 'abcdef'),
+    'digits': (DIGITS, ),
+    }
+
+DEFAULT_ALPHABET = 'full'
+DEFAULT_LENGTH = 20
+MIN_LENGTH = 4
+MAX_LENGTH = 1024
+MAX_COUNT = 10 ** 9
+
+# Number of password characters generated in a single batch.
+BATCH_CHARACTERS = 1 << 20
+
+
+# ==============================================================================
+# Generator Functions Section
+# ==============================================================================
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """Returns NumPy module, imported on first call, or None if NumPy is not
+    installed.
+    """
+
+    try:
+        import numpy
+    except ImportError:
+        return None
+
+    return numpy
+
+def _check(count: int, length: int, alphabet: str, min_per_class: int):
+    """Raises ValueError if passwords with given parameters can not be
+    generated.
+    """
+
+    if alphabet not in ALPHABETS:
+        raise ValueError('Unknown alphabet "{0}"'.format(alphabet))
+
+    if count < 0 or not MIN_LENGTH <= length <= MAX_LENGTH \
+            or min_per_class < 0:
+        raise ValueError('Invalid password count, length or class minimum')
+
+    if min_per_class * len(ALPHABETS[alphabet]) > length:
+        raise ValueError(
+            'Password of {0} characters can not hold {1} characters of each '
+            'of the {2} character classes'.format(
+                length,
+                min_per_class,
+                len(ALPHABETS[alphabet])
+                )
+            )
+
+def _sampler(characters: bytes):
+    """Returns (limit, translation table, rejected bytes) for rejection
+    sampling of given characters from random bytes.
+    """
+
+    limit = 256 - 256 % len(characters)
+    table = bytes(characters[byte % len(characters)] for byte in range(256))
+
+    return limit, table, bytes(range(limit, 256))
+
+def _numpy_draw(characters: bytes, count: int):
+    """Returns array of count characters drawn uniformly from given
+    characters, generated with NumPy.
+    """
+
+    np = _numpy()
+    limit, table, _ = _sampler(characters)
+    table = np.frombuffer(table, dtype=np.uint8)
+    # Draw a bit more than expected to be accepted, so a second draw is
+    # rarely needed.
+    size = count * 256 // limit + count // 64 + 64
+    accepted = np.empty(0, dtype=np.uint8)
+
+    while len(accepted) < count:
+        drawn = np.frombuffer(os.urandom(size), dtype=np.uint8)
+        accepted = np.concatenate((accepted, drawn[drawn < limit]))
+
+    return table[accepted[:count]]
+
+def _numpy_batch(rows: int, length: int, alphabet: str, min_per_class: int):
+    """Returns array of rows x length password characters meeting the class
+    requirements, generated with NumPy.
+    """
+
+    np = _numpy()
+    classes = [cls.encode('ascii') for cls in ALPHABETS[alphabet]]
+    required = min_per_class * len(classes)
+    columns = [
+        _numpy_draw(cls, rows * min_per_class).reshape(rows, min_per_class)
+        for cls in classes
+        ]
+    columns.append(
+        _numpy_draw(b''.join(classes), rows * (length - required))
+            .reshape(rows, length - required)
+        )
+    result = np.concatenate(columns, axis=1)
+
+    # Characters of the whole alphabet are already in random order.
+    if required:
+        every = np.arange(rows)
+
+        for position in range(length - 1, 0, -1):
+            other = random_below(rows, position + 1)
+            column = result[:, position].copy()
+            result[:, position] = result[every, other]
+            result[every, other] = column
+
+    return result
+
+def _python_draw(characters: bytes, count: int) -> bytes:
+    """Returns count characters drawn uniformly from given characters,
+    generated without NumPy.
+    """
+
+    limit, table, rejected = _sampler(characters)
+    accepted = b''
+
+    while len(accepted) < count:
+        size = count * 256 // limit + count // 64 + 64
+        accepted += os.urandom(size).translate(table, rejected)
+
+    return accepted[:count]
+
+def _python_batch(rows: int, length: int, alphabet: str, min_per_class: int):
+    """Returns list of rows passwords, as bytes, meeting the class
+    requirements, generated without NumPy.
+    """
+
+    classes = [cls.encode('ascii') for cls in ALPHABETS[alphabet]]
+    required = min_per_class * len(classes)
+    free = length - required
+    fill = _python_draw(b''.join(classes), rows * free)
+
+    # Characters of the whole alphabet are already in random order.
+    if not required:
+        return [
+            fill[start:start + length]
+            for start in range(0, rows * length, length)
+            ]
+
+    drawn = [_python_draw(cls, rows * min_per_class) for cls in classes]
+    result = [
+        bytearray(
+            b''.join(
+                characters[row * min_per_class:(row + 1) * min_per_class]
+                for characters in drawn
+                )
+            + fill[row * free:(row + 1) * free]
+            )
+        for row in range(rows)
+        ]
+
+    for position in range(length - 1, 0, -1):
+        for password, other in zip(
+                result,
+                random_below(rows, position + 1)
+                ):
+            password[position], password[other] \
+                = password[other], password[position]
+
+    return [bytes(password) for password in result]
+
+def random_below(count: int, bound: int):
+    """Returns count random integers uniformly distributed in the range from
+    0 up to, but not including, the bound. Integers are drawn from a single
+    os.urandom() buffer of 32 bit values by rejection sampling.
+
+    Args:
+        count (int): number of integers.
+        bound (int): upper bound, at most 2 ** 32.
+
+    Returns:
+        NumPy array of integers, or a list if NumPy is not installed.
+    """
+
+    if not 0 < bound <= 1 << 32:
+        raise ValueError('Bound must be in range [1, 2 ** 32]')
+
+    limit = (1 << 32) - (1 << 32) % bound
+    size = count * (1 << 32) // limit + count // 64 + 16
+    np = _numpy()
+
+    if np is not None:
+        accepted = np.empty(0, dtype=np.uint32)
+
+        while len(accepted) < count:
+            drawn = np.frombuffer(os.urandom(4 * size), dtype='<u4')
+            accepted = np.concatenate((accepted, drawn[drawn < limit]))
+
+        return accepted[:count] % bound
+
+    accepted = list()
+
+    while len(accepted) < count:
+        accepted.extend(
+            value % bound
+            for value in memoryview(os.urandom(4 * size)).cast('I')
+            if value < limit
+            )
+
+    return accepted[:count]
+
+def generate_lines(
+        count: int,
+        length: int = DEFAULT_LENGTH,
+        alphabet: str = DEFAULT_ALPHABET,
+        min_per_class: int = 1,
+        batch_characters: int = BATCH_CHARACTERS
+        ):
+    """Yields blocks of generated passwords, one password per line. Raises
+    ValueError if passwords with given parameters can not be generated.
+
+    Args:
+        count (int): number of passwords.
+        length (int): number of characters of every password.
+        alphabet (str): name of the alphabet from ALPHABETS.
+        min_per_class (int): minimum number of characters of each of the
+            character classes of the alphabet in every password.
+        batch_characters (int): approximate number of password characters in
+            a block.
+
+    Yields:
+        bytes: ASCII encoded, newline terminated passwords.
+    """
+
+    _check(count, length, alphabet, min_per_class)
+
+    batch = max(1, batch_characters // length)
+    np = _numpy()
+
+    for start in range(0, count, batch):
+        rows = min(batch, count - start)
+
+        if np is not None:
+            block = np.empty((rows, length + 1), dtype=np.uint8)
+            block[:, :length] = _numpy_batch(
+                rows,
+                length,
+                alphabet,
+                min_per_class
+                )
+            block[:, length] = ord('\n')
+            yield block.tobytes()
+        else:
+            yield b''.join(
+                password + b'\n'
+                for password in _python_batch(
+                    rows,
+                    length,
+                    alphabet,
+                    min_per_class
+                    )
+                )
+
+def generate(
+        count: int,
+        length: int = DEFAULT_LENGTH,
+        alphabet: str = DEFAULT_ALPHABET,
+        min_per_class: int = 1
+        ) -> list:
+    """Returns list of generated passwords. Use generate_lines() to stream
+    large numbers of passwords.
+
+    Args:
+        count (int): number of passwords.
+        length (int): number of characters of every password.
+        alphabet (str): name of the alphabet from ALPHABETS.
+        min_per_class (int): minimum number of characters of each of the
+            character classes of the alphabet in every password.
+
+    Returns:
+        list: generated passwords.
+    """
+
+    return [
+        line
+        for block in generate_lines(count, length, alphabet, min_per_class)
+        for line in block.decode('ascii').splitlines()
+        ]
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""password_history.py - Keyed Bloom filter of all passwords ever used.
+
+Password history makes it possible to reject a password that was used before
+anywhere in the vault, without keeping the old passwords themselves. Every
+password added to the history sets bits of a bit array, at positions derived
+from a single HMAC-SHA256 of the password by enhanced double hashing
+(position i is h1 + i * h2 + (i ** 3 - i) / 6 modulo the number of bits, which
+keeps positions apart even when h2 shares factors with the number of bits).
+Password is in the history if all of its bits are set, so checking a password
+costs one HMAC and a few bit lookups, however long the history is.
+
+Bloom filter never misses a password that was added, but may report a password
+that was never used, and the more passwords it holds the more often it does.
+History is therefore a scalable Bloom filter: a list of stages, each sized for
+a number of passwords (its capacity) and a false match rate. Passwords are
+added to the latest stage, and once it holds as many passwords as it was sized
+for, a new stage is started, GROWTH times larger and with a TIGHTENING times
+lower false match rate. Password is in the history if it is in any stage, so
+the false match rate of the whole history stays below FALSE_POSITIVE_RATE
+however many passwords are added. Stage with capacity n and false match rate
+p uses k = ceil(log2(1 / p)) hash functions and n * k / ln 2 bits, so it is
+half full at capacity. Number of passwords a stage holds is estimated from
+the number of its set bits.
+
+Bit positions are keyed with a random key kept together with the bits, so the
+filter reveals nothing about the passwords without the key. Vault stores
+history encrypted with its data key (see vault.py), sized for the number of
+its entries, and a rekeyed vault carries the history over unchanged.
+
+History keeps track of the bits set and the stages started since it was
+created, read or last saved, so that saving it costs as much as the
+passwords added (see 'changes()' and 'apply_changes()') rather than the
+size of the whole filter.
+
+Example:
+    >>> history = PasswordHistory.new()
+    >>> history.add('hunter2')
+    True
+    >>> 'hunter2' in history
+    True
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * password_history.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from __future__ import annotations
+import hashlib as hl
+import hmac
+import math
+import os
+import struct
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+DEFAULT_CAPACITY = 1000
+FALSE_POSITIVE_RATE = 1e-4
+GROWTH = 2
+TIGHTENING = 0.5
+MAX_STAGES = 32
+KEY_SIZE = 32
+
+_STAGES = struct.Struct('>B')
+_STAGE = struct.Struct('>IBI')
+_POSITIONS = struct.Struct('>QQ')
+_CHANGES = struct.Struct('>BBI')
+_BIT = struct.Struct('>BI')
+
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+
+class _Stage():
+    """Single Bloom filter of the password history.
+    """
+
+    def __init__(
+            self: _Stage,
+            bits: bytearray,
+            hashes: int,
+            capacity: int
+            ):
+        if not bits or not 0 < hashes < 256 or capacity < 1:
+            raise ValueError('Invalid password history parameters')
+
+        self.bits = bits
+        self.size = 8 * len(bits)
+        self.hashes = hashes
+        self.capacity = capacity
+        self.set = bin(int.from_bytes(bits, 'little')).count('1')
+
+        # Stage is full once it holds as many set bits as it is expected to
+        # hold at capacity.
+        self._full = self.size * (1 - math.exp(-hashes * capacity / self.size))
+
+    @classmethod
+    def new(cls, capacity: int, rate: float) -> _Stage:
+        """Return empty stage sized for given number of passwords and false
+        match rate.
+        """
+
+        hashes = min(255, max(1, math.ceil(-math.log2(rate))))
+        size = math.ceil(capacity * hashes / math.log(2) / 64) * 64
+
+        return cls(bytearray(size // 8), hashes, capacity)
+
+    @property
+    def full(self: _Stage) -> bool:
+        """Return whether or not the stage holds its capacity of passwords.
+        """
+
+        return self.set >= self._full
+
+    def set_bit(self: _Stage, position: int) -> bool:
+        """Set bit at given position. Returns whether or not it was clear.
+        """
+
+        mask = 1 << (position & 7)
+
+        if self.bits[position >> 3] & mask:
+            return False
+
+        self.bits[position >> 3] |= mask
+        self.set += 1
+
+        return True
+
+    def positions(self: _Stage, first: int, second: int):
+        """Yield bit positions of the password with given hashes.
+        """
+
+        for number in range(self.hashes):
+            yield (first + number * second + (number ** 3 - number) // 6) \
+                % self.size
+
+    def to_bytes(self: _Stage) -> bytes:
+        """Return stage serialized as size in bits (uint32) | hash count
+        (uint8) | capacity (uint32) | bits.
+        """
+
+        return _STAGE.pack(self.size, self.hashes, self.capacity) \
+            + bytes(self.bits)
+
+
+class PasswordHistory():
+    """Keyed scalable Bloom filter of used passwords.
+
+    Use class methods 'new()' and 'from_bytes()' to obtain PasswordHistory
+    object, and 'to_bytes()' to serialize it.
+    """
+
+    def __init__(self: PasswordHistory, key: bytes, stages: list):
+        if len(key) != KEY_SIZE or not 0 < len(stages) <= MAX_STAGES:
+            raise ValueError('Invalid password history parameters')
+
+        self._key = key
+        self._stages = stages
+
+        # Stage count and (stage, position) of bits set since the history was
+        # created, read or its changes were last cleared.
+        self._base = len(stages)
+        self._changed = list()
+
+    def __contains__(self: PasswordHistory, password: str) -> bool:
+        first, second = self._hashes(password)
+        found = 0
+
+        # All bits of all stages are checked, so the time taken does not
+        # depend on the password.
+        for stage in self._stages:
+            in_stage = 1
+            for position in stage.positions(first, second):
+                in_stage &= stage.bits[position >> 3] >> (position & 7)
+            found |= in_stage
+
+        return bool(found & 1)
+
+    @classmethod
+    def new(
+            cls,
+            capacity: int = DEFAULT_CAPACITY,
+            rate: float = FALSE_POSITIVE_RATE
+            ) -> PasswordHistory:
+        """Return new empty history sized for given number of passwords and
+        false match rate, with a random key.
+        """
+
+        if capacity < 1 or not 0 < rate < 1:
+            raise ValueError('Invalid password history parameters')
+
+        return cls(
+            os.urandom(KEY_SIZE),
+            [_Stage.new(capacity, rate * (1 - TIGHTENING))]
+            )
+
+    @classmethod
+    def from_bytes(cls, data) -> PasswordHistory:
+        """Return history serialized with 'to_bytes()'. Raises ValueError if
+        data is malformed.
+        """
+
+        data = bytes(data)
+
+        if len(data) < _STAGES.size + KEY_SIZE:
+            raise ValueError('Password history is corrupted')
+
+        (count, ) = _STAGES.unpack_from(data, 0)
+        key = data[_STAGES.size:_STAGES.size + KEY_SIZE]
+        offset = _STAGES.size + KEY_SIZE
+        stages = list()
+
+        for _ in range(count):
+            if len(data) < offset + _STAGE.size:
+                raise ValueError('Password history is corrupted')
+
+            size, hashes, capacity = _STAGE.unpack_from(data, offset)
+            offset += _STAGE.size
+
+            if not size or size % 8 or len(data) < offset + size // 8:
+                raise ValueError('Password history is corrupted')
+
+            stages.append(_Stage(
+                bytearray(data[offset:offset + size // 8]),
+                hashes,
+                capacity
+                ))
+            offset += size // 8
+
+        if offset != len(data):
+            raise ValueError('Password history is corrupted')
+
+        return cls(key, stages)
+
+    def to_bytes(self: PasswordHistory) -> bytes:
+        """Return history serialized as stage count (uint8) | key | stages.
+        """
+
+        return _STAGES.pack(len(self._stages)) + self._key + b''.join(
+            stage.to_bytes() for stage in self._stages
+            )
+
+    @property
+    def changed(self: PasswordHistory) -> bool:
+        """Return whether or not history changed since it was created, read
+        or its changes were last cleared.
+        """
+
+        return bool(self._changed) or len(self._stages) != self._base
+
+    def changes(self: PasswordHistory) -> bytes:
+        """Return changes of the history since it was created, read or its
+        changes were last cleared, serialized as stage count before the
+        changes (uint8) | new stage count (uint8) | set bit count (uint32) |
+        new stages without their bits | set bits of stage (uint8) | position
+        (uint32).
+        """
+
+        return _CHANGES.pack(
+            self._base,
+            len(self._stages) - self._base,
+            len(self._changed)
+            ) + b''.join(
+                stage.to_bytes()[:_STAGE.size]
+                for stage in self._stages[self._base:]
+                ) + b''.join(_BIT.pack(*bit) for bit in self._changed)
+
+    def clear_changes(self: PasswordHistory):
+        """Forget changes of the history, e.g. once they are saved.
+        """
+
+        self._base = len(self._stages)
+        self._changed.clear()
+
+    def apply_changes(self: PasswordHistory, data):
+        """Apply changes of a history returned by 'changes()' to this history,
+        which has to be the history they were taken from, as it was before
+        them. Applied changes are not tracked as changes of this history.
+        Raises ValueError if changes are malformed or do not fit the history.
+        """
+
+        data = bytes(data)
+
+        if len(data) < _CHANGES.size:
+            raise ValueError('Password history is corrupted')
+
+        base, stages, bits = _CHANGES.unpack_from(data, 0)
+        offset = _CHANGES.size
+
+        if base != len(self._stages) or base + stages > MAX_STAGES \
+                or len(data) != offset + stages * _STAGE.size \
+                + bits * _BIT.size:
+            raise ValueError('Password history is corrupted')
+
+        for _ in range(stages):
+            size, hashes, capacity = _STAGE.unpack_from(data, offset)
+            offset += _STAGE.size
+
+            if not size or size % 8:
+                raise ValueError('Password history is corrupted')
+
+            self._stages.append(
+                _Stage(bytearray(size // 8), hashes, capacity)
+                )
+
+        for stage, position in _BIT.iter_unpack(data[offset:]):
+            if stage >= len(self._stages) \
+                    or position >= self._stages[stage].size:
+                raise ValueError('Password history is corrupted')
+
+            self._stages[stage].set_bit(position)
+
+        self.clear_changes()
+
+    def copy(self: PasswordHistory) -> PasswordHistory:
+        """Return independent copy of the history.
+        """
+
+        return PasswordHistory(self._key, [
+            _Stage(bytearray(stage.bits), stage.hashes, stage.capacity)
+            for stage in self._stages
+            ])
+
+    @property
+    def size(self: PasswordHistory) -> int:
+        """Return size of the history in bits.
+        """
+
+        return sum(stage.size for stage in self._stages)
+
+    def merge(self: PasswordHistory, other: PasswordHistory) -> bool:
+        """Add all passwords of the other history, which has to share the key
+        and the stages of this one, to this history. Stages the other history
+        has beyond those of this one are copied. Returns whether or not any
+        bit changed. Raises ValueError if histories are not compatible.
+        """
+
+        if not hmac.compare_digest(self._key, other._key) or any(
+                (mine.size, mine.hashes, mine.capacity)
+                != (theirs.size, theirs.hashes, theirs.capacity)
+                for mine, theirs in zip(self._stages, other._stages)
+                ):
+            raise ValueError('Password histories can not be merged')
+
+        changed = False
+
+        for theirs in other._stages[len(self._stages):]:
+            self._stages.append(_Stage(
+                bytearray(len(theirs.bits)),
+                theirs.hashes,
+                theirs.capacity
+                ))
+            changed = True
+
+        for number, stages in enumerate(zip(self._stages, other._stages)):
+            mine, theirs = stages
+            bits = int.from_bytes(mine.bits, 'little')
+            new = int.from_bytes(theirs.bits, 'little') & ~bits
+
+            if new:
+                mine.bits[:] = (bits | new).to_bytes(len(mine.bits), 'little')
+                mine.set += bin(new).count('1')
+                changed = True
+
+            # Newly set bits are tracked one by one, lowest first.
+            while new:
+                position = (new & -new).bit_length() - 1
+                self._changed.append((number, position))
+                new &= new - 1
+
+        return changed
+
+    def _hashes(self: PasswordHistory, password: str) -> tuple:
+        """Return the two hashes bit positions of the password are derived
+        from.
+        """
+
+        return _POSITIONS.unpack(hmac.new(
+            self._key,
+            password.encode('utf-8'),
+            hl.sha256
+            ).digest()[:_POSITIONS.size])
+
+    def add(self: PasswordHistory, password: str) -> bool:
+        """Add password to the history. Returns whether or not any bit was
+        set, i.e. False if the password is already in the history (or a
+        false match).
+        """
+
+        if password in self:
+            return False
+
+        stage = self._stages[-1]
+
+        if stage.full and len(self._stages) < MAX_STAGES:
+            stage = _Stage.new(
+                stage.capacity * GROWTH,
+                FALSE_POSITIVE_RATE * (1 - TIGHTENING)
+                * TIGHTENING ** len(self._stages)
+                )
+            self._stages.append(stage)
+
+        first, second = self._hashes(password)
+        number = len(self._stages) - 1
+
+        for position in stage.positions(first, second):
+            if stage.set_bit(position):
+                self._changed.append((number, position))
+
+        return True
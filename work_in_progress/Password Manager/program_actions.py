@@ -38,10 +38,24 @@
 # ==============================================================================
 
 from cryptography.fernet import Fernet
-from sys import stderr
-import base64 as b64
+from sys import stderr, stdout
+import agent as ag
+import breach_check as bc
+import csv_import as ci
+import diceware as dw
 import hashlib as hl
+import kdf
+import key_cache as kc
+import os
+import password_generator as pg
+import rekey as rk
+import reuse_audit as ra
+import trigram_index as ti
 import validators as vd
+import vault as vt
+import vault_ciphers as vcp
+import vault_codecs as vc
+import vault_sync as vs
 
 
 # ==============================================================================
@@ -62,23 +76,63 @@ def _get_hashed_password(password: str) -> str:
 
     return hl.sha256(password.encode('utf-8')).hexdigest()
 
-def _get_fernet_key(password: str) -> bytes:
+def _get_fernet_key(password: str, parameters: bytes) -> bytes:
     """Returns Fernet key from password string.
 
-    This function takes a password string and returns a Fernet key from it.
-    The hashing algorithm used is sha256.
+    This function takes a password string and returns a Fernet key derived
+    from it with the key derivation function, cost and salt given by the key
+    derivation parameters (see kdf.py).
 
     Args:
         password (str): password string to be hashed.
+        parameters (bytes): serialized key derivation parameters.
 
     Returns:
         bytes: Fernet key.
     """
-    hlib = hl.md5()
-    hlib.update(_get_hashed_password(password).encode('utf-8'))
-    return b64.urlsafe_b64encode(hlib.hexdigest().encode('latin-1'))
 
-def _encrypt_content(content: str, password: str) -> bytes:
+    return kdf.derive_key(password, kdf.KdfParameters.from_bytes(parameters))
+
+def _get_fernet(
+        password: str,
+        parameters: bytes,
+        key_cache: kc.KeyCache = None
+        ) -> Fernet:
+    """Returns Fernet object for password string.
+
+    If key cache is supplied, Fernet object is taken from the cache, so the key
+    is derived only once per password for the lifetime of the cache. Otherwise
+    key is derived and new Fernet object is built on every call.
+
+    Args:
+        password (str): password string to be used for encryption.
+        parameters (bytes): serialized key derivation parameters.
+        key_cache (KeyCache): optional cache of derived keys.
+
+    Returns:
+        Fernet: Fernet object.
+    """
+
+    if key_cache is None:
+        return Fernet(_get_fernet_key(password, parameters))
+
+    return key_cache.fernet(password, parameters)
+
+def _new_key_cache() -> kc.KeyCache:
+    """Returns new key cache that derives keys using _get_fernet_key.
+
+    Returns:
+        KeyCache: empty key cache.
+    """
+
+    return kc.KeyCache(_get_fernet_key)
+
+def _encrypt_content(
+        content: str,
+        password: str,
+        parameters: bytes,
+        key_cache: kc.KeyCache = None
+        ) -> bytes:
     """Returns encrypted content.
 
     This function takes a content string and a password string and returns
@@ -87,14 +141,23 @@ def _encrypt_content(content: str, password: str) -> bytes:
     Args:
         content (str): content string to be encrypted.
         password (str): password string to be used for encryption.
+        parameters (bytes): serialized key derivation parameters.
+        key_cache (KeyCache): optional cache of derived keys.
 
     Returns:
         bytes: encrypted content.
     """
 
-    return Fernet(_get_fernet_key(password)).encrypt(content.encode('utf-8'))
+    return _get_fernet(password, parameters, key_cache).encrypt(
+        content.encode('utf-8')
+        )
 
-def _decrypt_content(content: bytes, password: str) -> str:
+def _decrypt_content(
+        content: bytes,
+        password: str,
+        parameters: bytes,
+        key_cache: kc.KeyCache = None
+        ) -> str:
     """Returns decrypted content.
 
     This function takes a content string and a password string and returns
@@ -103,12 +166,16 @@ def _decrypt_content(content: bytes, password: str) -> str:
     Args:
         content (bytes): content string to be decrypted.
         password (str): password string to be used for decryption.
+        parameters (bytes): serialized key derivation parameters.
+        key_cache (KeyCache): optional cache of derived keys.
 
     Returns:
         str: decrypted content.
     """
 
-    return Fernet(_get_fernet_key(password)).decrypt(content).decode('utf-8')
+    return _get_fernet(password, parameters, key_cache).decrypt(
+        content
+        ).decode('utf-8')
 
 
 # ==============================================================================
@@ -259,8 +326,10 @@ class ShowVersionAction(ProgramAction):
         self._exit_app(self._exit_codes['noerr'])
 
 
-class CreateDatabaseAction(ProgramAction):
-    """Program action that creates new database file.
+class DatabaseAction(ProgramAction):
+    """Abstract base class for all program actions operating on the password
+    database file. It holds user supplied options and the key cache used for
+    the lifetime of the action.
     """
 
     required_options = (
@@ -268,9 +337,20 @@ class CreateDatabaseAction(ProgramAction):
         'passphrase',
         )
 
+    # Whether or not the action can be served by the unlock agent, in which
+    # case passphrase is needed only if the agent is not running.
+    uses_agent = False
+
+    # Whether or not the action works with the password database at all.
+    uses_database = True
+
     def __init__(self, exitf):
         super().__init__(exitf)
         self._user_options = dict()
+        self._key_cache = _new_key_cache()
+
+        self._exit_codes['vault_error'] = 2
+        self._exit_codes['entry_error'] = 3
 
     def addAppName(self, name):
         """Setter method for application name string. If non string value
@@ -321,88 +401,230 @@ class CreateDatabaseAction(ProgramAction):
 
         self._user_options[name] = option
 
-    def execute(self):
-        """Execute create database action code.
+    def _option(self, name):
+        """Return first value of the user option with given name, or None if
+        option was not supplied.
         """
 
-        print('{0}: Password databse file: {1}'.format(
-            self._attributes['appname'],
-            self._user_options['ps_db_file'].input.data[0],
-            ))
-        print('{0}: Password: {1}'.format(
-            self._attributes['appname'],
-            self._user_options['passphrase'].input.data[0],
-            ))
+        option = self._user_options.get(name)
 
+        if option is None or option.input.isNone():
+            return None
 
-class MainAction(ProgramAction):
-    """Program action that wraps some specific code to be executed based on
-    command line input. In this particular case it prints simple message
-    to the stdout.
-    """
+        return option.input.data[0]
 
-    required_options = (
-        'ps_db_file',
-        'passphrase',
-        )
+    def _kdf_parameters(self, path=None):
+        """Return key derivation parameters of the password database file, or
+        of the database file with given path. On failure it exits the app
+        with an error message.
+        """
 
-    def __init__(self, exitf):
-        super().__init__(exitf)
-        self._user_options = dict()
+        try:
+            return vt.read_header(
+                path or self._option('ps_db_file')
+                ).kdf_parameters
 
-    def addAppName(self, name):
-        """Setter method for application name string. If non string value
-        passed it raise a TypeError exception.
+        except (OSError, ValueError) as error:
+            self._fail(
+                'Can not open password database file: {0}'.format(error),
+                'vault_error'
+                )
 
-        This attribute is mandatory.
+    def _derive(self, passphrase, parameters=None):
+        """Return key material for given passphrase, derived with given key
+        derivation parameters or those of the password database file.
         """
 
-        self._new_attribute('appname', str, name)
+        if parameters is None:
+            parameters = self._kdf_parameters()
 
-    def addUserOption(self, name, option, error_code=None):
-        """Method for adding user input options passed as command line
-        arguments and accompanying validators.
+        return self._key_cache.material(passphrase, parameters.to_bytes())
+
+    def _key_material(self, parameters=None):
+        """Return key material for the user supplied passphrase, derived with
+        given key derivation parameters or those of the password database
+        file. If passphrase was not supplied it exits the app with an error
+        message.
         """
-        # Typechecking ...
-        if not isinstance(name, str):
-            raise TypeError(
-                'Trying to pass non \'string\' value as argument '
-                + '\'{0}({1})\''.format(type(name).__name__, name)
+
+        if self._option('passphrase') is None:
+            self._fail(
+                'Passphrase is required unless the password database is '
+                + 'unlocked by the agent',
+                'vault_error'
                 )
 
-        if not isinstance(option, vd.ProgramOption):
-            raise TypeError(
-                'Trying to pass non \'ProgramOption\' object as argument '
-                + '\'{0}({1})\''.format(type(option).__name__, option)
+        return self._derive(self._option('passphrase'), parameters)
+
+    def _fail(self, message, exit_code='unknown_error'):
+        """Print error message to the stderr, wipe key material and exit the
+        app with given exit code.
+        """
+
+        print(
+            '{0}: {1}'.format(self._attributes['appname'], message),
+            file=stderr
+            )
+
+        self._key_cache.close()
+        self._exit_app(self._exit_codes[exit_code])
+
+    def _finish(self):
+        """Wipe key material and exit the app with no error.
+        """
+
+        self._key_cache.close()
+        self._exit_app(self._exit_codes['noerr'])
+
+    def _check_passphrase(self):
+        """Check the user supplied passphrase against the key slots of the
+        password database file, without reading any record. If passphrase
+        does not unlock the database it exits the app with an error message.
+        """
+
+        try:
+            unlocks = vt.Vault.check_passphrase(
+                self._option('ps_db_file'),
+                self._key_material()
                 )
 
-        if error_code is not None:
-            if not isinstance(error_code, int):
-                raise TypeError(
-                    'Trying to pass non \'int\' value as argument '
-                    + '\'{0}({1})\''.format(
-                        type(error_code).__name__,
-                        error_code
-                        )
+        except (OSError, ValueError) as error:
+            self._fail(
+                'Can not open password database file: {0}'.format(error),
+                'vault_error'
+                )
+
+        if not unlocks:
+            self._fail(
+                'Invalid passphrase for password database file',
+                'vault_error'
+                )
+
+    def _open_vault(self):
+        """Open password vault given by the user options. Actions that can be
+        served by the unlock agent get the agent's vault if the agent serves
+        it, but passphrase supplied by the user still has to unlock the
+        vault. On failure it exits the app with an error message.
+        """
+
+        if type(self).uses_agent:
+            vault = ag.AgentVault.connect(
+                ag.socket_path(),
+                self._option('ps_db_file')
+                )
+            if vault is not None:
+                if self._option('passphrase') is not None:
+                    self._check_passphrase()
+                return vault
+
+        try:
+            return vt.Vault.open(self._option('ps_db_file'), self._key_material())
+
+        except (OSError, ValueError) as error:
+            self._fail(
+                'Can not open password database file: {0}'.format(error),
+                'vault_error'
+                )
+
+    def _lock_agent(self):
+        """Stop the unlock agent if it serves the password database, since
+        it would keep serving it with stale key material.
+        """
+
+        agent = ag.AgentVault.connect(
+            ag.socket_path(),
+            self._option('ps_db_file')
+            )
+
+        if agent is not None:
+            agent.lock()
+
+    def validateOptionArguments(self):
+        """Check if all required options are supplied and validate their
+        arguments. If any of the options fails validation it prints an error
+        message and exits the app.
+        """
+
+        # Check if all required program options are supplied.
+        for required in type(self).required_options:
+            if not required in self._user_options.keys():
+                raise ValueError('Missing program option \'{0}\''
+                    .format(required)
                     )
 
-            if error_code in self._exit_codes.values():
-                raise ValueError(
-                    'Exit code with given value \'{0}\' already exists'\
-                    .format(error_code)
+        for name, option in self._user_options.items():
+            if not option.validate():
+                print(
+                    '{0}: Invalid option argument for option \'{1}\'. {2}'\
+                    .format(
+                        self._attributes['appname'],
+                        name,
+                        option.validator.message
+                        ),
+                    file=stderr
                     )
 
-            self._exit_codes[name] = error_code
+                if self._exit_codes[name] is None:
+                    self._exit_app(self._exit_codes['unknown_error'])
+                else:
+                    self._exit_app(self._exit_codes[name])
 
-        else:
-            self._exit_codes[name] = None
 
-        self._user_options[name] = option
+class CreateDatabaseAction(DatabaseAction):
+    """Program action that creates new database file.
+    """
+
+    def execute(self):
+        """Execute create database action code.
+        """
+
+        try:
+            parameters = kdf.KdfParameters.new(
+                self._option('kdf') or kdf.DEFAULT_KDF,
+                self._option('kdf_cost')
+                )
+
+        except ValueError as error:
+            self._fail(str(error), 'vault_error')
+
+        try:
+            vt.Vault.create(
+                self._option('ps_db_file'),
+                self._key_material(parameters),
+                self._option('member') or vt.OWNER,
+                self._option('codec') or vc.DEFAULT_CODEC,
+                self._option('cipher') or vcp.DEFAULT_CIPHER,
+                parameters
+                ).close()
+
+        except OSError as error:
+            self._fail(
+                'Can not create password database file: {0}'.format(error),
+                'vault_error'
+                )
+
+        print('{0}: Created password database file: {1}'.format(
+            self._attributes['appname'],
+            self._option('ps_db_file'),
+            ))
+
+        self._finish()
+
+
+class MainAction(DatabaseAction):
+    """Program action that wraps some specific code to be executed based on
+    command line input. In this particular case it prints simple message
+    to the stdout.
+    """
 
     def execute(self):
         """TODO: Put method docstring HERE.
         """
 
+        # Reject wrong passphrase right after key derivation, reading only
+        # the vault preamble and key slots.
+        self._check_passphrase()
+
         print('{0}: Password databse file: {1}'.format(
             self._attributes['appname'],
             self._user_options['ps_db_file'].input.data[0],
@@ -423,14 +645,15 @@ class MainAction(ProgramAction):
             ))
         print('{0}: Fernet key: {1}'.format(
             self._attributes['appname'],
-            _get_fernet_key(
-                self._user_options['passphrase'].input.data[0]
-                ).decode('utf-8')
+            self._key_material().key.decode('utf-8')
             ))
 
+        parameters = self._kdf_parameters().to_bytes()
         encrypted_content = _encrypt_content(
             content,
-            self._user_options['passphrase'].input.data[0]
+            self._user_options['passphrase'].input.data[0],
+            parameters,
+            self._key_cache
             )
 
         print('{0}: Encrypted content: {1}'.format(
@@ -440,7 +663,9 @@ class MainAction(ProgramAction):
 
         decrypted_content = _decrypt_content(
             encrypted_content,
-            self._user_options['passphrase'].input.data[0]
+            self._user_options['passphrase'].input.data[0],
+            parameters,
+            self._key_cache
             )
 
         print('{0}: Decrypted content: {1}'.format(
@@ -448,33 +673,802 @@ class MainAction(ProgramAction):
             decrypted_content
             ))
 
+        # We are done with the key material. Wipe it before exiting.
+        self._key_cache.close()
+
         # Exit with no error.
         self._exit_app(self._exit_codes['noerr'])
 
-    def validateOptionArguments(self):
-        """TODO: Put method docstring HERE.
+
+class GetEntryAction(DatabaseAction):
+    """Program action that prints single password database entry to the
+    stdout. Only the requested entry is decrypted.
+    """
+
+    required_options = DatabaseAction.required_options + ('title', )
+    uses_agent = True
+
+    def execute(self):
+        """Execute get entry action code.
         """
 
-        # Check if all required program options are supplied.
-        for required in MainAction.required_options:
-            if not required in self._user_options.keys():
-                raise ValueError('Missing program option \'{0}\''
-                    .format(required)
-                    )
+        vault = self._open_vault()
 
-        for name, option in self._user_options.items():
-            if not option.validate():
-                print(
-                    '{0}: Invalid option argument for option \'{1}\'. {2}'\
-                    .format(
-                        self._attributes['appname'],
-                        name,
-                        option.validator.message
-                        ),
-                    file=stderr
+        try:
+            entry = vault.get(self._option('title'))
+
+        except KeyError:
+            self._fail(
+                'No entry with title "{0}"'.format(self._option('title')),
+                'entry_error'
+                )
+
+        finally:
+            vault.close()
+
+        for field in vt.ENTRY_FIELDS:
+            print('{0}: {1}'.format(field, entry.get(field, '')))
+
+        self._finish()
+
+
+class ListEntriesAction(DatabaseAction):
+    """Program action that prints titles of all password database entries to
+    the stdout.
+    """
+
+    uses_agent = True
+
+    def execute(self):
+        """Execute list entries action code.
+        """
+
+        vault = self._open_vault()
+
+        try:
+            titles = sorted(entry['title'] for entry in vault.entries())
+
+        finally:
+            vault.close()
+
+        for title in titles:
+            print(title)
+
+        self._finish()
+
+
+class SearchEntriesAction(DatabaseAction):
+    """Program action that prints titles of password database entries whose
+    title, URL or user name matches the search query. Entries are looked up
+    through the blind index, so only records of matching entries are
+    decrypted. Fuzzy search prints titles of entries whose title or URL
+    resembles the query, best matches first.
+    """
+
+    required_options = DatabaseAction.required_options + ('query', 'field')
+    uses_agent = True
+
+    def execute(self):
+        """Execute search entries action code.
+        """
+
+        vault = self._open_vault()
+
+        try:
+            if self._option('fuzzy'):
+                titles = [
+                    title for title, _ in vault.fuzzy_search(
+                        self._option('query'),
+                        self._option('limit') or ti.DEFAULT_LIMIT
+                        )
+                    ]
+            else:
+                titles = sorted(
+                    entry['title'] for entry in vault.search(
+                        self._option('field'),
+                        self._option('query'),
+                        bool(self._option('prefix'))
+                        )
                     )
 
-                if self._exit_codes[name] is None:
-                    self._exit_app(self._exit_codes['unknown_error'])
-                else:
-                    self._exit_app(self._exit_codes[name])
+        except ValueError as error:
+            self._fail(str(error), 'entry_error')
+
+        finally:
+            vault.close()
+
+        for title in titles:
+            print(title)
+
+        self._finish()
+
+
+class AuditBreachedAction(DatabaseAction):
+    """Program action that prints titles of password database entries whose
+    password was seen in breaches, together with the number of times it was
+    seen, most breached first. Passwords are checked offline against the
+    locally stored Pwned Passwords SHA-1 file ordered by hash, which is
+    memory mapped and binary searched in place. Fan-out index of the file is
+    built first if requested.
+    """
+
+    required_options = DatabaseAction.required_options + ('breach_file', )
+    uses_agent = True
+
+    def execute(self):
+        """Execute audit breached passwords action code.
+        """
+
+        try:
+            if self._option('build_index'):
+                bc.build_index(self._option('breach_file'))
+
+            pwned = bc.BreachFile(self._option('breach_file'))
+
+        except OSError as error:
+            self._fail(str(error))
+
+        vault = self._open_vault()
+
+        try:
+            breached = bc.audit(vault.entries(), pwned)
+
+        finally:
+            vault.close()
+            pwned.close()
+
+        for title, count in breached:
+            print('{0}: seen {1} times'.format(title, count))
+
+        self._finish()
+
+
+class AuditReuseAction(DatabaseAction):
+    """Program action that prints groups of password database entries sharing
+    the same password, followed by groups of entries with similar passwords
+    (e.g. differing only in a trailing digit). Groups are printed one per
+    line, most entries first.
+    """
+
+    uses_agent = True
+
+    def execute(self):
+        """Execute audit password reuse action code.
+        """
+
+        vault = self._open_vault()
+
+        try:
+            for kind, titles in ra.audit(vault.entries()):
+                print('{0}: {1}'.format(kind, ', '.join(titles)), flush=True)
+
+        except BrokenPipeError:
+            # Reader of the output (e.g. head) has seen enough.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), stdout.fileno())
+
+        finally:
+            vault.close()
+
+        self._finish()
+
+
+class _ModifyEntryAction(DatabaseAction):
+    """Abstract base class for program actions that modify single password
+    database entry. Derived classes implement 'modify()' method which applies
+    change to the opened vault.
+    """
+
+    required_options = DatabaseAction.required_options + ('title', )
+    uses_agent = True
+
+    def _entry_fields(self):
+        """Return dictionary of entry fields supplied as user options.
+        """
+
+        fields = dict()
+
+        for field in vt.ENTRY_FIELDS:
+            value = self._option(field)
+            if value is not None:
+                fields[field] = value
+
+        return fields
+
+    def modify(self, vault):
+        """Virtual method applying change to the vault. It has to be overriden
+        in all derived classes.
+        """
+
+        raise NotImplementedError(
+            'Override this method in derived class'
+            )
+
+    def execute(self):
+        """Execute modify entry action code.
+        """
+
+        vault = self._open_vault()
+
+        try:
+            self.modify(vault)
+            vault.save()
+
+        except KeyError:
+            self._fail(
+                'No entry with title "{0}"'.format(self._option('title')),
+                'entry_error'
+                )
+
+        except ValueError as error:
+            self._fail(str(error), 'entry_error')
+
+        # Reported the same way whether the vault is saved here or by the
+        # agent, which sends its error message back.
+        except OSError as error:
+            self._fail(
+                'Can not save password database file: {0}'.format(error),
+                'vault_error'
+                )
+
+        finally:
+            vault.close()
+
+        self._finish()
+
+
+class AddEntryAction(_ModifyEntryAction):
+    """Program action that adds new entry to the password database.
+    """
+
+    def modify(self, vault):
+        """Add new entry to the vault.
+        """
+
+        vault.add(vt.new_entry(**self._entry_fields()))
+
+
+class UpdateEntryAction(_ModifyEntryAction):
+    """Program action that updates fields of an existing password database
+    entry. Fields not supplied by the user keep their values.
+    """
+
+    def modify(self, vault):
+        """Update existing entry in the vault.
+        """
+
+        entry = vault.get(self._option('title'))
+        entry.update(self._entry_fields())
+        vault.update(entry)
+
+
+class DeleteEntryAction(_ModifyEntryAction):
+    """Program action that removes an entry from the password database.
+    """
+
+    def modify(self, vault):
+        """Remove entry from the vault.
+        """
+
+        vault.delete(self._option('title'))
+
+
+class CompactDatabaseAction(DatabaseAction):
+    """Program action that compacts password database file, reclaiming space
+    taken by superseded records and removed entries.
+    """
+
+    def execute(self):
+        """Execute compact database action code.
+        """
+
+        vault = self._open_vault()
+
+        try:
+            before = os.path.getsize(self._option('ps_db_file'))
+            vault.compact()
+            after = os.path.getsize(self._option('ps_db_file'))
+
+        except (OSError, ValueError) as error:
+            self._fail(
+                'Can not compact password database file: {0}'.format(error),
+                'vault_error'
+                )
+
+        finally:
+            vault.close()
+
+        print('{0}: Compacted password database file: {1} -> {2} bytes'.format(
+            self._attributes['appname'],
+            before,
+            after
+            ))
+
+        self._finish()
+
+
+class ImportEntriesAction(DatabaseAction):
+    """Program action that imports entries from a browser password export
+    (CSV file) into the password database. Entries are encrypted in parallel
+    and written to the database with a single save.
+    """
+
+    required_options = DatabaseAction.required_options + ('csv_file', 'workers')
+
+    def execute(self):
+        """Execute import entries action code.
+        """
+
+        vault = self._open_vault()
+
+        try:
+            report = ci.import_csv(
+                self._option('csv_file'),
+                vault,
+                self._option('workers')
+                )
+            vault.save()
+
+        except (OSError, ValueError) as error:
+            self._fail(
+                'Can not import entries: {0}'.format(error),
+                'entry_error'
+                )
+
+        finally:
+            vault.close()
+
+        for line, message in report.skipped:
+            print(
+                '{0}: Skipped line {1}: {2}'.format(
+                    self._attributes['appname'],
+                    line,
+                    message
+                    ),
+                file=stderr
+                )
+
+        print('{0}: Imported {1} entries'.format(
+            self._attributes['appname'],
+            report.imported
+            ))
+
+        self._finish()
+
+
+class StartAgentAction(DatabaseAction):
+    """Program action that unlocks password database and starts the unlock
+    agent serving it. Unless asked to stay in the foreground, agent runs in a
+    background process and the action returns as soon as the agent accepts
+    connections.
+    """
+
+    required_options = DatabaseAction.required_options + (
+        'timeout',
+        'foreground',
+        )
+
+    def execute(self):
+        """Execute start agent action code.
+        """
+
+        path = ag.socket_path()
+
+        try:
+            # Agent gets its own copy of the key material, since the key
+            # cache of the action is wiped when the action finishes.
+            server = ag.AgentServer(
+                path,
+                self._option('ps_db_file'),
+                kc.KeyMaterial(bytes(self._key_material().key)),
+                self._option('timeout')
+                )
+
+        except (OSError, ValueError) as error:
+            self._fail(
+                'Can not start agent: {0}'.format(error),
+                'vault_error'
+                )
+
+        print('{0}={1}; export {0};'.format(ag.SOCKET_ENV, path), flush=True)
+
+        if self._option('foreground'):
+            self._key_cache.close()
+            server.serve()
+            self._finish()
+
+        if os.fork() == 0:
+            # Agent process. Detach from the terminal and serve.
+            os.setsid()
+            self._key_cache.close()
+            devnull = os.open(os.devnull, os.O_RDWR)
+            for descriptor in (0, 1, 2):
+                os.dup2(devnull, descriptor)
+            try:
+                server.serve()
+            finally:
+                os._exit(0)
+
+        self._finish()
+
+
+class LockAgentAction(DatabaseAction):
+    """Program action that stops the unlock agent serving the password
+    database, wiping its key material.
+    """
+
+    required_options = ('ps_db_file', )
+    uses_agent = True
+
+    def execute(self):
+        """Execute lock agent action code.
+        """
+
+        vault = ag.AgentVault.connect(
+            ag.socket_path(),
+            self._option('ps_db_file')
+            )
+
+        if vault is None:
+            self._fail(
+                'No agent serves password database file: {0}'.format(
+                    self._option('ps_db_file')
+                    ),
+                'vault_error'
+                )
+
+        vault.lock()
+
+        print('{0}: Locked password database file: {1}'.format(
+            self._attributes['appname'],
+            self._option('ps_db_file')
+            ))
+
+        self._finish()
+
+
+class RekeyDatabaseAction(DatabaseAction):
+    """Program action that re-encrypts password database under a new random
+    data key, wrapped with the new passphrase if one is given. Records are
+    re-encrypted in parallel and the database file is replaced atomically once
+    all of them are written. Interrupted rekey resumes where it stopped when
+    run again.
+    """
+
+    required_options = DatabaseAction.required_options + (
+        'new_passphrase',
+        'workers',
+        )
+
+    def execute(self):
+        """Execute rekey database action code.
+        """
+
+        self._lock_agent()
+
+        if self._option('new_passphrase') is None:
+            new_material = self._key_material()
+        else:
+            new_material = self._derive(self._option('new_passphrase'))
+
+        try:
+            written, resumed = rk.rekey(
+                self._option('ps_db_file'),
+                self._key_material(),
+                new_material,
+                self._option('workers'),
+                cipher=self._option('cipher')
+                )
+
+        except (OSError, ValueError) as error:
+            self._fail(
+                'Can not re-encrypt password database file: {0}'.format(
+                    error
+                    ),
+                'vault_error'
+                )
+
+        print('{0}: Re-encrypted {1} entries ({2} resumed)'.format(
+            self._attributes['appname'],
+            written + resumed,
+            resumed
+            ))
+
+        self._finish()
+
+
+class SyncDatabaseAction(DatabaseAction):
+    """Program action that brings password database and another copy of it
+    to the same state. Copies are compared by Merkle trees of their encrypted
+    records and only differing entries are copied, in either direction.
+    """
+
+    required_options = DatabaseAction.required_options + (
+        'other_file',
+        'other_passphrase',
+        )
+
+    def execute(self):
+        """Execute sync database action code.
+        """
+
+        # Agent would keep serving either copy from a stale mapping.
+        self._lock_agent()
+        agent = ag.AgentVault.connect(
+            ag.socket_path(),
+            self._option('other_file')
+            )
+        if agent is not None:
+            agent.lock()
+
+        vault = self._open_vault()
+
+        other_parameters = self._kdf_parameters(self._option('other_file'))
+
+        if self._option('other_passphrase') is None:
+            other_material = self._key_material(other_parameters)
+        else:
+            other_material = self._derive(
+                self._option('other_passphrase'),
+                other_parameters
+                )
+
+        try:
+            with vt.Vault.open(self._option('other_file'), other_material) \
+                    as other:
+                report = vs.sync(vault, other)
+
+        except (OSError, ValueError) as error:
+            self._fail(
+                'Can not sync password database files: {0}'.format(error),
+                'vault_error'
+                )
+
+        finally:
+            vault.close()
+
+        print(
+            '{0}: Copied {1} entries from the other copy and {2} to it '
+            .format(
+                self._attributes['appname'],
+                report.to_first,
+                report.to_second
+                )
+            + '({0} conflicts)'.format(report.conflicts)
+            )
+
+        self._finish()
+
+
+class ChangePassphraseAction(DatabaseAction):
+    """Program action that changes passphrase of the password database. Only
+    the wrapped data key is rewritten, so it takes the same time whatever the
+    size of the database.
+    """
+
+    required_options = DatabaseAction.required_options + ('new_passphrase', )
+
+    def execute(self):
+        """Execute change passphrase action code.
+        """
+
+        self._lock_agent()
+        vault = self._open_vault()
+
+        try:
+            vault.change_passphrase(
+                self._derive(self._option('new_passphrase'))
+                )
+
+        except (OSError, ValueError) as error:
+            self._fail(
+                'Can not change passphrase: {0}'.format(error),
+                'vault_error'
+                )
+
+        finally:
+            vault.close()
+
+        print('{0}: Changed passphrase of password database file: {1}'.format(
+            self._attributes['appname'],
+            self._option('ps_db_file')
+            ))
+
+        self._finish()
+
+
+class AddMemberAction(DatabaseAction):
+    """Program action that gives new member access to the password database
+    by wrapping the data key with the member's passphrase. Records are not
+    re-encrypted.
+    """
+
+    required_options = DatabaseAction.required_options + (
+        'member',
+        'member_passphrase',
+        )
+
+    def execute(self):
+        """Execute add member action code.
+        """
+
+        vault = self._open_vault()
+
+        try:
+            vault.add_member(
+                self._option('member'),
+                self._derive(self._option('member_passphrase'))
+                )
+
+        except ValueError as error:
+            self._fail(str(error), 'entry_error')
+
+        except OSError as error:
+            self._fail(
+                'Can not add member: {0}'.format(error),
+                'vault_error'
+                )
+
+        finally:
+            vault.close()
+
+        print('{0}: Added member "{1}" to password database file: {2}'.format(
+            self._attributes['appname'],
+            self._option('member'),
+            self._option('ps_db_file')
+            ))
+
+        self._finish()
+
+
+class RemoveMemberAction(DatabaseAction):
+    """Program action that removes member's access to the password database.
+    Records are not re-encrypted, so rekey the database if the member may
+    have kept a copy of the data key.
+    """
+
+    required_options = DatabaseAction.required_options + ('member', )
+
+    def execute(self):
+        """Execute remove member action code.
+        """
+
+        vault = self._open_vault()
+
+        try:
+            vault.remove_member(self._option('member'))
+
+        except KeyError:
+            self._fail(
+                'No member with name "{0}"'.format(self._option('member')),
+                'entry_error'
+                )
+
+        except ValueError as error:
+            self._fail(str(error), 'entry_error')
+
+        except OSError as error:
+            self._fail(
+                'Can not remove member: {0}'.format(error),
+                'vault_error'
+                )
+
+        finally:
+            vault.close()
+
+        print(
+            '{0}: Removed member "{1}" from password database file: {2}'
+            .format(
+                self._attributes['appname'],
+                self._option('member'),
+                self._option('ps_db_file')
+                )
+            )
+
+        self._finish()
+
+
+class GeneratePasswordsAction(DatabaseAction):
+    """Program action that prints randomly generated passwords to the stdout,
+    one per line. Passwords are generated and written in batches, so any
+    number of them can be generated in constant memory. Password database is
+    not used.
+    """
+
+    required_options = ('count', 'length', 'alphabet', 'min_per_class')
+    uses_database = False
+
+    def execute(self):
+        """Execute generate passwords action code.
+        """
+
+        try:
+            for block in pg.generate_lines(
+                    self._option('count'),
+                    self._option('length'),
+                    self._option('alphabet'),
+                    self._option('min_per_class')
+                    ):
+                stdout.buffer.write(block)
+            stdout.flush()
+
+        except ValueError as error:
+            self._fail(str(error))
+
+        except BrokenPipeError:
+            # Reader of the output (e.g. head) has seen enough.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), stdout.fileno())
+
+        self._finish()
+
+
+class GeneratePassphrasesAction(DatabaseAction):
+    """Program action that prints Diceware passphrases made of random words of
+    the user supplied wordlist to the stdout, one per line. Password database
+    is not used.
+    """
+
+    required_options = ('wordlist', 'count', 'words', 'separator')
+    uses_database = False
+
+    def execute(self):
+        """Execute generate passphrases action code.
+        """
+
+        try:
+            with dw.Wordlist(self._option('wordlist')) as wordlist:
+                for block in wordlist.passphrase_lines(
+                        self._option('count'),
+                        self._option('words'),
+                        self._option('separator')
+                        ):
+                    stdout.buffer.write(block)
+                stdout.flush()
+
+        except BrokenPipeError:
+            # Reader of the output (e.g. head) has seen enough.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), stdout.fileno())
+
+        except (OSError, ValueError) as error:
+            self._fail(str(error))
+
+        self._finish()
+
+
+class CalibrateAction(DatabaseAction):
+    """Program action that measures passphrase key derivation on this
+    machine and prints the cost at which unlocking a password database takes
+    about the user supplied time. Password database is not used.
+    """
+
+    required_options = ('unlock_time', 'kdf')
+    uses_database = False
+
+    def execute(self):
+        """Execute calibrate action code.
+        """
+
+        algorithm = self._option('kdf') or kdf.DEFAULT_KDF
+
+        try:
+            cost, elapsed = kdf.calibrate(
+                self._option('unlock_time'),
+                algorithm
+                )
+
+        except ValueError as error:
+            self._fail(str(error))
+
+        print('{0}: {1} with cost {2} unlocks in {3:.0f} ms'.format(
+            self._attributes['appname'],
+            algorithm,
+            cost,
+            elapsed
+            ))
+        print('{0}: Use \'create --kdf {1} --kdf-cost {2}\' to create '
+            'password database file unlocking this fast'.format(
+                self._attributes['appname'],
+                algorithm,
+                cost
+                ))
+
+        self._finish()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""rekey.py - Parallel re-encryption of the vault under a new data key.
+
+Every record of the vault is decrypted with the current data key and sealed
+again (encrypted, tagged and tokenized) with a new random data key, which is
+wrapped with the key material of the new (or the same) passphrase of the
+vault's only member; passphrases of other members are not known, so a vault
+with more than one member is not rekeyed. Changing only the passphrase does
+not need a rekey (see Vault.change_passphrase()), so rekey is meant for
+rotation of a data key that may have been exposed.
+
+Records are processed in batches on a pool of worker processes and written,
+in the order of their tags, to a new vault file next to the original one. New
+vault is saved after every RESUME_INTERVAL records and the identity of the
+original file is stored in a progress file, so an interrupted rekey resumes
+from the last save as long as the original file has not been changed. Once
+all records are written, new vault replaces the original one with an atomic
+rename, unless the original was changed meanwhile (see
+Vault.replace_file()).
+
+Example:
+    >>> rekey('vault.bkp', old_material, new_material, workers=4)
+    (100000, 0)
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * rekey.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import json
+import os
+import key_cache as kc
+import parallel as pl
+import vault as vt
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+DEFAULT_BATCH_SIZE = 256
+RESUME_INTERVAL = 4096
+REKEY_SUFFIX = '.rekey'
+PROGRESS_SUFFIX = '.rekey.json'
+
+
+# ==============================================================================
+# Worker Process Section
+# ==============================================================================
+
+# Old and new key material, record codec and old and new record cipher of the
+# worker process, set up by the pool initializer.
+_worker_materials = None
+_worker_formats = None
+
+def _init_worker(
+        old_key: bytes,
+        new_key: bytes,
+        codec: str,
+        old_cipher: str,
+        new_cipher: str
+        ):
+    """Pool initializer setting up key material and record formats in the
+    worker process.
+    """
+
+    global _worker_materials, _worker_formats
+    _worker_materials = (kc.KeyMaterial(old_key), kc.KeyMaterial(new_key))
+    _worker_formats = (codec, old_cipher, new_cipher)
+
+def _reseal(
+        old: kc.KeyMaterial,
+        new: kc.KeyMaterial,
+        raws: list,
+        codec: str,
+        old_cipher: str,
+        new_cipher: str
+        ) -> list:
+    """Returns list of entries of given raw records, encrypted with the old
+    cipher, sealed with new key material, given codec and the new cipher.
+    """
+
+    return [
+        vt.seal_entry(
+            new,
+            vt.open_entry(old, raw, old_cipher),
+            codec,
+            new_cipher
+            )
+        for raw in raws
+        ]
+
+def _reseal_batch(raws: list) -> list:
+    """Returns list of sealed entries for given batch of raw records. Runs in
+    the worker process.
+    """
+
+    return _reseal(*_worker_materials, raws, *_worker_formats)
+
+
+# ==============================================================================
+# Rekey Functions Section
+# ==============================================================================
+
+def _file_identity(path: str) -> list:
+    """Returns identity of the current state of the file.
+    """
+
+    info = os.stat(path)
+
+    return [info.st_ino, info.st_size, info.st_mtime_ns]
+
+def _resume(
+        path: str,
+        source: vt.Vault,
+        new_material: kc.KeyMaterial,
+        cipher: str = None
+        ) -> vt.Vault:
+    """Returns partially written new vault if rekey of the vault can be
+    resumed, otherwise new empty vault for the member who opened the source
+    vault, encrypted with given cipher or the cipher of the source vault.
+    """
+
+    target = path + REKEY_SUFFIX
+    progress = path + PROGRESS_SUFFIX
+
+    try:
+        with open(progress, 'r', encoding='utf-8') as progress_file:
+            identity = json.load(progress_file).get('source')
+
+        if identity == _file_identity(path):
+            vault = vt.Vault.open(target, new_material)
+            if vault.cipher == (cipher or source.cipher):
+                return vault
+            vault.close()
+
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    for stale in (target, progress):
+        try:
+            os.unlink(stale)
+        except FileNotFoundError:
+            pass
+
+    vault = vt.Vault.create_from(target, new_material, source, cipher)
+
+    with open(progress + '.tmp', 'w', encoding='utf-8') as progress_file:
+        json.dump({'source': _file_identity(path)}, progress_file)
+        progress_file.flush()
+        os.fsync(progress_file.fileno())
+
+    os.replace(progress + '.tmp', progress)
+
+    return vault
+
+def rekey(
+        path: str,
+        old_material: kc.KeyMaterial,
+        new_material: kc.KeyMaterial,
+        workers: int = 1,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        cipher: str = None
+        ) -> tuple:
+    """Re-encrypt vault under a new data key, optionally switching it to
+    another record cipher.
+
+    Raises ValueError if the vault can not be unlocked with the old key
+    material, or if the vault was changed while rekey ran, in which case the
+    vault is kept and the next attempt starts over. Raises ValueError as well
+    if the vault has members other than the one running the rekey: new data
+    key can be wrapped only with key material of known passphrases, so other
+    members have to be removed before the rekey and added again after it.
+
+    Args:
+        path (str): path of the vault file.
+        old_material (KeyMaterial): current passphrase key material.
+        new_material (KeyMaterial): passphrase key material to wrap the new
+            data key with. It may be the current one.
+        workers (int): number of worker processes.
+        batch_size (int): number of records re-encrypted in a single task.
+        cipher (str): name of the record cipher of the re-encrypted vault
+            (see vault_ciphers.py); the current one if not given.
+
+    Returns:
+        tuple: number of re-encrypted records and number of records that
+            were already re-encrypted by an interrupted rekey.
+    """
+
+    with vt.Vault.open(path, old_material) as source:
+        if source.members > 1:
+            raise ValueError(
+                'Vault has other members, remove them before rekey and add '
+                'them again after it'
+                )
+
+        target = _resume(path, source, new_material, cipher)
+
+        try:
+            resumed = len(target)
+            total = len(source)
+            records = (
+                raw for _, raw in islice(source.raw_records(), resumed, None)
+                )
+            batches = pl.batched(records, batch_size)
+            written = resumed
+
+            if workers > 1:
+                executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(
+                        source.material.key,
+                        target.material.key,
+                        target.codec,
+                        source.cipher,
+                        target.cipher
+                        )
+                    )
+                results = pl.ordered_map(
+                    executor,
+                    _reseal_batch,
+                    batches,
+                    2 * workers
+                    )
+            else:
+                executor = None
+                results = (
+                    _reseal(
+                        source.material,
+                        target.material,
+                        batch,
+                        target.codec,
+                        source.cipher,
+                        target.cipher
+                        )
+                    for batch in batches
+                    )
+
+            try:
+                for sealed in results:
+                    for item in sealed:
+                        target.add_sealed(item)
+
+                    written += len(sealed)
+                    if written // RESUME_INTERVAL \
+                            != (written - len(sealed)) // RESUME_INTERVAL:
+                        target.save()
+
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+
+            target.save()
+
+            if len(target) != total:
+                raise ValueError('Re-encrypted vault is incomplete')
+
+            target.checkpoint()
+
+        finally:
+            target.close()
+
+        source.replace_file(path + REKEY_SUFFIX)
+
+    os.unlink(path + PROGRESS_SUFFIX)
+
+    return total - resumed, resumed
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""reuse_audit.py - Audit of reused and similar passwords of vault entries.
+
+Exact reuse is found in a single pass by grouping entries on a keyed hash
+(HMAC) of their password, so plain text passwords are never used as
+dictionary keys. Key is drawn at random for every audit.
+
+Near-duplicates, such as passwords differing only in a trailing digit, are
+found among the distinct passwords without comparing every pair of them.
+Every password is split into character trigrams (padded at both ends, so
+changes at the ends are weighed like the others) and summarized by a MinHash
+signature of BANDS x ROWS values. Passwords whose signatures agree in all
+ROWS values of any band fall into the same bucket and become candidates;
+with the default 32 bands of 2 rows a pair of passwords sharing 60% of their
+trigrams becomes a candidate with probability above 0.9999, while unrelated
+passwords rarely share a bucket. Candidates are confirmed by their edit
+distance, and confirmed pairs are joined into clusters of similar passwords.
+
+Signatures of all passwords are computed at once with NumPy when it is
+installed.
+
+Example:
+    >>> for kind, titles in audit(vault.entries()):
+    >>>     print(kind, titles)
+    reused ['Chat', 'Mail']
+    similar ['Bank', 'Broker']
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * reuse_audit.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from functools import lru_cache
+import hashlib as hl
+import hmac
+import os
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+BANDS = 32
+ROWS = 2
+KEY_SIZE = 32
+
+# Number of passwords whose signatures are computed in a single batch.
+BATCH_PASSWORDS = 4096
+
+# Passwords are similar if their edit distance is at most this fraction of
+# the length of the longer one (but at least 1).
+DISTANCE_RATIO = 0.25
+
+_MASK = (1 << 64) - 1
+_START = '\x02'
+_END = '\x03'
+
+
+# ==============================================================================
+# Similarity Functions Section
+# ==============================================================================
+
+def trigrams(password: str) -> set:
+    """Returns set of trigrams of the password padded at both ends.
+
+    Args:
+        password (str): password string.
+
+    Returns:
+        set: trigrams of the password.
+    """
+
+    padded = _START + password + _END
+
+    return {padded[start:start + 3] for start in range(len(padded) - 2)}
+
+def distance(first: str, second: str, limit: int) -> int:
+    """Returns edit (Levenshtein) distance of two strings, or limit + 1 if it
+    is larger than the limit.
+
+    Args:
+        first (str): first string.
+        second (str): second string.
+        limit (int): largest distance of interest.
+
+    Returns:
+        int: edit distance, at most limit + 1.
+    """
+
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+
+    previous = list(range(len(second) + 1))
+
+    for row, char in enumerate(first, 1):
+        current = [row]
+        for column, other in enumerate(second, 1):
+            current.append(min(
+                previous[column] + 1,
+                current[column - 1] + 1,
+                previous[column - 1] + (char != other)
+                ))
+
+        if min(current) > limit:
+            return limit + 1
+
+        previous = current
+
+    return min(previous[-1], limit + 1)
+
+def similar(first: str, second: str) -> bool:
+    """Returns whether or not two different passwords are near-duplicates.
+    """
+
+    limit = max(1, int(DISTANCE_RATIO * max(len(first), len(second))))
+
+    return 0 < distance(first, second, limit) <= limit
+
+
+# ==============================================================================
+# Signature Functions Section
+# ==============================================================================
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """Returns NumPy module, imported on first call, or None if NumPy is not
+    installed.
+    """
+
+    try:
+        import numpy
+    except ImportError:
+        return None
+
+    return numpy
+
+def _gram_hash(key: bytes, gram: str) -> int:
+    """Returns keyed 32 bit hash of the trigram.
+    """
+
+    return int.from_bytes(
+        hl.blake2b(gram.encode('utf-8'), digest_size=4, key=key).digest(),
+        'big'
+        )
+
+def _signatures(key: bytes, passwords: list, size: int) -> list:
+    """Returns MinHash signatures, tuples of size values, of the passwords.
+
+    Hash function number i maps trigram hash h to the upper 32 bits of
+    (a[i] * h + b[i]) mod 2 ** 64, with a[i] odd.
+    """
+
+    seeds = [
+        hl.blake2b(
+            number.to_bytes(4, 'big'),
+            digest_size=16,
+            key=key,
+            person=b'minhash'
+            ).digest()
+        for number in range(size)
+        ]
+    factors = [int.from_bytes(seed[:8], 'big') | 1 for seed in seeds]
+    offsets = [int.from_bytes(seed[8:], 'big') for seed in seeds]
+    hashes = [
+        [_gram_hash(key, gram) for gram in trigrams(password)]
+        for password in passwords
+        ]
+
+    np = _numpy()
+
+    if np is None:
+        return [
+            tuple(
+                min(((a * h + b) & _MASK) >> 32 for h in grams)
+                for a, b in zip(factors, offsets)
+                )
+            for grams in hashes
+            ]
+
+    factors = np.array(factors, dtype=np.uint64)[:, None]
+    offsets = np.array(offsets, dtype=np.uint64)[:, None]
+    signatures = list()
+
+    for first in range(0, len(hashes), BATCH_PASSWORDS):
+        batch = hashes[first:first + BATCH_PASSWORDS]
+        starts = np.cumsum([0] + [len(grams) for grams in batch[:-1]])
+        flat = np.array(
+            [h for grams in batch for h in grams],
+            dtype=np.uint64
+            )
+
+        # NumPy unsigned arithmetic wraps around, i.e. it is mod 2 ** 64.
+        values = (factors * flat[None, :] + offsets) >> np.uint64(32)
+        minimums = np.minimum.reduceat(values, starts, axis=1)
+        signatures.extend(tuple(column) for column in minimums.T.tolist())
+
+    return signatures
+
+
+# ==============================================================================
+# Audit Functions Section
+# ==============================================================================
+
+def _clusters(key: bytes, passwords: list, bands: int, rows: int) -> list:
+    """Returns clusters of similar passwords, as lists of password numbers.
+    """
+
+    parents = list(range(len(passwords)))
+
+    def find(number):
+        while parents[number] != number:
+            parents[number] = parents[parents[number]]
+            number = parents[number]
+        return number
+
+    # Signature values of all passwords, one tuple per hash function.
+    columns = list(zip(*_signatures(key, passwords, bands * rows)))
+
+    for band in range(bands):
+        buckets = dict()
+
+        for number, value in enumerate(
+                zip(*columns[band * rows:(band + 1) * rows])
+                ):
+            buckets.setdefault(value, list()).append(number)
+
+        for members in buckets.values():
+            for position in range(1, len(members)):
+                second = members[position]
+                for first in members[:position]:
+                    # Pairs already joined, directly or through other
+                    # passwords, are not compared again.
+                    if find(first) != find(second) and similar(
+                            passwords[first],
+                            passwords[second]
+                            ):
+                        parents[find(first)] = find(second)
+
+    clusters = dict()
+
+    for number in range(len(passwords)):
+        clusters.setdefault(find(number), list()).append(number)
+
+    return [members for members in clusters.values() if len(members) > 1]
+
+def audit(
+        entries,
+        bands: int = BANDS,
+        rows: int = ROWS,
+        key: bytes = None
+        ):
+    """Yields groups of entries sharing a password, followed by groups of
+    entries with similar passwords. Entries without a password are skipped.
+
+    Args:
+        entries: iterable of vault entries.
+        bands (int): number of MinHash signature bands.
+        rows (int): number of signature values in a band.
+        key (bytes): hashing key; random if not given.
+
+    Yields:
+        tuple: 'reused' or 'similar' and the sorted list of entry titles.
+    """
+
+    key = key if key is not None else os.urandom(KEY_SIZE)
+    groups = dict()
+    passwords = list()
+
+    for entry in entries:
+        password = entry.get('password')
+        if not password:
+            continue
+
+        digest = hmac.digest(key, password.encode('utf-8'), 'sha256')
+        if digest not in groups:
+            groups[digest] = list()
+            passwords.append((password, digest))
+        groups[digest].append(entry['title'])
+
+    for titles in sorted(
+            (sorted(titles) for titles in groups.values() if len(titles) > 1),
+            key=lambda titles: (-len(titles), titles)
+            ):
+        yield 'reused', titles
+
+    clusters = _clusters(
+        key,
+        [password for password, _ in passwords],
+        bands,
+        rows
+        )
+
+    for titles in sorted(
+            (
+                sorted(
+                    title
+                    for number in members
+                    for title in groups[passwords[number][1]]
+                    )
+                for members in clusters
+                ),
+            key=lambda titles: (-len(titles), titles)
+            ):
+        yield 'similar', titles
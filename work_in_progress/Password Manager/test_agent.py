@@ -0,0 +1,132 @@
+"""Unit tests for agent.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from cryptography.fernet import Fernet
+from key_cache import KeyMaterial
+import agent as ag
+import vault as vt
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestAgent(unittest.TestCase):
+    """Unit tests for unlock agent server and client."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'vault.bkp')
+        self.socket = os.path.join(self.tmp.name, 'agent', 'agent.sock')
+        self.key = Fernet.generate_key()
+
+        with vt.Vault.create(self.path, KeyMaterial(self.key)) as vault:
+            vault.add(vt.new_entry('GitHub', url='github.com'))
+            vault.save()
+
+        self.material = KeyMaterial(self.key)
+        self.server = ag.AgentServer(self.socket, self.path, self.material, 10)
+        self.thread = threading.Thread(target=self.server.serve)
+        self.thread.start()
+
+    def tearDown(self):
+        if self.thread.is_alive():
+            ag.AgentVault.connect(self.socket, self.path).lock()
+        self.thread.join()
+        self.tmp.cleanup()
+
+    def test_requests(self):
+        """Test that agent serves reads and writes of its vault."""
+
+        vault = ag.AgentVault.connect(self.socket, self.path)
+
+        self.assertEqual(vault.get('GitHub')['url'], 'github.com')
+        vault.add(vt.new_entry('GitLab', url='gitlab.com'))
+        self.assertEqual(
+            sorted(
+                entry['title'] for entry in vault.search('title', 'git', True)
+                ),
+            ['GitHub', 'GitLab']
+            )
+
+        with self.assertRaises(KeyError):
+            vault.get('missing')
+
+        with self.assertRaises(ValueError):
+            vault.add(vt.new_entry('GitHub'))
+
+        with vt.Vault.open(self.path, KeyMaterial(self.key)) as stored:
+            self.assertIn('GitLab', stored)
+
+    def test_external_change(self):
+        """Test that agent picks up changes made by other processes."""
+
+        with vt.Vault.open(self.path, KeyMaterial(self.key)) as stored:
+            stored.delete('GitHub')
+            stored.save()
+            stored.compact()
+
+        vault = ag.AgentVault.connect(self.socket, self.path)
+
+        self.assertEqual(vault.entries(), [])
+
+    def test_save_failure(self):
+        """Test that failure to save the vault file is reported to the client
+        and the change is discarded."""
+
+        vault = ag.AgentVault.connect(self.socket, self.path)
+
+        with mock.patch.object(
+                vt.Vault,
+                'save',
+                side_effect=OSError('No space left on device')
+                ):
+            with self.assertRaises(OSError) as raised:
+                vault.add(vt.new_entry('GitLab'))
+
+        self.assertEqual(str(raised.exception), 'No space left on device')
+        self.assertEqual(
+            [entry['title'] for entry in vault.entries()],
+            ['GitHub']
+            )
+
+    def test_stalled_client(self):
+        """Test that a stalled client does not block other clients."""
+
+        with mock.patch.object(ag, 'CONNECTION_TIMEOUT', 0.2), \
+                socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled:
+            stalled.connect(self.socket)
+            stalled.sendall(b'\x00')
+            start = time.monotonic()
+
+            vault = ag.AgentVault.connect(self.socket, self.path)
+            self.assertEqual(vault.get('GitHub')['url'], 'github.com')
+            self.assertLess(time.monotonic() - start, 5)
+
+    def test_other_vault_and_lock(self):
+        """Test that agent refuses other vaults and wipes key on lock."""
+
+        other = os.path.join(self.tmp.name, 'other.bkp')
+        self.assertIsNone(ag.AgentVault.connect(self.socket, other))
+
+        ag.AgentVault.connect(self.socket, self.path).lock()
+        self.thread.join()
+
+        self.assertTrue(self.material.wiped)
+        self.assertFalse(os.path.exists(self.socket))
+        self.assertIsNone(ag.AgentVault.connect(self.socket, self.path))
+
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Unit tests for breach_check.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+import breach_check as bc
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestBreachFile(unittest.TestCase):
+    """Unit tests for lookups in the Pwned Passwords file."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'pwned.txt')
+        self.breached = {
+            bc.hashed_password('password'): 9545824,
+            bc.hashed_password('123456'): 37359195,
+            bc.hashed_password('hunter2'): 17,
+            }
+
+        lines = {
+            hashlib.sha1(str(i).encode('ascii')).hexdigest().upper()
+                .encode('ascii') + b':' + str(i % 97 + 1).encode('ascii')
+            for i in range(1000000, 1020000)
+            }
+        lines.update(
+            digest + b':' + str(count).encode('ascii')
+            for digest, count in self.breached.items()
+            )
+
+        with open(self.path, 'wb') as f:
+            f.write(b'\r\n'.join(sorted(lines)))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _check_lookups(self, pwned):
+        for digest, count in self.breached.items():
+            self.assertEqual(pwned.count(digest), count)
+            self.assertEqual(pwned.count(digest.lower()), count)
+
+        for i in range(1000000, 1020000, 997):
+            self.assertEqual(
+                pwned.count(bc.hashed_password(str(i))),
+                i % 97 + 1
+                )
+
+        for password in ('correct horse battery staple', '', 'x' * 50):
+            self.assertEqual(pwned.count(bc.hashed_password(password)), 0)
+
+        self.assertEqual(pwned.count(b'0' * 40), 0)
+        self.assertEqual(pwned.count(b'F' * 40), 0)
+
+    def test_hashed_password(self):
+        """Test SHA-1 digest in the Pwned Passwords form."""
+
+        self.assertEqual(
+            bc.hashed_password('password'),
+            b'5BAA61E4C9B93F3F0682250B6CF8331B7EE68FD8'
+            )
+
+    def test_count(self):
+        """Test lookups without and with the fan-out index."""
+
+        with mock.patch.object(bc, 'SCAN_SIZE', 64):
+            with bc.BreachFile(self.path) as pwned:
+                self.assertFalse(pwned.indexed)
+                self._check_lookups(pwned)
+
+            bc.build_index(self.path)
+
+            with bc.BreachFile(self.path) as pwned:
+                self.assertTrue(pwned.indexed)
+                self._check_lookups(pwned)
+
+    def test_stale_index(self):
+        """Test index is ignored once the file changes."""
+
+        bc.build_index(self.path)
+
+        with open(self.path, 'ab') as f:
+            f.write(b'\r\n' + b'F' * 39 + b'E:5')
+
+        with bc.BreachFile(self.path) as pwned:
+            self.assertFalse(pwned.indexed)
+            self.assertEqual(pwned.count(b'F' * 39 + b'E'), 5)
+
+    def test_audit(self):
+        """Test audit of vault entries."""
+
+        entries = [
+            {'title': 'Mail', 'password': 'password'},
+            {'title': 'Bank', 'password': 'correct horse battery staple'},
+            {'title': 'Forum', 'password': 'hunter2'},
+            {'title': 'Chat', 'password': 'password'},
+            {'title': 'Notes', 'password': ''},
+            {'title': 'Shop'},
+            ]
+
+        with bc.BreachFile(self.path) as pwned:
+            self.assertEqual(
+                bc.audit(entries, pwned),
+                [('Chat', 9545824), ('Mail', 9545824), ('Forum', 17)]
+                )
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
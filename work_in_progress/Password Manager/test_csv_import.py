@@ -0,0 +1,110 @@
+"""Unit tests for csv_import.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import os
+import tempfile
+import unittest
+from cryptography.fernet import Fernet
+from key_cache import KeyMaterial
+import csv_import as ci
+import vault as vt
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestCsvImport(unittest.TestCase):
+    """Unit tests for browser CSV export import."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'vault.bkp')
+        self.csv = os.path.join(self.tmp.name, 'export.csv')
+        self.material = KeyMaterial(Fernet.generate_key())
+
+        with vt.Vault.create(self.path, self.material) as vault:
+            vault.add(vt.new_entry('GitHub', password='old'))
+            vault.save()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, lines):
+        with open(self.csv, 'w', newline='', encoding='utf-8') as f:
+            f.write('\r\n'.join(lines) + '\r\n')
+
+    def _import(self, workers, batch_size=ci.DEFAULT_BATCH_SIZE):
+        with vt.Vault.open(self.path, self.material) as vault:
+            report = ci.import_csv(
+                self.csv,
+                vault,
+                workers,
+                batch_size
+                )
+            vault.save()
+
+        return report
+
+    def test_chrome_export(self):
+        """Test column mapping, title derivation and skipped rows."""
+
+        self._write([
+            'name,url,username,password,note',
+            'GitHub,https://github.com/login,john,secret,',
+            ',https://www.example.com/,jane,hunter2,some note',
+            'Empty,https://empty.org,joe,,',
+            ])
+
+        report = self._import(1)
+
+        self.assertEqual(report.imported, 2)
+        self.assertEqual([line for line, _ in report.skipped], [4])
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(vault.get('GitHub')['password'], 'old')
+            self.assertEqual(vault.get('GitHub (john)')['password'], 'secret')
+            self.assertTrue(vault.used_password('secret'))
+            self.assertEqual(vault.get('example.com')['notes'], 'some note')
+
+    def test_parallel_import(self):
+        """Test that entries sealed by worker processes keep CSV order and
+        are searchable."""
+
+        self._write(
+            ['Title,URL,Username,Password']
+            + [
+                'site,site{0}.com,user{0},pass{0}'.format(i)
+                for i in range(100)
+                ]
+            )
+
+        report = self._import(2, batch_size=16)
+
+        self.assertEqual(report.imported, 100)
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(len(vault), 101)
+            self.assertEqual(vault.get('site')['password'], 'pass0')
+            self.assertEqual(vault.get('site (user42)')['password'], 'pass42')
+            self.assertTrue(vault.used_password('pass99'))
+            self.assertEqual(
+                [entry['title'] for entry in vault.search('url', 'site7.com')],
+                ['site (user7)']
+                )
+
+    def test_missing_password_column(self):
+        """Test that file without password column is rejected."""
+
+        self._write(['name,url', 'GitHub,github.com'])
+
+        with self.assertRaises(ValueError):
+            self._import(1)
+
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Unit tests for diceware.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import os
+import tempfile
+import unittest
+from unittest import mock
+import diceware as dw
+import password_generator as pg
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestWordlist(unittest.TestCase):
+    """Unit tests for memory mapped wordlist."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'words.txt')
+
+        with open(self.path, 'wb') as f:
+            f.write(
+                b'11111\tabacus\r\n11112 abdomen\r\n\r\n'
+                + b'11113\tabdominal\n\nplain\nlast'
+                )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _check_wordlist(self):
+        with dw.Wordlist(self.path) as wordlist:
+            words = [wordlist.word(i) for i in range(len(wordlist))]
+
+            self.assertEqual(
+                words,
+                [b'abacus', b'abdomen', b'abdominal', b'plain', b'last']
+                )
+
+            passphrases = b''.join(
+                wordlist.passphrase_lines(100, 4, '-', batch=7)
+                ).decode('utf-8').splitlines()
+
+            self.assertEqual(len(passphrases), 100)
+            for passphrase in passphrases:
+                self.assertEqual(len(passphrase.split('-')), 4)
+                for word in passphrase.split('-'):
+                    self.assertIn(word.encode('utf-8'), words)
+
+    def test_numpy(self):
+        """Test wordlist indexed with NumPy."""
+
+        if dw._numpy() is None:
+            self.skipTest('NumPy is not installed')
+
+        self._check_wordlist()
+
+    def test_without_numpy(self):
+        """Test wordlist indexed without NumPy."""
+
+        with mock.patch.object(dw, '_numpy', lambda: None), \
+                mock.patch.object(pg, '_numpy', lambda: None):
+            self._check_wordlist()
+
+    def test_entropy(self):
+        """Test passphrase entropy."""
+
+        with dw.Wordlist(self.path) as wordlist:
+            self.assertAlmostEqual(wordlist.entropy(6), 6 * 2.321928, 5)
+            self.assertEqual(len(wordlist.passphrase(3).split(' ')), 3)
+
+    def test_too_short(self):
+        """Test that wordlist with less than two words is rejected."""
+
+        for content in (b'', b'11111\tonly\n\n'):
+            with open(self.path, 'wb') as f:
+                f.write(content)
+
+            with self.assertRaises(ValueError):
+                dw.Wordlist(self.path)
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
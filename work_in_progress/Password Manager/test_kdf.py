@@ -0,0 +1,127 @@
+"""Unit tests for kdf.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import unittest
+from unittest import mock
+from key_cache import KeyMaterial
+import kdf
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestKdfParameters(unittest.TestCase):
+    """Unit tests for KdfParameters class."""
+
+    def test_round_trip(self):
+        """Test that serialized parameters are read back."""
+
+        parameters = kdf.KdfParameters.new('pbkdf2-sha256')
+        restored = kdf.KdfParameters.from_bytes(parameters.to_bytes())
+
+        self.assertEqual(restored.algorithm, 'pbkdf2-sha256')
+        self.assertEqual(restored.cost, kdf.DEFAULT_COST['pbkdf2-sha256'])
+        self.assertEqual(restored.salt, parameters.salt)
+        self.assertNotEqual(kdf.KdfParameters.new().salt, parameters.salt)
+
+    def test_invalid(self):
+        """Test unknown functions, costs out of bounds and damaged data."""
+
+        for algorithm, cost in (
+                ('argon2', 3),
+                ('scrypt', kdf.MAX_COST['scrypt'] + 1),
+                ('pbkdf2-sha256', kdf.MIN_COST['pbkdf2-sha256'] - 1)
+                ):
+            with self.assertRaises(ValueError):
+                kdf.KdfParameters.new(algorithm, cost)
+
+        data = kdf.KdfParameters.new().to_bytes()
+
+        for damaged in (data[:-1], b'\x09' + data[1:]):
+            with self.assertRaises(ValueError):
+                kdf.KdfParameters.from_bytes(damaged)
+
+
+class TestDeriveKey(unittest.TestCase):
+    """Unit tests for key derivation and calibration."""
+
+    def test_derive(self):
+        """Test that key depends on passphrase, function, cost and salt."""
+
+        keys = set()
+
+        for algorithm in kdf.KDFS:
+            parameters = kdf.KdfParameters.new(
+                algorithm,
+                kdf.MIN_COST[algorithm]
+                )
+            key = kdf.derive_key('passphrase', parameters)
+
+            self.assertEqual(kdf.derive_key('passphrase', parameters), key)
+            KeyMaterial(key)
+            keys.add(key)
+            keys.add(kdf.derive_key('Passphrase', parameters))
+            keys.add(kdf.derive_key('passphrase', kdf.KdfParameters(
+                algorithm,
+                kdf.MIN_COST[algorithm] + 1,
+                parameters.salt
+                )))
+            keys.add(kdf.derive_key('passphrase', kdf.KdfParameters.new(
+                algorithm,
+                kdf.MIN_COST[algorithm]
+                )))
+
+        self.assertEqual(len(keys), 4 * len(kdf.KDFS))
+
+    def test_calibrate(self):
+        """Test that calibration finds cost matching the target time."""
+
+        # Scrypt taking 1 ms at cost 10 and doubling with every step.
+        with mock.patch.object(
+                kdf,
+                'derivation_time',
+                side_effect=lambda algorithm, cost: 2.0 ** (cost - 10)
+                ) as timed:
+            self.assertEqual(kdf.calibrate(250, 'scrypt'), (18, 256.0))
+            self.assertLessEqual(timed.call_count, kdf.CALIBRATION_ROUNDS + 1)
+
+        # PBKDF2 taking 1 ms per 2000 iterations.
+        with mock.patch.object(
+                kdf,
+                'derivation_time',
+                side_effect=lambda algorithm, cost: cost / 2000
+                ):
+            self.assertEqual(
+                kdf.calibrate(250, 'pbkdf2-sha256'),
+                (500000, 250.0)
+                )
+
+        # Machines too slow or too fast for the bounds.
+        with mock.patch.object(
+                kdf,
+                'derivation_time',
+                side_effect=lambda algorithm, cost: 1000.0
+                ):
+            self.assertEqual(
+                kdf.calibrate(250, 'scrypt')[0],
+                kdf.MIN_COST['scrypt']
+                )
+
+        with self.assertRaises(ValueError):
+            kdf.calibrate(0)
+
+    def test_calibrate_measures(self):
+        """Test that calibration runs real derivations."""
+
+        cost, elapsed = kdf.calibrate(1, 'pbkdf2-sha256')
+
+        self.assertEqual(cost, kdf.MIN_COST['pbkdf2-sha256'])
+        self.assertGreater(elapsed, 0)
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
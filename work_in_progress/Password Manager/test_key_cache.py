@@ -0,0 +1,116 @@
+"""Unit tests for key_cache.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import unittest
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from key_cache import KeyCache, KeyMaterial
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestKeyCache(unittest.TestCase):
+    """Unit tests for KeyCache class."""
+
+    def setUp(self):
+        self.derived = list()
+        self.keys = dict()
+
+        def derive(password, parameters=None):
+            self.derived.append(password)
+            return self.keys.setdefault(
+                (password, parameters),
+                Fernet.generate_key()
+                )
+
+        self.derive = derive
+
+    def test_derives_once(self):
+        """Test that key is derived only once per passphrase."""
+
+        with KeyCache(self.derive) as cache:
+            first = cache.fernet('foo')
+            second = cache.fernet('foo')
+
+        self.assertIs(first, second)
+        self.assertEqual(self.derived, ['foo'])
+
+    def test_derives_per_parameters(self):
+        """Test that key is derived once per passphrase and parameters."""
+
+        with KeyCache(self.derive) as cache:
+            first = cache.material('foo', b'salt 1')
+            second = cache.material('foo', b'salt 2')
+
+            self.assertIsNot(first, second)
+            self.assertNotEqual(first.key, second.key)
+            self.assertIs(cache.material('foo', b'salt 1'), first)
+            self.assertIsNot(cache.material('foo'), first)
+
+        self.assertEqual(self.derived, ['foo', 'foo', 'foo'])
+
+    def test_bounded_size(self):
+        """Test that least recently used entry is evicted and wiped."""
+
+        cache = KeyCache(self.derive, max_entries=2)
+        foo = cache.material('foo')
+        bar = cache.material('bar')
+        cache.material('foo')
+        cache.material('baz')
+
+        self.assertEqual(len(cache), 2)
+        self.assertFalse(foo.wiped)
+        self.assertTrue(bar.wiped)
+
+    def test_wipe_on_close(self):
+        """Test that closing the cache wipes all key material."""
+
+        cache = KeyCache(self.derive)
+        material = cache.material('foo')
+        buffer = material._key
+        cache.close()
+
+        self.assertTrue(cache.closed)
+        self.assertTrue(material.wiped)
+        self.assertEqual(bytes(buffer), bytes(len(buffer)))
+
+        with self.assertRaises(ValueError):
+            material.key
+
+        with self.assertRaises(ValueError):
+            cache.fernet('foo')
+
+    def test_aead_cached(self):
+        """Test that AEAD objects are built once and dropped on wipe."""
+
+        material = KeyMaterial(Fernet.generate_key())
+        aead = material.aead(AESGCM, b'label')
+
+        self.assertIs(material.aead(AESGCM, b'label'), aead)
+        self.assertIsNot(material.aead(AESGCM, b'other'), aead)
+
+        material.wipe()
+        with self.assertRaises(ValueError):
+            material.aead(AESGCM, b'label')
+
+    def test_invalid_arguments(self):
+        """Test constructor argument checking."""
+
+        with self.assertRaises(TypeError):
+            KeyCache(None)
+
+        with self.assertRaises(ValueError):
+            KeyCache(self.derive, max_entries=0)
+
+        with self.assertRaises(TypeError):
+            KeyMaterial('not bytes')
+
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""Unit tests for password_generator.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+import password_generator as pg
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestPasswordGenerator(unittest.TestCase):
+    """Unit tests for bulk password generation."""
+
+    def _check_passwords(self):
+        passwords = pg.generate(500, 12, 'full', 2)
+
+        self.assertEqual(len(passwords), 500)
+        self.assertEqual(len(set(passwords)), 500)
+
+        for password in passwords:
+            self.assertEqual(len(password), 12)
+            for cls in pg.ALPHABETS['full']:
+                self.assertGreaterEqual(
+                    sum(character in cls for character in password),
+                    2
+                    )
+
+        digits = ''.join(pg.generate(2000, 10, 'digits', 0))
+        self.assertEqual(set(digits), set(pg.DIGITS))
+
+        # Every digit is expected 2000 times.
+        for digit in pg.DIGITS:
+            self.assertLess(abs(digits.count(digit) - 2000), 250)
+
+    def test_numpy(self):
+        """Test passwords generated with NumPy."""
+
+        if pg._numpy() is None:
+            self.skipTest('NumPy is not installed')
+
+        self._check_passwords()
+
+    def test_without_numpy(self):
+        """Test passwords generated without NumPy."""
+
+        with mock.patch.object(pg, '_numpy', lambda: None):
+            self._check_passwords()
+
+    def test_class_minimum(self):
+        """Test that passwords made only of required characters are built
+        without redrawing and have the classes shuffled."""
+
+        for numpy in (pg._numpy(), None):
+            with mock.patch.object(pg, '_numpy', lambda: numpy):
+                passwords = pg.generate(200, 200, 'full', 50)
+
+                for password in passwords:
+                    for cls in pg.ALPHABETS['full']:
+                        self.assertEqual(
+                            sum(character in cls for character in password),
+                            50
+                            )
+
+                # Every class is expected at the first position 50 times.
+                for cls in pg.ALPHABETS['full']:
+                    self.assertGreater(
+                        sum(password[0] in cls for password in passwords),
+                        20
+                        )
+
+    def test_batches(self):
+        """Test that passwords are streamed in batches of whole lines."""
+
+        blocks = list(pg.generate_lines(1000, 16, batch_characters=1600))
+
+        self.assertEqual(len(blocks), 10)
+        for block in blocks:
+            self.assertEqual(len(block), 100 * 17)
+            self.assertTrue(block.endswith(b'\n'))
+
+    def test_random_below(self):
+        """Test random integers below a bound."""
+
+        for numpy in (pg._numpy(), None):
+            with mock.patch.object(pg, '_numpy', lambda: numpy):
+                numbers = list(pg.random_below(7000, 7))
+
+                self.assertEqual(len(numbers), 7000)
+                self.assertEqual(set(numbers), set(range(7)))
+
+        with self.assertRaises(ValueError):
+            pg.random_below(1, 0)
+
+    def test_lazy_numpy(self):
+        """Test that NumPy is not imported until it is needed."""
+
+        result = subprocess.run(
+            [
+                sys.executable,
+                '-c',
+                'import sys, program_actions; '
+                'print("numpy" in sys.modules)'
+                ],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True
+            )
+
+        self.assertEqual(result.stdout.strip(), 'False')
+
+    def test_invalid(self):
+        """Test that impossible requirements are rejected."""
+
+        with self.assertRaises(ValueError):
+            pg.generate(1, 6, 'full', 2)
+
+        with self.assertRaises(ValueError):
+            pg.generate(1, 12, 'base64')
+
+        with self.assertRaises(ValueError):
+            pg.generate(1, pg.MIN_LENGTH - 1)
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
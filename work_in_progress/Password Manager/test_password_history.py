@@ -0,0 +1,149 @@
+"""Unit tests for password_history.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import unittest
+import password_history as ph
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestPasswordHistory(unittest.TestCase):
+    """Unit tests for keyed Bloom filter of used passwords."""
+
+    def test_membership(self):
+        """Test that added passwords are found and others rarely are."""
+
+        history = ph.PasswordHistory.new(1 << 16)
+        for i in range(1000):
+            history.add('password {0}'.format(i))
+
+        for i in range(1000):
+            self.assertIn('password {0}'.format(i), history)
+
+        false = sum(
+            'other {0}'.format(i) in history for i in range(10000)
+            )
+        self.assertLess(false, 10)
+
+    def test_growth(self):
+        """Test that history grows as it fills up and keeps its false match
+        rate."""
+
+        history = ph.PasswordHistory.new(100)
+        size = history.size
+
+        # Passwords falsely matched are not added.
+        added = sum(
+            history.add('password {0}'.format(i)) for i in range(5000)
+            )
+        self.assertGreater(added, 4990)
+        self.assertFalse(history.add('password 1'))
+        self.assertGreater(history.size, 16 * size)
+
+        for i in range(5000):
+            self.assertIn('password {0}'.format(i), history)
+
+        false = sum(
+            'other {0}'.format(i) in history for i in range(20000)
+            )
+        self.assertLess(false, 20 * ph.FALSE_POSITIVE_RATE * 20000)
+
+        restored = ph.PasswordHistory.from_bytes(history.to_bytes())
+        self.assertIn('password 4999', restored)
+        self.assertEqual(restored.size, history.size)
+
+    def test_serialization(self):
+        """Test that serialized history keeps its key and bits."""
+
+        history = ph.PasswordHistory.new()
+        history.add('hunter2')
+        data = history.to_bytes()
+
+        restored = ph.PasswordHistory.from_bytes(data)
+        self.assertIn('hunter2', restored)
+        self.assertEqual(restored.to_bytes(), data)
+
+        copy = restored.copy()
+        copy.add('swordfish')
+        self.assertNotIn('swordfish', restored)
+
+        self.assertNotIn('hunter2', ph.PasswordHistory.new())
+
+        for damaged in (data[:20], data[:-1]):
+            with self.assertRaises(ValueError):
+                ph.PasswordHistory.from_bytes(damaged)
+
+    def test_changes(self):
+        """Test that changes applied to a saved history restore the history
+        they were taken from."""
+
+        history = ph.PasswordHistory.new(100)
+        history.add('hunter2')
+        saved = history.to_bytes()
+        self.assertTrue(history.changed)
+        history.clear_changes()
+        self.assertFalse(history.changed)
+
+        # Single password changes only the bits it sets.
+        history.add('swordfish')
+        self.assertLessEqual(
+            len(history.changes()),
+            ph._CHANGES.size + history._stages[0].hashes * ph._BIT.size
+            )
+
+        # Enough passwords to start new stages.
+        for i in range(500):
+            history.add('password {0}'.format(i))
+
+        changes = history.changes()
+
+        restored = ph.PasswordHistory.from_bytes(saved)
+        restored.apply_changes(changes)
+        self.assertFalse(restored.changed)
+        self.assertEqual(restored.to_bytes(), history.to_bytes())
+
+        # Changes merged in are tracked as well.
+        merged = ph.PasswordHistory.from_bytes(saved)
+        merged.merge(history)
+        restored = ph.PasswordHistory.from_bytes(saved)
+        restored.apply_changes(merged.changes())
+        self.assertEqual(restored.to_bytes(), history.to_bytes())
+
+        with self.assertRaises(ValueError):
+            restored.apply_changes(changes)
+
+        with self.assertRaises(ValueError):
+            ph.PasswordHistory.from_bytes(saved).apply_changes(changes[:-1])
+
+    def test_merge(self):
+        """Test that merged history holds passwords of both histories."""
+
+        history = ph.PasswordHistory.new()
+        history.add('hunter2')
+        other = history.copy()
+        other.add('swordfish')
+
+        self.assertTrue(history.merge(other))
+        self.assertIn('swordfish', history)
+        self.assertIn('hunter2', history)
+        self.assertFalse(history.merge(other))
+
+        # Stages other history grew are copied.
+        for i in range(3000):
+            other.add('password {0}'.format(i))
+
+        self.assertTrue(history.merge(other))
+        self.assertEqual(history.size, other.size)
+        self.assertIn('password 2999', history)
+
+        with self.assertRaises(ValueError):
+            history.merge(ph.PasswordHistory.new())
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+"""Unit tests for rekey.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import os
+import tempfile
+import unittest
+from cryptography.fernet import Fernet
+from key_cache import KeyMaterial
+import rekey as rk
+import vault as vt
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestRekey(unittest.TestCase):
+    """Unit tests for parallel vault re-encryption."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'vault.bkp')
+        self.old = Fernet.generate_key()
+        self.new = Fernet.generate_key()
+
+        with vt.Vault.create(self.path, KeyMaterial(self.old)) as vault:
+            for i in range(100):
+                vault.add(vt.new_entry(
+                    'entry {0}'.format(i),
+                    url='site{0}.com'.format(i),
+                    password='password {0}'.format(i)
+                    ))
+            vault.save()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _interrupt(self, count):
+        """Leave behind rekey interrupted after count records."""
+
+        with vt.Vault.open(self.path, KeyMaterial(self.old)) as source:
+            target = rk._resume(self.path, source, KeyMaterial(self.new))
+            for _, raw in list(source.raw_records())[:count]:
+                target.add_sealed(vt.seal_entry(
+                    target.material,
+                    vt.open_entry(source.material, raw)
+                    ))
+            target.save()
+            target.close()
+
+    def _assert_rekeyed(self):
+        with self.assertRaises(ValueError):
+            vt.Vault.open(self.path, KeyMaterial(self.old))
+
+        with vt.Vault.open(self.path, KeyMaterial(self.new)) as vault:
+            self.assertEqual(len(vault), 100)
+            self.assertEqual(vault.get('entry 42')['password'], 'password 42')
+            self.assertTrue(vault.used_password('password 7'))
+            self.assertEqual(
+                [entry['title'] for entry in vault.search('url', 'site7.com')],
+                ['entry 7']
+                )
+
+        self.assertEqual(os.listdir(self.tmp.name), ['vault.bkp'])
+
+    def test_parallel_rekey(self):
+        """Test that all records are re-encrypted by worker processes."""
+
+        result = rk.rekey(
+            self.path,
+            KeyMaterial(self.old),
+            KeyMaterial(self.new),
+            workers=2,
+            batch_size=16
+            )
+
+        self.assertEqual(result, (100, 0))
+        self._assert_rekeyed()
+
+    def test_resume(self):
+        """Test that interrupted rekey resumes from the last save."""
+
+        self._interrupt(40)
+
+        result = rk.rekey(self.path, KeyMaterial(self.old), KeyMaterial(self.new))
+
+        self.assertEqual(result, (60, 40))
+        self._assert_rekeyed()
+
+    def test_restart_after_change(self):
+        """Test that rekey starts over if the vault changed meanwhile."""
+
+        self._interrupt(40)
+
+        with vt.Vault.open(self.path, KeyMaterial(self.old)) as vault:
+            vault.update(vt.new_entry('entry 42', password='password 42'))
+            vault.save()
+
+        result = rk.rekey(self.path, KeyMaterial(self.old), KeyMaterial(self.new))
+
+        self.assertEqual(result, (100, 0))
+        self._assert_rekeyed()
+
+    def test_same_passphrase(self):
+        """Test that rekey with the same passphrase replaces the data key."""
+
+        with vt.Vault.open(self.path, KeyMaterial(self.old)) as vault:
+            old_key = bytes(vault.material.key)
+            parameters = vault.kdf_parameters.to_bytes()
+
+        rk.rekey(self.path, KeyMaterial(self.old), KeyMaterial(self.old))
+
+        with vt.Vault.open(self.path, KeyMaterial(self.old)) as vault:
+            self.assertNotEqual(bytes(vault.material.key), old_key)
+            self.assertEqual(vault.kdf_parameters.to_bytes(), parameters)
+            self.assertEqual(len(vault), 100)
+
+    def test_change_cipher(self):
+        """Test that rekey switches the vault to another cipher."""
+
+        self._interrupt(40)
+
+        result = rk.rekey(
+            self.path,
+            KeyMaterial(self.old),
+            KeyMaterial(self.new),
+            workers=2,
+            batch_size=16,
+            cipher='chacha20-poly1305'
+            )
+
+        self.assertEqual(result, (100, 0))
+        self._assert_rekeyed()
+
+        with vt.Vault.open(self.path, KeyMaterial(self.new)) as vault:
+            self.assertEqual(vault.cipher, 'chacha20-poly1305')
+
+    def test_other_members(self):
+        """Test that vault with other members is refused and left intact."""
+
+        with vt.Vault.open(self.path, KeyMaterial(self.old)) as vault:
+            vault.add_member('bob', KeyMaterial(Fernet.generate_key()))
+
+        with self.assertRaises(ValueError):
+            rk.rekey(self.path, KeyMaterial(self.old), KeyMaterial(self.new))
+
+        with vt.Vault.open(self.path, KeyMaterial(self.old)) as vault:
+            self.assertEqual(len(vault), 100)
+            self.assertEqual(vault.members, 2)
+
+        self.assertEqual(os.listdir(self.tmp.name), ['vault.bkp'])
+
+    def test_wrong_key(self):
+        """Test that vault is left intact if old key is wrong."""
+
+        with self.assertRaises(ValueError):
+            rk.rekey(self.path, KeyMaterial(self.new), KeyMaterial(self.old))
+
+        with vt.Vault.open(self.path, KeyMaterial(self.old)) as vault:
+            self.assertEqual(len(vault), 100)
+
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
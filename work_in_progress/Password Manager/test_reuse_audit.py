@@ -0,0 +1,100 @@
+"""Unit tests for reuse_audit.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import random
+import string
+import unittest
+from unittest import mock
+import reuse_audit as ra
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestReuseAudit(unittest.TestCase):
+    """Unit tests for audit of reused and similar passwords."""
+
+    def setUp(self):
+        generator = random.Random(2026)
+        characters = string.ascii_letters + string.digits
+
+        self.entries = [
+            {
+                'title': 'random{0:04d}'.format(i),
+                'password': ''.join(
+                    generator.choice(characters)
+                    for _ in range(generator.randint(10, 16))
+                    )
+                }
+            for i in range(500)
+            ]
+        self.entries.extend([
+            {'title': 'Mail', 'password': 'Summer2023!'},
+            {'title': 'Chat', 'password': 'Summer2023!'},
+            {'title': 'Bank', 'password': 'Summer2024!'},
+            {'title': 'Forum', 'password': 'hunter2'},
+            {'title': 'Shop', 'password': 'hunter2'},
+            {'title': 'Game', 'password': 'Hunter2'},
+            {'title': 'Notes', 'password': ''},
+            {'title': 'Wiki'},
+            ])
+
+    def _check_audit(self):
+        self.assertEqual(
+            list(ra.audit(self.entries, key=b'k' * ra.KEY_SIZE)),
+            [
+                ('reused', ['Chat', 'Mail']),
+                ('reused', ['Forum', 'Shop']),
+                ('similar', ['Bank', 'Chat', 'Mail']),
+                ('similar', ['Forum', 'Game', 'Shop']),
+                ]
+            )
+
+    def test_distance(self):
+        """Test bounded edit distance."""
+
+        self.assertEqual(ra.distance('kitten', 'sitting', 5), 3)
+        self.assertEqual(ra.distance('kitten', 'sitting', 2), 3)
+        self.assertEqual(ra.distance('abc', 'abcdef', 1), 2)
+        self.assertTrue(ra.similar('password1', 'password2'))
+        self.assertFalse(ra.similar('password1', 'password1'))
+        self.assertFalse(ra.similar('abcd', 'wxyz'))
+
+    def test_numpy(self):
+        """Test audit with signatures computed with NumPy."""
+
+        if ra._numpy() is None:
+            self.skipTest('NumPy is not installed')
+
+        self._check_audit()
+
+    def test_without_numpy(self):
+        """Test audit with signatures computed without NumPy."""
+
+        with mock.patch.object(ra, '_numpy', lambda: None):
+            self._check_audit()
+
+    def test_signatures(self):
+        """Test signatures do not depend on NumPy."""
+
+        if ra._numpy() is None:
+            self.skipTest('NumPy is not installed')
+
+        passwords = [entry.get('password') or 'x' for entry in self.entries]
+
+        with mock.patch.object(ra, 'BATCH_PASSWORDS', 64):
+            signatures = ra._signatures(b'key', passwords, 8)
+
+        with mock.patch.object(ra, '_numpy', lambda: None):
+            self.assertEqual(
+                ra._signatures(b'key', passwords, 8),
+                signatures
+                )
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
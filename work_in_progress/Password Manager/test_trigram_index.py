@@ -0,0 +1,83 @@
+"""Unit tests for trigram_index.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import unittest
+import trigram_index as ti
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestTrigramIndex(unittest.TestCase):
+    """Unit tests for fuzzy search through the trigram index."""
+
+    def setUp(self):
+        self.entries = [
+            {'title': 'GitHub', 'url': 'https://github.com/login'},
+            {'title': 'GitLab', 'url': 'gitlab.com'},
+            {'title': 'Google Mail', 'url': 'https://mail.google.com'},
+            {'title': 'Bank', 'url': 'https://www.example-bank.com'},
+            ]
+        self.index = ti.TrigramIndex(self.entries)
+
+    def test_misspelled(self):
+        """Test that misspelled and partial queries find the entry first."""
+
+        self.assertEqual(self.index.search('githb')[0][0], 'GitHub')
+        self.assertEqual(self.index.search('gogle')[0][0], 'Google Mail')
+        self.assertEqual(self.index.search('EXAMPLE bank')[0][0], 'Bank')
+        self.assertEqual(
+            self.index.search('https://www.gitlab.com/explore')[0][0],
+            'GitLab'
+            )
+        self.assertEqual(self.index.search('zzzz'), [])
+
+    def test_limit_and_order(self):
+        """Test that matches are ordered by score and limited."""
+
+        matches = self.index.search('git', limit=10)
+        scores = [score for _, score in matches]
+
+        self.assertEqual({title for title, _ in matches}, {'GitHub', 'GitLab'})
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(len(self.index.search('git', limit=1)), 1)
+
+    def test_exact_scores(self):
+        """Test that matches and scores equal those of comparing the query
+        with every field value."""
+
+        entries = [
+            {'title': 'site {0}'.format(i), 'url': 'site{0}.com'.format(i)}
+            for i in range(300)
+            ]
+        index = ti.TrigramIndex(entries)
+
+        for query in ('site 42', 'site42', 'sit 7', 'site'):
+            grams = ti.trigrams(query)
+            expected = dict()
+            for entry in entries:
+                for value in (
+                        ti.trigrams(entry['title']),
+                        ti.trigrams(ti.site(entry['url']))
+                        ):
+                    score = 2.0 * len(grams & value) \
+                        / (len(grams) + len(value))
+                    if score >= ti.DEFAULT_THRESHOLD:
+                        expected[entry['title']] = max(
+                            score,
+                            expected.get(entry['title'], 0.0)
+                            )
+
+            matches = index.search(query, limit=len(entries))
+
+            self.assertEqual(len(matches), len(expected))
+            for title, score in matches:
+                self.assertAlmostEqual(score, expected[title])
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
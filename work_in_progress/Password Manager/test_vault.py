@@ -0,0 +1,1055 @@
+"""Unit tests for vault.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+from unittest import mock
+from cryptography.fernet import Fernet
+from key_cache import KeyMaterial
+import kdf
+import validators as vd
+import vault as vt
+import vault_codecs as vc
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestVault(unittest.TestCase):
+    """Unit tests for Vault class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'vault.bkp')
+        self.key = Fernet.generate_key()
+        self.material = KeyMaterial(self.key)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _populate(self, count):
+        with vt.Vault.create(self.path, self.material) as vault:
+            for i in range(count):
+                vault.add(vt.new_entry(
+                    'entry {0}'.format(i),
+                    password='password {0}'.format(i)
+                    ))
+            vault.save()
+
+    def test_create_and_get(self):
+        """Test that saved entries can be read back."""
+
+        self._populate(50)
+
+        with vt.Vault.open(self.path, KeyMaterial(self.key)) as vault:
+            self.assertEqual(len(vault), 50)
+            self.assertEqual(vault.get('entry 7')['password'], 'password 7')
+            self.assertIn('entry 49', vault)
+            self.assertNotIn('entry 50', vault)
+
+            with self.assertRaises(KeyError):
+                vault.get('entry 50')
+
+    def test_update_and_delete(self):
+        """Test that updates and deletes are persisted on save."""
+
+        self._populate(10)
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            vault.update(vt.new_entry('entry 3', password='changed'))
+            vault.delete('entry 4')
+            vault.add(vt.new_entry('entry 10'))
+            self.assertEqual(len(vault), 10)
+            vault.save()
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(vault.get('entry 3')['password'], 'changed')
+            self.assertNotIn('entry 4', vault)
+            self.assertIn('entry 10', vault)
+            self.assertEqual(
+                sorted(entry['title'] for entry in vault.entries()),
+                sorted(['entry {0}'.format(i) for i in range(11) if i != 4])
+                )
+
+    def test_unsaved_changes_discarded(self):
+        """Test that closing the vault discards staged changes."""
+
+        self._populate(1)
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            vault.delete('entry 0')
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertIn('entry 0', vault)
+
+    def test_duplicate_and_missing(self):
+        """Test error handling for duplicate and missing entries."""
+
+        self._populate(1)
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            with self.assertRaises(ValueError):
+                vault.add(vt.new_entry('entry 0'))
+
+            with self.assertRaises(KeyError):
+                vault.update(vt.new_entry('missing'))
+
+            with self.assertRaises(KeyError):
+                vault.delete('missing')
+
+    def test_wrong_key(self):
+        """Test that vault can not be opened with wrong key."""
+
+        self._populate(1)
+
+        with self.assertRaises(ValueError):
+            vt.Vault.open(self.path, KeyMaterial(Fernet.generate_key()))
+
+    def test_change_passphrase(self):
+        """Test that changing passphrase rewrites only the key block."""
+
+        self._populate(20)
+        new_key = Fernet.generate_key()
+
+        with open(self.path, 'rb') as f:
+            before = f.read()
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            vault.change_passphrase(KeyMaterial(new_key))
+
+        with open(self.path, 'rb') as f:
+            after = f.read()
+
+        log_start = vt.Vault._log_start_for(vt.DEFAULT_KEY_SLOTS)
+        self.assertEqual(len(after), len(before))
+        self.assertEqual(after[log_start:], before[log_start:])
+
+        with self.assertRaises(ValueError):
+            vt.Vault.open(self.path, KeyMaterial(self.key))
+
+        with vt.Vault.open(self.path, KeyMaterial(new_key)) as vault:
+            self.assertEqual(vault.get('entry 7')['password'], 'password 7')
+
+    def test_damaged_key_copy(self):
+        """Test that vault opens as long as one copy of the key is intact."""
+
+        self._populate(1)
+
+        table_size = vt.DEFAULT_KEY_SLOTS * vt._KEY_SLOT.size
+
+        with open(self.path, 'r+b') as f:
+            f.seek(vt.HEADER_SIZE + table_size)
+            f.write(b'\xff' * table_size)
+
+        with vt.Vault.open(self.path, KeyMaterial(self.key)) as vault:
+            self.assertIn('entry 0', vault)
+
+    def test_codec(self):
+        """Test that records written with any codec can be read back."""
+
+        notes = 'recovery code 1234-5678, ' * 40
+
+        with vt.Vault.create(self.path, self.material, codec='lzma') as vault:
+            self.assertEqual(vault.codec, 'lzma')
+            vault.add(vt.new_entry('compressed', notes=notes))
+            vault.add_sealed(vt.seal_entry(
+                vault.material,
+                vt.new_entry('plain', notes=notes),
+                'none'
+                ))
+            vault.save()
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(vault.codec, 'lzma')
+            self.assertEqual(vault.get('compressed')['notes'], notes)
+            self.assertEqual(vault.get('plain')['notes'], notes)
+            self.assertLess(
+                len(vault._raw_record(vault._tag('compressed'))),
+                len(vault._raw_record(vault._tag('plain'))) // 4
+                )
+            vault.compact()
+            self.assertEqual(vault.codec, 'lzma')
+
+        with self.assertRaises(ValueError):
+            vt.Vault.create(self.path + '2', self.material, codec='brotli')
+
+    def test_cipher(self):
+        """Test that vaults written with any cipher can be read back."""
+
+        for cipher in ('fernet', 'chacha20-poly1305'):
+            path = self.path + cipher
+
+            with vt.Vault.create(path, self.material, cipher=cipher) as vault:
+                self.assertEqual(vault.cipher, cipher)
+                vault.add(vt.new_entry('github', password='hunter2'))
+                vault.save()
+
+            with vt.Vault.open(path, self.material) as vault:
+                self.assertEqual(vault.cipher, cipher)
+                self.assertEqual(vault.get('github')['password'], 'hunter2')
+                self.assertTrue(vault.used_password('hunter2'))
+
+                with self.assertRaises(ValueError):
+                    vt.open_entry(
+                        vault.material,
+                        vault._raw_record(vault._tag('github'))
+                        )
+
+        with self.assertRaises(ValueError):
+            vt.Vault.create(self.path + '2', self.material, cipher='rot13')
+
+    def test_check_passphrase(self):
+        """Test that passphrase is checked without reading the log."""
+
+        self._populate(10)
+
+        with mock.patch.object(vt.Vault, '_replay') as replay, \
+                mock.patch.object(vt.Vault, '_decrypt') as decrypt:
+            self.assertTrue(vt.Vault.check_passphrase(self.path, self.material))
+            self.assertFalse(vt.Vault.check_passphrase(
+                self.path,
+                KeyMaterial(Fernet.generate_key())
+                ))
+            replay.assert_not_called()
+            decrypt.assert_not_called()
+
+        self.assertFalse(self.material.wiped)
+
+    def test_kdf_parameters(self):
+        """Test that key derivation parameters are kept in the preamble."""
+
+        parameters = kdf.KdfParameters.new('pbkdf2-sha256', 20000)
+        material = KeyMaterial(kdf.derive_key('passphrase', parameters))
+        vt.Vault.create(self.path, material, kdf_parameters=parameters).close()
+
+        stored = vt.read_header(self.path).kdf_parameters
+        self.assertEqual(stored.to_bytes(), parameters.to_bytes())
+
+        with vt.Vault.open(
+                self.path,
+                KeyMaterial(kdf.derive_key('passphrase', stored))
+                ) as vault:
+            self.assertEqual(
+                vault.kdf_parameters.to_bytes(),
+                parameters.to_bytes()
+                )
+            vault.add(vt.new_entry('github'))
+            vault.save()
+            vault.compact()
+
+        self.assertEqual(
+            vt.read_header(self.path).kdf_parameters.to_bytes(),
+            parameters.to_bytes()
+            )
+
+        with vt.Vault.create(self.path + '2', self.material) as vault:
+            self.assertEqual(vault.kdf_parameters.algorithm, kdf.DEFAULT_KDF)
+
+        with open(self.path + '3', 'wb') as f:
+            f.write(b'PMVAULT')
+
+        with self.assertRaises(ValueError):
+            vt.read_header(self.path + '3')
+
+    def test_header(self):
+        """Test that header describes the sections of the vault file."""
+
+        with vt.Vault.create(self.path, self.material, cipher='fernet') \
+                as vault:
+            for i in range(10):
+                vault.add(vt.new_entry(
+                    'entry {0}'.format(i),
+                    password='password {0}'.format(i)
+                    ))
+            vault.save()
+            vault.checkpoint()
+
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(len(vt.SIGNATURE)), vt.SIGNATURE)
+
+        with mock.patch.object(vt.VaultHeader, 'from_bytes', wraps=(
+                vt.VaultHeader.from_bytes
+                )) as from_bytes:
+            header = vt.read_header(self.path)
+            self.assertEqual(len(from_bytes.call_args[0][0]), vt.HEADER_SIZE)
+
+        self.assertTrue(header.intact)
+        self.assertEqual(header.checkpoint_count, 10)
+        self.assertEqual(header.size, vt.HEADER_SIZE)
+        self.assertEqual(header.cipher, 'fernet')
+        self.assertEqual(header.codec, vc.DEFAULT_CODEC)
+        self.assertEqual(
+            set(header.sections),
+            {
+                vt.SECTION_KEYS,
+                vt.SECTION_LOG,
+                vt.SECTION_INDEX,
+                vt.SECTION_HISTORY
+                }
+            )
+        self.assertEqual(header.sections[vt.SECTION_KEYS][0], vt.HEADER_SIZE)
+        self.assertEqual(
+            sum(header.sections[vt.SECTION_LOG]),
+            header.sections[vt.SECTION_INDEX][0]
+            )
+        self.assertEqual(
+            sum(header.sections[vt.SECTION_INDEX]),
+            os.path.getsize(self.path)
+            )
+
+        # Unknown sections are skipped, damaged header only loses sections.
+        with open(self.path, 'rb') as f:
+            data = bytearray(f.read(vt.HEADER_SIZE))
+
+        end = vt.HEADER_SIZE - vt._CRC.size
+        data[vt.HEADER_OFFSET + vt._HEADER.size] = 99
+        vt._CRC.pack_into(data, end, zlib.crc32(data[vt.HEADER_OFFSET:end]))
+        header = vt.VaultHeader.from_bytes(bytes(data))
+        self.assertTrue(header.intact)
+        self.assertNotIn(vt.SECTION_KEYS, header.sections)
+        self.assertIn(vt.SECTION_INDEX, header.sections)
+
+        data[end] ^= 0xff
+        header = vt.VaultHeader.from_bytes(bytes(data))
+        self.assertFalse(header.intact)
+        self.assertEqual(header.sections, dict())
+        self.assertEqual(header.cipher, 'fernet')
+
+        # File validator sniffs the signature.
+        validator = vd.ValidateFileInput(
+            accept_none=False,
+            existent=True,
+            signature=vt.SIGNATURE
+            )
+        self.assertTrue(validator.validate(vd.UserInput(self.path)))
+
+        with open(self.path + '2', 'wb') as f:
+            f.write(b'not a vault' * 10)
+
+        self.assertFalse(validator.validate(vd.UserInput(self.path + '2')))
+
+    def test_newer_header(self):
+        """Test that vault written by a newer compatible format version, with
+        a larger header holding unknown sections, is read and updated."""
+
+        size = vt.HEADER_SIZE + 4 * vt._SECTION.size
+
+        with mock.patch.object(vt, 'HEADER_SIZE', size), \
+                mock.patch.object(vt, 'FORMAT_VERSION', vt.FORMAT_VERSION + 1):
+            with vt.Vault.create(self.path, self.material) as vault:
+                vault.add(vt.new_entry('entry 0', password='password 0'))
+                vault.save()
+                vault.checkpoint()
+
+        with open(self.path, 'r+b') as f:
+            data = bytearray(f.read(size))
+            count, sections = vt._HEADER.unpack_from(data, vt.HEADER_OFFSET)
+            vt._HEADER.pack_into(data, vt.HEADER_OFFSET, count, sections + 1)
+            vt._SECTION.pack_into(
+                data,
+                vt.HEADER_OFFSET + vt._HEADER.size
+                + sections * vt._SECTION.size,
+                99, 0, 0
+                )
+            vt._CRC.pack_into(
+                data,
+                size - vt._CRC.size,
+                zlib.crc32(data[vt.HEADER_OFFSET:size - vt._CRC.size])
+                )
+            f.seek(0)
+            f.write(data)
+
+        header = vt.read_header(self.path)
+        self.assertTrue(header.intact)
+        self.assertEqual(header.size, size)
+        self.assertEqual(header.version, vt.FORMAT_VERSION + 1)
+        self.assertNotIn(99, header.sections)
+        self.assertEqual(header.sections[vt.SECTION_KEYS][0], size)
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(vault.get('entry 0')['password'], 'password 0')
+            vault.add(vt.new_entry('entry 1', password='password 1'))
+            vault.checkpoint()
+
+        header = vt.read_header(self.path)
+        self.assertEqual(header.size, size)
+        self.assertEqual(header.checkpoint_count, 2)
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(vault.get('entry 1')['password'], 'password 1')
+            vault.compact()
+
+        header = vt.read_header(self.path)
+        self.assertEqual(header.size, vt.HEADER_SIZE)
+        self.assertEqual(header.version, vt.FORMAT_VERSION)
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(len(vault), 2)
+
+    def test_unsupported_version(self):
+        """Test that format versions older than the oldest readable one, and
+        newer ones that can not be read by this version, are rejected."""
+
+        self._populate(1)
+
+        with open(self.path, 'rb') as f:
+            data = bytearray(f.read(vt.HEADER_SIZE))
+
+        # Format version is followed by the oldest version able to read it.
+        for version, compatible in (
+                (vt.READABLE_VERSION - 1, vt.READABLE_VERSION - 1),
+                (vt.FORMAT_VERSION + 1, vt.FORMAT_VERSION + 1),
+                (vt.FORMAT_VERSION, vt.FORMAT_VERSION + 1)
+                ):
+            data[8:12] = struct.pack('>HH', version, compatible)
+
+            with self.assertRaises(ValueError):
+                vt.VaultHeader.from_bytes(bytes(data))
+
+        data[8:12] = struct.pack(
+            '>HH',
+            vt.FORMAT_VERSION + 1,
+            vt.COMPATIBLE_VERSION
+            )
+        self.assertEqual(
+            vt.VaultHeader.from_bytes(bytes(data)).version,
+            vt.FORMAT_VERSION + 1
+            )
+
+    def test_not_a_vault(self):
+        """Test that arbitrary file is rejected."""
+
+        with open(self.path, 'wb') as f:
+            f.write(b'not a vault' * 10)
+
+        with self.assertRaises(ValueError):
+            vt.Vault.open(self.path, self.material)
+
+        with self.assertRaises(ValueError):
+            vt.Vault.check_passphrase(self.path, self.material)
+
+    def test_invalid_entry(self):
+        """Test entry validation."""
+
+        with self.assertRaises(ValueError):
+            vt.new_entry('')
+
+        with self.assertRaises(ValueError):
+            vt.validate_entry({'title': 'foo', 'bar': 'baz'})
+
+        with self.assertRaises(TypeError):
+            vt.validate_entry({'title': 'foo', 'password': 1})
+
+
+class TestVaultLog(unittest.TestCase):
+    """Unit tests for log structured vault storage."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'vault.bkp')
+        self.material = KeyMaterial(Fernet.generate_key())
+
+        with vt.Vault.create(self.path, self.material) as vault:
+            for i in range(20):
+                vault.add(vt.new_entry('entry {0}'.format(i)))
+            vault.save()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_save_appends(self):
+        """Test that saving a change appends to the log only."""
+
+        size = os.path.getsize(self.path)
+
+        with open(self.path, 'rb') as f:
+            before = f.read()
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            vault.update(vt.new_entry('entry 3', password='changed'))
+            vault.save()
+
+        with open(self.path, 'rb') as f:
+            after = f.read()
+
+        self.assertTrue(after.startswith(before))
+        self.assertLess(len(after) - size, 500)
+
+    def test_unchanged_not_written(self):
+        """Test that entries which end up unchanged are not written."""
+
+        size = os.path.getsize(self.path)
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            entry = vault.get('entry 3')
+            vault.update(dict(entry, password='changed'))
+            vault.update(entry)
+            vault.add(vt.new_entry('entry 20'))
+            vault.delete('entry 20')
+            self.assertFalse(vault.modified)
+            vault.save()
+
+        self.assertEqual(os.path.getsize(self.path), size)
+
+    def test_incremental_state(self):
+        """Test that index kept up to date by saves matches the reloaded
+        one."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            vault.update(vt.new_entry('entry 3', password='changed'))
+            vault.delete('entry 4')
+            vault.save()
+            vault.add(vt.new_entry('entry 4', url='https://example.com'))
+            vault.delete('entry 5')
+            vault.save()
+
+            state = (
+                len(vault),
+                vault.garbage,
+                sorted(e['title'] for e in vault.entries()),
+                [e['title'] for e in vault.search('url', 'example.com')],
+                )
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(state, (
+                len(vault),
+                vault.garbage,
+                sorted(e['title'] for e in vault.entries()),
+                [e['title'] for e in vault.search('url', 'example.com')],
+                ))
+            self.assertEqual(vault.get('entry 3')['password'], 'changed')
+            self.assertEqual(len(vault), 19)
+
+    def test_torn_tail(self):
+        """Test that frame cut short by a crash is ignored and overwritten."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            vault.delete('entry 5')
+            vault.save()
+
+        with open(self.path, 'ab') as f:
+            f.write(bytes([vt.FRAME_RECORD]) + b'partial frame')
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertNotIn('entry 5', vault)
+            self.assertEqual(len(vault), 19)
+            vault.add(vt.new_entry('entry 20'))
+            vault.save()
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertIn('entry 20', vault)
+            self.assertEqual(len(vault), 20)
+
+    def test_concurrent_writers(self):
+        """Test that writer whose copy of the log is out of date fails instead
+        of overwriting groups committed by another writer."""
+
+        first = vt.Vault.open(self.path, self.material)
+        second = vt.Vault.open(self.path, self.material)
+
+        try:
+            first.add(vt.new_entry('entry 20'))
+            first.save()
+
+            second.add(vt.new_entry('entry 21'))
+            with self.assertRaises(ValueError):
+                second.save()
+            with self.assertRaises(ValueError):
+                second.compact()
+            with self.assertRaises(ValueError):
+                second.add_member('guest', KeyMaterial(Fernet.generate_key()))
+
+            # Vault replaced by another writer is detected as well.
+            first.compact()
+            with self.assertRaises(ValueError):
+                second.save()
+
+            first.add(vt.new_entry('entry 22'))
+            first.save()
+
+        finally:
+            first.close()
+            second.close()
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertIn('entry 20', vault)
+            self.assertIn('entry 22', vault)
+            self.assertNotIn('entry 21', vault)
+            self.assertEqual(vault.members, 1)
+
+        with mock.patch.object(vt.fcntl, 'flock') as flock:
+            with vt.Vault.open(self.path, self.material) as vault:
+                vault.delete('entry 22')
+                vault.save()
+
+        self.assertEqual(flock.call_args_list[0][0][1], vt.fcntl.LOCK_EX)
+
+    def test_uncommitted_group(self):
+        """Test that group of frames without a commit frame is ignored as a
+        whole."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            vault.update(vt.new_entry('entry 3', password='changed'))
+            vault.delete('entry 4')
+            vault.save()
+
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        # Cut the commit frame off, as if the save had crashed before it.
+        commit = vt._FRAME.size + vt._COUNT.size + vt.MAC_SIZE
+
+        with open(self.path, 'wb') as f:
+            f.write(data[:-commit])
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(vault.get('entry 3')['password'], '')
+            self.assertIn('entry 4', vault)
+            vault.delete('entry 5')
+            vault.save()
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(vault.get('entry 3')['password'], '')
+            self.assertIn('entry 4', vault)
+            self.assertNotIn('entry 5', vault)
+
+    def test_damaged_header(self):
+        """Test that vault with damaged header is recovered from the log."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            vault.delete('entry 5')
+            vault.checkpoint()
+
+        with open(self.path, 'r+b') as f:
+            f.seek(vt.HEADER_OFFSET + 4)
+            f.write(b'\xff' * 8)
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertNotIn('entry 5', vault)
+            self.assertEqual(len(vault), 19)
+
+    def test_checkpoint_interval(self):
+        """Test that checkpoint is written once enough frames accumulate."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            for i in range(vt.CHECKPOINT_INTERVAL):
+                vault.update(vt.new_entry(
+                    'entry {0}'.format(i % 20),
+                    password=str(i)
+                    ))
+                vault.save()
+
+            self.assertLess(vault._tail, vt.CHECKPOINT_INTERVAL)
+            self.assertEqual(len(vault), 20)
+
+    def test_compact(self):
+        """Test that compaction reclaims space and keeps live entries."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            for i in range(10):
+                vault.delete('entry {0}'.format(i))
+            vault.save()
+            self.assertGreater(vault.garbage, 0.4)
+
+            size = os.path.getsize(self.path)
+            vault.compact()
+
+            self.assertLess(os.path.getsize(self.path), size)
+            self.assertAlmostEqual(vault.garbage, 0.0)
+            self.assertEqual(len(vault), 10)
+            self.assertIn('entry 15', vault)
+            self.assertNotIn('entry 5', vault)
+
+    def test_forged_tombstone(self):
+        """Test that tombstone without valid MAC is rejected."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            tag = vault._tag('entry 1')
+
+        with open(self.path, 'ab') as f:
+            f.write(vt._FRAME.pack(
+                vt.FRAME_TOMBSTONE,
+                tag,
+                vt._VERSION.size + vt.MAC_SIZE
+                ))
+            f.write(vt._VERSION.pack(2) + bytes(vt.MAC_SIZE))
+
+        with self.assertRaises(ValueError):
+            vt.Vault.open(self.path, self.material)
+
+
+class TestVaultMembers(unittest.TestCase):
+    """Unit tests for multi member key slots."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'vault.bkp')
+        self.keys = [Fernet.generate_key() for _ in range(20)]
+
+        with vt.Vault.create(self.path, KeyMaterial(self.keys[0])) as vault:
+            vault.add(vt.new_entry('shared', password='secret'))
+            vault.save()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _open(self, index):
+        return vt.Vault.open(self.path, KeyMaterial(self.keys[index]))
+
+    def test_add_and_remove(self):
+        """Test that members get and lose access without re-encryption."""
+
+        with self._open(0) as vault:
+            vault.add_member('alice', KeyMaterial(self.keys[1]))
+            log_start = vault._log_start
+
+        with open(self.path, 'rb') as f:
+            before = f.read()[log_start:]
+
+        with self._open(1) as vault:
+            self.assertEqual(vault.get('shared')['password'], 'secret')
+            vault.remove_member(vt.OWNER)
+            self.assertEqual(vault.members, 1)
+
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read()[log_start:], before)
+
+        with self.assertRaises(ValueError):
+            self._open(0)
+
+        with self._open(1) as vault:
+            with self.assertRaises(ValueError):
+                vault.remove_member('alice')
+            with self.assertRaises(KeyError):
+                vault.remove_member('bob')
+            with self.assertRaises(ValueError):
+                vault.add_member('bob', KeyMaterial(self.keys[1]))
+            with self.assertRaises(ValueError):
+                vault.add_member('alice', KeyMaterial(self.keys[2]))
+
+    def test_table_growth(self):
+        """Test that key slot table grows and keeps records intact."""
+
+        with self._open(0) as vault:
+            for i in range(1, 20):
+                vault.add_member(
+                    'member {0}'.format(i),
+                    KeyMaterial(self.keys[i])
+                    )
+            self.assertEqual(vault.members, 20)
+            self.assertGreaterEqual(vault._capacity, 40)
+
+        for i in range(20):
+            with self._open(i) as vault:
+                self.assertEqual(vault.get('shared')['password'], 'secret')
+
+    def test_change_passphrase(self):
+        """Test that changing passphrase keeps other members."""
+
+        with self._open(0) as vault:
+            vault.add_member('alice', KeyMaterial(self.keys[1]))
+            vault.change_passphrase(KeyMaterial(self.keys[2]))
+            self.assertEqual(vault.members, 2)
+
+        with self._open(2) as vault:
+            vault.remove_member(vt.OWNER)
+
+        with self._open(1) as vault:
+            self.assertEqual(vault.members, 1)
+
+
+class TestVaultSearch(unittest.TestCase):
+    """Unit tests for blind index search."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'vault.bkp')
+        self.material = KeyMaterial(Fernet.generate_key())
+
+        with vt.Vault.create(self.path, self.material) as vault:
+            vault.add(vt.new_entry(
+                'GitHub Enterprise',
+                username='john.doe@example.com',
+                url='https://www.github.com/login'
+                ))
+            vault.add(vt.new_entry('GitLab', url='gitlab.com'))
+            vault.add(vt.new_entry('Mail', username='john.doe@example.com'))
+            vault.add(vt.new_entry('O\'Reilly Médiathèque'))
+            vault.checkpoint()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _titles(self, vault, field, query, prefix=False):
+        return sorted(
+            entry['title'] for entry in vault.search(field, query, prefix)
+            )
+
+    def test_exact(self):
+        """Test exact value lookups."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(
+                self._titles(vault, 'url', 'http://github.com'),
+                ['GitHub Enterprise']
+                )
+            self.assertEqual(
+                self._titles(vault, 'username', 'JOHN.DOE@example.com'),
+                ['GitHub Enterprise', 'Mail']
+                )
+            self.assertEqual(self._titles(vault, 'title', 'Git'), [])
+
+    def test_prefix(self):
+        """Test word prefix lookups, including prefixes longer than the
+        indexed ones."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(
+                self._titles(vault, 'title', 'git', True),
+                ['GitHub Enterprise', 'GitLab']
+                )
+            self.assertEqual(
+                self._titles(vault, 'title', 'enterprises', True),
+                []
+                )
+            self.assertEqual(
+                self._titles(vault, 'title', 'enterpri', True),
+                ['GitHub Enterprise']
+                )
+
+            with self.assertRaises(ValueError):
+                self._titles(vault, 'title', 'gi', True)
+
+    def test_prefix_normalization(self):
+        """Test that prefixes with punctuation and non-ASCII letters are
+        normalized as the indexed titles are."""
+
+        title = ['O\'Reilly Médiathèque']
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            for query in (
+                    'médiat',
+                    'MÉDIATHÈQUE',
+                    'Me\u0301diath',
+                    'o\'reilly',
+                    'O\'Reil',
+                    'reilly, médi',
+                    ):
+                self.assertEqual(
+                    self._titles(vault, 'title', query, True),
+                    title,
+                    query
+                    )
+
+            self.assertEqual(
+                self._titles(vault, 'title', 'o\'reilly, gith', True),
+                []
+                )
+
+            with self.assertRaises(ValueError):
+                self._titles(vault, 'title', 'o\'r', True)
+
+    def test_changes_after_checkpoint(self):
+        """Test that logged and unsaved changes are searchable."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            vault.update(vt.new_entry('GitLab', url='example.org'))
+            vault.save()
+            vault.add(vt.new_entry('Gitea'))
+
+            self.assertEqual(
+                self._titles(vault, 'title', 'git', True),
+                ['GitHub Enterprise', 'GitLab', 'Gitea']
+                )
+            self.assertEqual(self._titles(vault, 'url', 'gitlab.com'), [])
+
+            vault.save()
+            vault.compact()
+
+            self.assertEqual(
+                self._titles(vault, 'url', 'example.org'),
+                ['GitLab']
+                )
+            self.assertEqual(
+                self._titles(vault, 'title', 'gite', True),
+                ['Gitea']
+                )
+
+    def test_fuzzy(self):
+        """Test that fuzzy search follows changes of the entries."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(
+                vault.fuzzy_search('githb')[0][0],
+                'GitHub Enterprise'
+                )
+            self.assertEqual(vault.fuzzy_search('mali')[0][0], 'Mail')
+
+            vault.add(vt.new_entry('Gitea'))
+            self.assertEqual(vault.fuzzy_search('gitea')[0][0], 'Gitea')
+
+            vault.delete('GitLab')
+            self.assertNotIn(
+                'GitLab',
+                [title for title, _ in vault.fuzzy_search('gitlab')]
+                )
+
+
+class TestVaultHistory(unittest.TestCase):
+    """Unit tests for password history of the vault."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'vault.bkp')
+        self.material = KeyMaterial(Fernet.generate_key())
+
+        with vt.Vault.create(self.path, self.material) as vault:
+            for i in range(10):
+                vault.add(vt.new_entry(
+                    'entry {0}'.format(i),
+                    password='password {0}'.format(i)
+                    ))
+            vault.save()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reuse_rejected(self):
+        """Test that update to a password used before is rejected."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            vault.update(vt.new_entry('entry 1', password='first'))
+            vault.save()
+            vault.update(vt.new_entry('entry 1', password='second'))
+            vault.delete('entry 2')
+            vault.save()
+
+            for password in ('first', 'password 1', 'password 2', 'second'):
+                with self.assertRaises(ValueError):
+                    vault.update(vt.new_entry('entry 3', password=password))
+
+            # Fields other than the password can still change.
+            vault.update(vt.new_entry(
+                'entry 3',
+                password='password 3',
+                url='example.com'
+                ))
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertTrue(vault.used_password('first'))
+            self.assertFalse(vault.used_password('third'))
+
+            vault.checkpoint()
+            vault.compact()
+            self.assertTrue(vault.used_password('first'))
+
+            vault.update(vt.new_entry('entry 3', password='third'))
+            with self.assertRaises(ValueError):
+                vault.update(vt.new_entry('entry 4', password='third'))
+
+    def test_unsaved_not_remembered(self):
+        """Test that passwords of discarded changes are not remembered."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            entry = vault.get('entry 5')
+            vault.update(dict(entry, password='changed'))
+            vault.update(entry)
+            vault.add(vt.new_entry('entry 10', password='added'))
+            vault.delete('entry 10')
+            self.assertFalse(vault.modified)
+            vault.save()
+
+            self.assertFalse(vault.used_password('changed'))
+            self.assertFalse(vault.used_password('added'))
+
+    def test_history_written_on_new_password(self):
+        """Test that history is written only when a new password is saved."""
+
+        def history_at():
+            with vt.Vault.open(self.path, self.material) as vault:
+                return vault._history_at, vault._history_deltas
+
+        written = history_at()
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            entry = vault.get('entry 1')
+            vault.update(dict(entry, notes='changed notes'))
+            vault.save()
+
+        self.assertEqual(history_at(), written)
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            vault.update(dict(entry, password='new password'))
+            vault.save()
+
+        self.assertNotEqual(history_at(), written)
+
+    def test_history_delta(self):
+        """Test that saved passwords append only history changes, which
+        checkpoints and compaction fold into the whole history."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            history_at = vault._history_at
+
+            for i in range(3):
+                vault.update(vt.new_entry(
+                    'entry {0}'.format(i),
+                    password='changed {0}'.format(i)
+                    ))
+                vault.save()
+
+            self.assertEqual(vault._history_at, history_at)
+            self.assertEqual(len(vault._history_deltas), 3)
+            self.assertLess(
+                max(size for _, size in vault._history_deltas),
+                256
+                )
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(len(vault._history_deltas), 3)
+            self.assertTrue(vault.used_password('changed 2'))
+            self.assertTrue(vault.used_password('password 2'))
+            vault.compact()
+            self.assertEqual(vault._history_deltas, [])
+            self.assertTrue(vault.used_password('changed 1'))
+
+            vault.update(vt.new_entry('entry 5', password='changed 5'))
+            vault.checkpoint()
+            self.assertEqual(vault._history_deltas, [])
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            self.assertEqual(vault._history_deltas, [])
+            self.assertTrue(vault.used_password('changed 5'))
+            self.assertTrue(vault.used_password('changed 0'))
+            self.assertFalse(vault.used_password('changed 6'))
+
+    def test_damaged_history(self):
+        """Test that forged history frame is rejected."""
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            vault.update(vt.new_entry('entry 1', password='first'))
+            vault.save()
+
+        with open(self.path, 'r+b') as f:
+            data = f.read()
+            offset = data.rindex(
+                bytes([vt.FRAME_HISTORY]) + bytes(vt.TAG_SIZE)
+                ) + vt._FRAME.size + 40
+            f.seek(offset)
+            f.write(bytes([data[offset] ^ 1]))
+
+        with vt.Vault.open(self.path, self.material) as vault:
+            with self.assertRaises(ValueError):
+                vault.used_password('first')
+
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
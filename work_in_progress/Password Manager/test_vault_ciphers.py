@@ -0,0 +1,84 @@
+"""Unit tests for vault_ciphers.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import unittest
+from cryptography.fernet import Fernet
+from key_cache import KeyMaterial
+import vault_ciphers as vcp
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestCiphers(unittest.TestCase):
+    """Unit tests for record ciphers."""
+
+    def setUp(self):
+        self.material = KeyMaterial(Fernet.generate_key())
+        self.data = b'{"title":"github","password":"hunter2"}'
+
+    def test_round_trip(self):
+        """Test that every cipher decrypts what it encrypted."""
+
+        for cipher in vcp.CIPHERS:
+            raw = vcp.encrypt(self.material, cipher, self.data)
+            self.assertNotIn(b'hunter2', raw)
+            self.assertEqual(
+                vcp.decrypt(self.material, cipher, memoryview(raw)),
+                self.data
+                )
+            self.assertNotEqual(
+                vcp.encrypt(self.material, cipher, self.data),
+                raw
+                )
+
+            if cipher != 'fernet':
+                self.assertEqual(
+                    len(raw),
+                    len(self.data) + vcp.NONCE_SIZE + vcp.TAG_SIZE
+                    )
+
+    def test_tampering(self):
+        """Test that damaged records and wrong keys are rejected."""
+
+        other = KeyMaterial(Fernet.generate_key())
+
+        for cipher in vcp.CIPHERS:
+            raw = bytearray(vcp.encrypt(self.material, cipher, self.data))
+
+            with self.assertRaises(ValueError):
+                vcp.decrypt(other, cipher, raw)
+
+            for damaged in (raw[:-1], raw[:10], b''):
+                with self.assertRaises(ValueError):
+                    vcp.decrypt(self.material, cipher, damaged)
+
+            raw[len(raw) // 2] ^= 1
+            with self.assertRaises(ValueError):
+                vcp.decrypt(self.material, cipher, raw)
+
+    def test_ciphers_differ(self):
+        """Test that a record is readable only with its own cipher."""
+
+        raw = vcp.encrypt(self.material, 'aes-gcm', self.data)
+
+        with self.assertRaises(ValueError):
+            vcp.decrypt(self.material, 'chacha20-poly1305', raw)
+
+    def test_invalid(self):
+        """Test unknown ciphers."""
+
+        with self.assertRaises(ValueError):
+            vcp.encrypt(self.material, 'rot13', self.data)
+
+        self.assertEqual(vcp.cipher_name(2), 'chacha20-poly1305')
+        with self.assertRaises(ValueError):
+            vcp.cipher_name(9)
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
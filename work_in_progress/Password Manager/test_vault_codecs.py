@@ -0,0 +1,59 @@
+"""Unit tests for vault_codecs.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import os
+import unittest
+import vault_codecs as vc
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestCodecs(unittest.TestCase):
+    """Unit tests for record codecs."""
+
+    def setUp(self):
+        self.data = b'{"title":"github","notes":"' \
+            + b'recovery code 1234-5678, ' * 20 + b'"}'
+
+    def test_round_trip(self):
+        """Test that every codec decodes what it encoded."""
+
+        for codec in vc.CODECS:
+            encoded = vc.encode(codec, self.data)
+            self.assertEqual(encoded[0], vc.CODECS[codec])
+            self.assertEqual(vc.decode(encoded), self.data)
+            self.assertEqual(vc.decode(memoryview(encoded)), self.data)
+
+            if codec != 'none':
+                self.assertLess(len(encoded), len(self.data) // 4)
+
+    def test_incompressible(self):
+        """Test that data which does not get smaller is stored as is."""
+
+        data = os.urandom(300)
+
+        for codec in vc.CODECS:
+            self.assertEqual(vc.encode(codec, data), b'\x00' + data)
+
+    def test_invalid(self):
+        """Test unknown codecs and damaged records."""
+
+        with self.assertRaises(ValueError):
+            vc.encode('brotli', self.data)
+
+        for damaged in (b'', b'\x07' + self.data, b'\x01\xff\xff', b'\x02x'):
+            with self.assertRaises(ValueError):
+                vc.decode(damaged)
+
+        self.assertEqual(vc.codec_name(2), 'lzma')
+        with self.assertRaises(ValueError):
+            vc.codec_name(9)
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,282 @@
+"""Unit tests for vault_sync.py
+"""
+
+# ==============================================================================
+# Imports Section
+# ==============================================================================
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from cryptography.fernet import Fernet
+from key_cache import KeyMaterial
+import vault as vt
+import vault_sync as vs
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+class TestMerkleTree(unittest.TestCase):
+    """Unit tests for MerkleTree class."""
+
+    def setUp(self):
+        self.leaves = sorted(
+            (os.urandom(vt.TAG_SIZE), bytes(36)) for _ in range(300)
+            )
+
+    def test_depth(self):
+        """Test tree depth grows with the number of leaves."""
+
+        self.assertEqual(vs.tree_depth(0), 1)
+        self.assertEqual(vs.tree_depth(64), 1)
+        self.assertEqual(vs.tree_depth(65), 2)
+        self.assertEqual(vs.tree_depth(100000), 4)
+        self.assertEqual(vs.tree_depth(10 ** 9), vs.MAX_DEPTH)
+
+    def test_diff(self):
+        """Test only buckets of differing leaves are reported."""
+
+        tree = vs.MerkleTree(self.leaves, 2)
+        self.assertEqual(vs.MerkleTree(list(self.leaves), 2).root, tree.root)
+        self.assertEqual(tree.diff(vs.MerkleTree(self.leaves, 2)), [])
+        self.assertIsNone(vs.MerkleTree([], 2).root)
+
+        changed = list(self.leaves)
+        changed[10] = (changed[10][0], b'\x01' + bytes(35))
+        del changed[200]
+        other = vs.MerkleTree(changed, 2)
+
+        self.assertNotEqual(other.root, tree.root)
+        self.assertEqual(
+            tree.diff(other),
+            sorted({self.leaves[10][0][0], self.leaves[200][0][0]})
+            )
+        self.assertEqual(
+            len(vs.MerkleTree([], 2).diff(tree)),
+            len({tag[0] for tag, _ in self.leaves})
+            )
+
+
+class TestSync(unittest.TestCase):
+    """Unit tests for sync of two copies of a vault."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.first = os.path.join(self.tmp.name, 'first.bkp')
+        self.second = os.path.join(self.tmp.name, 'second.bkp')
+        self.material = KeyMaterial(Fernet.generate_key())
+
+        with vt.Vault.create(self.first, self.material) as vault:
+            for i in range(100):
+                vault.add(vt.new_entry(
+                    'entry {0}'.format(i),
+                    password='password {0}'.format(i)
+                    ))
+            vault.save()
+
+        shutil.copyfile(self.first, self.second)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _sync(self):
+        with vt.Vault.open(self.first, self.material) as first, \
+                vt.Vault.open(self.second, self.material) as second:
+            report = vs.sync(first, second)
+
+        return report.to_first, report.to_second, report.conflicts
+
+    def _entries(self, path):
+        with vt.Vault.open(path, self.material) as vault:
+            return sorted(
+                (entry['title'], entry['password'])
+                for entry in vault.entries()
+                )
+
+    def test_identical(self):
+        """Test identical copies are not changed."""
+
+        size = os.path.getsize(self.second)
+
+        with mock.patch.object(vt.Vault, '_decrypt') as decrypt, \
+                mock.patch.object(vt.Vault, 'sync_leaves') as sync_leaves:
+            self.assertEqual(self._sync(), (0, 0, 0))
+            decrypt.assert_not_called()
+            sync_leaves.assert_not_called()
+
+        self.assertEqual(os.path.getsize(self.second), size)
+
+    def test_changes(self):
+        """Test changes of both copies are merged."""
+
+        with vt.Vault.open(self.first, self.material) as vault:
+            vault.update(vt.new_entry('entry 1', password='changed 1'))
+            vault.delete('entry 2')
+            vault.add(vt.new_entry('first only', password='first'))
+            vault.save()
+
+        with vt.Vault.open(self.second, self.material) as vault:
+            vault.update(vt.new_entry('entry 3', password='changed 3'))
+            vault.update(vt.new_entry('entry 3', password='changed again'))
+            vault.save()
+            vault.delete('entry 4')
+            vault.save()
+            vault.add(vt.new_entry('entry 4', password='restored'))
+            vault.save()
+
+        self.assertEqual(self._sync(), (2, 3, 0))
+
+        entries = self._entries(self.first)
+        self.assertEqual(entries, self._entries(self.second))
+        self.assertIn(('entry 1', 'changed 1'), entries)
+        self.assertIn(('entry 3', 'changed again'), entries)
+        self.assertIn(('entry 4', 'restored'), entries)
+        self.assertIn(('first only', 'first'), entries)
+        self.assertNotIn('entry 2', dict(entries))
+        self.assertEqual(self._sync(), (0, 0, 0))
+
+        with vt.Vault.open(self.second, self.material) as vault:
+            self.assertEqual(
+                [
+                    entry['password']
+                    for entry in vault.search('title', 'first', prefix=True)
+                    ],
+                ['first']
+                )
+            self.assertTrue(vault.used_password('first'))
+            self.assertTrue(vault.used_password('changed 1'))
+
+        with vt.Vault.open(self.first, self.material) as vault:
+            self.assertTrue(vault.used_password('changed again'))
+
+    def test_sync_digest(self):
+        """Test sync digest is kept up to date as entries change."""
+
+        def leaves_digest(vault):
+            return (
+                sum(vt._leaf_hash(*leaf) for leaf in vault.sync_leaves())
+                % (1 << 8 * vt.SYNC_DIGEST_SIZE)
+                ).to_bytes(vt.SYNC_DIGEST_SIZE, 'big')
+
+        with vt.Vault.open(self.first, self.material) as vault:
+            digest = vault.sync_digest
+            self.assertEqual(digest, leaves_digest(vault))
+
+            vault.update(vt.new_entry('entry 1', password='changed'))
+            vault.delete('entry 2')
+            vault.save()
+            vault.add(vt.new_entry('entry 2'))
+            vault.delete('entry 3')
+            vault.save()
+            self.assertNotEqual(vault.sync_digest, digest)
+            digest = vault.sync_digest
+            self.assertEqual(digest, leaves_digest(vault))
+
+            vault.checkpoint()
+            self.assertEqual(vault.sync_digest, digest)
+
+        with vt.Vault.open(self.first, self.material) as vault:
+            self.assertEqual(vault.sync_digest, digest)
+            vault.compact()
+            self.assertEqual(vault.sync_digest, digest)
+
+        # Damaged header makes the whole log replay.
+        with open(self.second, 'r+b') as f:
+            f.seek(vt.HEADER_OFFSET)
+            f.write(b'\xff' * 4)
+
+        with vt.Vault.open(self.second, self.material) as vault:
+            self.assertEqual(vault.sync_digest, leaves_digest(vault))
+
+    def test_newer_version_wins(self):
+        """Test copy with more changes of an entry wins."""
+
+        with vt.Vault.open(self.first, self.material) as vault:
+            vault.update(vt.new_entry('entry 5', password='once'))
+            vault.save()
+
+        with vt.Vault.open(self.second, self.material) as vault:
+            vault.delete('entry 5')
+            vault.save()
+            vault.add(vt.new_entry('entry 5', password='twice'))
+            vault.save()
+
+        self.assertEqual(self._sync(), (1, 0, 0))
+        self.assertIn(('entry 5', 'twice'), self._entries(self.first))
+
+    def test_conflict(self):
+        """Test concurrent changes of an entry converge."""
+
+        with vt.Vault.open(self.first, self.material) as vault:
+            vault.update(vt.new_entry('entry 6', password='first'))
+            vault.save()
+
+        with vt.Vault.open(self.second, self.material) as vault:
+            vault.delete('entry 6')
+            vault.save()
+
+        self.assertEqual(sum(self._sync()[:2]), 1)
+        self.assertEqual(self._sync(), (0, 0, 0))
+        self.assertEqual(
+            self._entries(self.first),
+            self._entries(self.second)
+            )
+
+    def test_forged_version(self):
+        """Test that stale record with a raised version does not win."""
+
+        with vt.Vault.open(self.first, self.material) as vault:
+            vault.update(vt.new_entry('entry 5', password='newer'))
+            vault.save()
+
+        # Frames after the checkpoint are checked as the log is replayed,
+        # those before it as they are read.
+        with vt.Vault.open(self.second, self.material) as vault:
+            vault.checkpoint()
+            offset, _ = vault._stored_slot(vault._tag('entry 5'))
+
+        with open(self.second, 'r+b') as f:
+            f.seek(offset + vt._FRAME.size)
+            f.write(vt._VERSION.pack(100))
+
+        with vt.Vault.open(self.second, self.material) as vault:
+            with self.assertRaises(ValueError):
+                vault.get('entry 5')
+
+        with self.assertRaises(ValueError):
+            self._sync()
+
+        self.assertIn(('entry 5', 'newer'), self._entries(self.first))
+
+    def test_removals_survive_compaction(self):
+        """Test removed entries are not brought back after compaction."""
+
+        with vt.Vault.open(self.first, self.material) as vault:
+            vault.delete('entry 7')
+            vault.save()
+            vault.compact()
+
+        with vt.Vault.open(self.first, self.material) as vault:
+            self.assertEqual(vault._version(vault._tag('entry 7')), 2)
+
+        self.assertEqual(self._sync(), (0, 1, 0))
+        self.assertNotIn('entry 7', dict(self._entries(self.second)))
+
+    def test_different_key(self):
+        """Test vaults with different data keys are not synced."""
+
+        other = os.path.join(self.tmp.name, 'other.bkp')
+        material = KeyMaterial(Fernet.generate_key())
+        vt.Vault.create(other, material).close()
+
+        with vt.Vault.open(self.first, self.material) as first, \
+                vt.Vault.open(other, material) as second:
+            with self.assertRaises(ValueError):
+                vs.sync(first, second)
+
+# ==============================================================================
+# Main Section
+# ==============================================================================
+if __name__ == '__main__':
+    unittest.main()
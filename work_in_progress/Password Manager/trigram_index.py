@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""trigram_index.py - In-memory trigram index for fuzzy search of entries.
+
+Fuzzy search finds entries whose title or URL resembles the query even when the
+query is partial or misspelled. Field values are normalized (see
+blind_index.normalize()) and URLs are stripped of the top level domain, so
+'https://www.github.com/login' is indexed as 'github'. Values are split into
+words, and each word, padded with two spaces in front and one behind, is split
+into trigrams. Similarity of the query and a field value is the Dice
+coefficient of their trigram sets, and entry score is the best similarity of
+its fields.
+
+Index is built from decrypted entries, so it exists only in memory and only
+while the vault is unlocked. It is held in compact arrays: trigrams are mapped
+to numbers, and for every trigram the sorted numbers of the field values
+holding it are stored as a slice of a single array of postings. Query walks
+only the postings of its rarest trigrams, as many as a value has to hold at
+least one of to reach the score threshold. Remaining trigrams, the most common
+ones, are looked up for the candidates found by binary search in their
+postings.
+
+Example:
+    >>> index = TrigramIndex(vault.entries())
+    >>> index.search('githb')
+    [('GitHub', 0.6153846153846154)]
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * trigram_index.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from __future__ import annotations
+from array import array
+from bisect import bisect_left
+from collections import Counter
+import heapq
+import math
+import re
+import blind_index as bi
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+FUZZY_FIELDS = ('title', 'url')
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 1000
+DEFAULT_THRESHOLD = 0.3
+
+_WORD_SEPARATOR = re.compile(r'\W+')
+_HOST = re.compile(r'[\w-]+(\.[\w-]+)+')
+
+
+# ==============================================================================
+# Functions Section
+# ==============================================================================
+
+def site(value: str) -> str:
+    """Returns host name of the URL without the 'www.' prefix and the top
+    level domain, which only add trigrams shared by most of the URLs.
+
+    Args:
+        value (str): URL or host name.
+
+    Returns:
+        str: host name without the top level domain.
+    """
+
+    host = bi.normalize('url', value)
+    labels = host.rsplit('.', 1)
+
+    return labels[0] if len(labels) > 1 and labels[0] else host
+
+def _value_trigrams(field: str, value: str) -> set:
+    """Returns trigrams of the indexed field value.
+    """
+
+    if field == 'url':
+        return trigrams(site(value))
+
+    return trigrams(bi.normalize(field, value))
+
+def trigrams(value: str) -> set:
+    """Returns set of trigrams of the words of given value.
+
+    Args:
+        value (str): field value or search query.
+
+    Returns:
+        set: trigrams of the value.
+    """
+
+    grams = set()
+
+    for word in _WORD_SEPARATOR.split(value.casefold()):
+        if word:
+            padded = '  ' + word + ' '
+            grams.update(
+                padded[start:start + 3] for start in range(len(padded) - 2)
+                )
+
+    return grams
+
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+
+class TrigramIndex():
+    """Trigram index of entry titles and URLs.
+
+    Index is built from an iterable of entries and does not follow later
+    changes of the vault; build a new index when entries change.
+    """
+
+    def __init__(self: TrigramIndex, entries):
+        self._titles = list()
+
+        # Entry number and trigram count of every indexed field value.
+        self._owners = array('L')
+        self._sizes = array('L')
+
+        postings = dict()
+
+        for entry in entries:
+            number = len(self._titles)
+            self._titles.append(entry['title'])
+
+            for field in FUZZY_FIELDS:
+                grams = _value_trigrams(field, entry.get(field, ''))
+
+                if not grams:
+                    continue
+
+                value = len(self._owners)
+                self._owners.append(number)
+                self._sizes.append(len(grams))
+
+                for gram in grams:
+                    postings.setdefault(gram, list()).append(value)
+
+        # Postings of trigram number n are stored in
+        # self._postings[self._offsets[n]:self._offsets[n + 1]].
+        self._grams = dict()
+        self._offsets = array('L', [0])
+        self._postings = array('L')
+
+        for number, (gram, values) in enumerate(postings.items()):
+            self._grams[gram] = number
+            self._postings.extend(values)
+            self._offsets.append(len(self._postings))
+
+    def __len__(self: TrigramIndex) -> int:
+        return len(self._titles)
+
+    def _counts(self: TrigramIndex, grams: set, needed: int) -> Counter:
+        """Returns mapping of field value numbers to the number of given
+        trigrams they hold. Values holding less than the needed number of
+        trigrams may be left out.
+        """
+
+        postings = list()
+
+        for gram in grams:
+            number = self._grams.get(gram)
+            if number is not None:
+                postings.append(
+                    (self._offsets[number], self._offsets[number + 1])
+                    )
+
+        if len(postings) < needed:
+            return Counter()
+
+        # Value holding the needed number of trigrams holds at least one of
+        # any len(postings) - needed + 1 of them, so only postings of the
+        # rarest ones are walked. Remaining trigrams are looked up for the
+        # candidates found.
+        postings.sort(key=lambda bounds: bounds[1] - bounds[0])
+        walked = len(postings) - needed + 1
+        counts = Counter()
+
+        for start, end in postings[:walked]:
+            counts.update(self._postings[start:end])
+
+        for start, end in postings[walked:]:
+            for value in counts:
+                position = bisect_left(self._postings, value, start, end)
+                if position < end and self._postings[position] == value:
+                    counts[value] += 1
+
+        return counts
+
+    def search(
+            self: TrigramIndex,
+            query: str,
+            limit: int = DEFAULT_LIMIT,
+            threshold: float = DEFAULT_THRESHOLD
+            ) -> list:
+        """Returns entries resembling the query, best matches first.
+
+        Args:
+            query (str): searched title or URL, partial or misspelled.
+            limit (int): maximum number of returned entries.
+            threshold (float): minimum score of returned entries.
+
+        Returns:
+            list: (title, score) tuples ordered by descending score.
+        """
+
+        # Query that looks like a URL or a host name is searched for as one.
+        if '://' in query or _HOST.fullmatch(query.strip()):
+            query = site(query)
+
+        grams = trigrams(query)
+
+        if not grams:
+            return list()
+
+        # Value holding c of the query trigrams holds at least c trigrams, so
+        # it scores at most 2c / (len(grams) + c).
+        needed = max(
+            1,
+            math.ceil(threshold * len(grams) / (2.0 - threshold) - 1e-9)
+            )
+        scores = dict()
+
+        for value, common in self._counts(grams, needed).items():
+            score = 2.0 * common / (len(grams) + self._sizes[value])
+            owner = self._owners[value]
+            if score >= threshold and score > scores.get(owner, 0.0):
+                scores[owner] = score
+
+        best = heapq.nsmallest(
+            limit,
+            scores.items(),
+            key=lambda item: (-item[1], self._titles[item[0]])
+            )
+
+        return [(self._titles[owner], score) for owner, score in best]
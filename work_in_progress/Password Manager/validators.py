@@ -37,6 +37,7 @@
 # Modules Import Section
 # ==============================================================================
 
+from __future__ import annotations
 from pathlib import Path
 
 
@@ -177,6 +178,7 @@ class ValidateArgument():
         'integer': (int,),
         'iterable': (tuple, list,),
         'string': (str,),
+        'bytes': (bytes, bytearray,),
         }
 
     def __init__(self: ValidateArgument, arg_name: str, arg_type: str, def_val: bool, accept_none: bool):
@@ -261,7 +263,11 @@ class ValidateFileInput(ValidateInput):
     valid input. Use 'existent' argument to specify whether or not file has to
     exist on the system. Use 'file_type' argument to specify file type. It can
     be either 'file' or 'directory'. If 'file_type' argument is not passed to
-    constructor, it is assumed that file of any type is a valid input.
+    constructor, it is assumed that file of any type is a valid input. Use
+    'signature' argument to specify bytes an existing file has to start with,
+    e.g. magic of a file format. Only as many bytes as signature has are read
+    from the file, so the format version, if any, is left to the reader of
+    the format to check.
     """
 
     def __init__(self: ValidateFileInput, **kwargs):
@@ -273,7 +279,8 @@ class ValidateFileInput(ValidateInput):
         not file has to exist on the system. Use 'file_type' argument to specify
         file type. It can be either 'file' or 'directory'. If 'file_type'
         argument is not passed to constructor, it is assumed that file of any
-        type is a valid input.
+        type is a valid input. Use 'signature' argument to specify bytes an
+        existing file has to start with.
         """
 
         # Call base class constructor.
@@ -305,6 +312,14 @@ class ValidateFileInput(ValidateInput):
             )
         check_type.validate(**kwargs)
 
+        check_signature = ValidateArgument(
+            'signature',
+            'bytes',
+            True,
+            True
+            )
+        check_signature.validate(**kwargs)
+
         # Initialize object attributes.
         if 'accept_none' not in kwargs:
             self._accept_none = False
@@ -321,6 +336,11 @@ class ValidateFileInput(ValidateInput):
         else:
             self._type = kwargs['file_type']
 
+        if 'signature' not in kwargs:
+            self._signature = None
+        else:
+            self._signature = kwargs['signature']
+
     def validate(self: ValidateFileInput, user_input: UserInput) -> bool:
         """Execute code to validate user input.
         """
@@ -361,6 +381,16 @@ class ValidateFileInput(ValidateInput):
 
                     return False
 
+                # If set check if existing file starts with the signature of
+                # required file format.
+                if self._signature is not None and path.exists() \
+                        and not self._has_signature(path):
+                    self._message = 'File with path "{0}" is not of '\
+                        .format(path.resolve())\
+                        + 'required file format'
+
+                    return False
+
             return True
 
         if self._accept_none:
@@ -371,6 +401,17 @@ class ValidateFileInput(ValidateInput):
 
         return False
 
+    def _has_signature(self: ValidateFileInput, path: Path) -> bool:
+        """Check if file starts with the signature. Unreadable file does not.
+        """
+
+        try:
+            with path.open('rb') as file:
+                return file.read(len(self._signature)) == self._signature
+
+        except OSError:
+            return False
+
 
 class ValidateNumericalInput(ValidateInput):
     """Validates user supplied numerical input.
@@ -0,0 +1,2717 @@
+#!/usr/bin/env python3
+"""vault.py - Log structured, record level encrypted password vault.
+
+Vault stores every entry as a separately encrypted record, so a single entry
+can be read by decrypting only that record. Vault file is an append-only log,
+which serves as its own write-ahead journal. Adding or changing an entry
+appends a new record, removing an entry appends a tombstone, so saving a change
+costs as much as writing the changed records, regardless of the vault size.
+Space taken by superseded records is reclaimed by compaction, which rewrites
+the vault with live records only.
+
+Vault file starts with the preamble and header (see VaultHeader) and the key
+slot tables (see Vault._write_key_table()), followed by the log, a sequence of
+frames of kind (uint8) | tag (16 bytes) | length (uint32) | payload. Payload
+of each frame kind is described by the Vault method writing it.
+
+Records are located through an offset table (index) that maps keyed tags of
+entry titles to record frame offsets and sizes. Index is periodically written to
+the log as a checkpoint, and the header points to the latest checkpoint. On
+open only the frames appended after the checkpoint have to be replayed. Index
+slots in a checkpoint are sorted by tag, so a lookup is a binary search over
+the index followed by a single record decryption, no matter how many entries
+the vault holds. Tags are keyed hashes of entry titles, so the index does not
+reveal them. Blind index tokens of every record (see blind_index.py), held by
+checkpoints as sorted postings, let entries be searched by title, URL or user
+name decrypting only the records of matching entries.
+
+Envelope encryption: records, tags, MACs and blind index tokens are all keyed
+with a random data key. Every member of the vault has a key slot holding the
+data key wrapped with the member's passphrase key material, derived with the
+key derivation function named in the preamble (see kdf.py). Adding or
+removing a member or changing a passphrase writes a single key slot, whatever
+the vault size, and a wrong passphrase is rejected before any of the log is
+read (see Vault.check_passphrase()).
+
+Crash safety: all changes staged for a save are appended as a single group,
+closed by a commit frame, and synced once, so a bulk operation such as an
+import costs one sync however many records it writes. On open, frames of a
+group are applied only once its commit frame is read; group cut short by a
+crash is ignored as a whole and overwritten by the next save, so a save is
+either applied completely or not at all. Frames are synced before the header
+is updated to point to a new checkpoint, and a checkpoint commits the frames
+preceding it. Files are replaced by atomic renames followed by a sync of the
+directory. If header itself is damaged, the whole log is replayed from the
+start. Key slots are written one table copy at a time, the second copy
+first, and every slot carries its own CRC, so a crash never leaves a slot
+without an intact copy.
+
+Writers hold an exclusive lock on the vault file while they write, and fail
+if another writer logged a group or replaced the file since the vault was
+read, rather than overwrite its changes.
+
+Every record and tombstone carries a version counter of its entry, one more
+than the version it replaces, authenticated together with its tag by the HMAC
+closing the frame. Checkpoints keep the versions of removed entries and the
+sync digest, a sum of hashes of the versions and record MACs of all entries,
+so two copies of a vault can be merged without losing track of removals and
+identical copies are recognized without reading their records (see
+vault_sync.py).
+
+Every password ever stored in the vault is remembered in a password history,
+a keyed Bloom filter (see password_history.py), so that an update can reject
+a password used before without decrypting any old record. Saving a password
+appends only the changes of the history (see Vault._write_history()).
+
+Records are compressed before encryption (see vault_codecs.py) and encrypted
+with the record cipher (see vault_ciphers.py) named in the preamble. Fuzzy
+search of titles and URLs uses a trigram index (see trigram_index.py) built
+from decrypted entries on first use and kept in memory only.
+
+Vault file is memory mapped for reading. Header, index and records are accessed
+through memoryview slices of the mapping and are handed to decryption without
+being copied into intermediate bytes objects, so opening the vault touches only
+the pages holding the header, the log tail and the index slots visited by the
+lookup.
+
+Example:
+    >>> with Vault.open('passwords.bkp', material) as vault:
+    >>>     entry = vault.get('github')
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * vault.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from __future__ import annotations
+from cryptography.hazmat.primitives import keywrap
+import base64 as b64
+import contextlib
+import fcntl
+import hashlib as hl
+import hmac
+import json
+import mmap
+import os
+import struct
+import zlib
+import blind_index as bi
+import kdf
+import key_cache as kc
+import password_history as ph
+import trigram_index as ti
+import vault_ciphers as vcp
+import vault_codecs as vc
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+MAGIC = b'PMVAULT\x00'
+FORMAT_VERSION = 1
+
+# Oldest format version able to read files written by this version. It is
+# raised only by changes older readers can not skip over.
+COMPATIBLE_VERSION = 1
+
+# Oldest format version whose files this version can read.
+READABLE_VERSION = 1
+
+ENTRY_FIELDS = ('title', 'username', 'password', 'url', 'notes')
+
+TAG_SIZE = 16
+MAC_SIZE = 32
+INDEX_LABEL = b'vault-index'
+LOG_LABEL = b'vault-log'
+WRAP_LABEL = b'vault-key-wrap'
+SLOT_LABEL = b'vault-key-slot'
+
+DATA_KEY_SIZE = 32
+WRAPPED_KEY_SIZE = DATA_KEY_SIZE + 8
+SALT_SIZE = kdf.SALT_SIZE
+KEY_COPIES = 2
+DEFAULT_KEY_SLOTS = 8
+OWNER = 'owner'
+
+# Number of frames appended after the last checkpoint that triggers writing of
+# a new checkpoint on save.
+CHECKPOINT_INTERVAL = 256
+
+# Password history of a vault is sized for this many passwords per entry, at
+# least, leaving room for password changes before it has to grow.
+HISTORY_PER_ENTRY = 2
+
+SYNC_DIGEST_SIZE = 32
+SYNC_LABEL = b'vault-sync'
+
+FRAME_RECORD = 1
+FRAME_TOMBSTONE = 2
+FRAME_CHECKPOINT = 3
+FRAME_COMMIT = 4
+FRAME_HISTORY = 5
+FRAME_HISTORY_DELTA = 6
+
+# Sections of the vault file listed in the header.
+SECTION_KEYS = 1
+SECTION_LOG = 2
+SECTION_INDEX = 3
+SECTION_HISTORY = 4
+SECTION_SLOTS = 8
+_SECTIONS = (SECTION_KEYS, SECTION_LOG, SECTION_INDEX, SECTION_HISTORY)
+
+_PREAMBLE = struct.Struct('>8sHHHBBBII{0}s'.format(SALT_SIZE))
+HEADER_OFFSET = _PREAMBLE.size
+_HEADER = struct.Struct('>IB')
+_SECTION = struct.Struct('>BQQ')
+_CRC = struct.Struct('>I')
+HEADER_SIZE = HEADER_OFFSET + _HEADER.size + SECTION_SLOTS * _SECTION.size \
+    + _CRC.size
+SIGNATURE = MAGIC
+_KEY_SLOT = struct.Struct('>{0}s{0}s{1}sI'.format(TAG_SIZE, WRAPPED_KEY_SIZE))
+_EMPTY = bytes(TAG_SIZE)
+_REMOVED = b'\xff' * TAG_SIZE
+_FRAME = struct.Struct('>B{0}sI'.format(TAG_SIZE))
+_SLOT = struct.Struct('>{0}sQI'.format(TAG_SIZE))
+_POSTING = struct.Struct('>{0}s{1}s'.format(bi.TOKEN_SIZE, TAG_SIZE))
+_COUNT = struct.Struct('>I')
+_COUNT16 = struct.Struct('>H')
+_COMMIT = struct.Struct('>IQ')
+_CHECKPOINT = struct.Struct('>IQII{0}s'.format(SYNC_DIGEST_SIZE))
+_REMOVED_ENTRY = struct.Struct('>{0}sI'.format(TAG_SIZE))
+_VERSION = struct.Struct('>I')
+_DIGEST_MODULUS = 1 << (8 * SYNC_DIGEST_SIZE)
+
+
+# ==============================================================================
+# File Utilities Section
+# ==============================================================================
+
+def fsync_directory(path: str):
+    """Sync directory holding the file, so that creation, rename or removal of
+    the file is durable.
+
+    Args:
+        path (str): path of the file.
+    """
+
+    descriptor = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+# ==============================================================================
+# Entry Utilities Section
+# ==============================================================================
+
+def new_entry(
+        title: str,
+        username: str = '',
+        password: str = '',
+        url: str = '',
+        notes: str = ''
+        ) -> dict:
+    """Returns new vault entry.
+
+    Args:
+        title (str): unique entry title.
+        username (str): user name.
+        password (str): password.
+        url (str): site URL.
+        notes (str): free form notes.
+
+    Returns:
+        dict: vault entry.
+    """
+
+    entry = {
+        'title': title,
+        'username': username,
+        'password': password,
+        'url': url,
+        'notes': notes,
+        }
+    validate_entry(entry)
+
+    return entry
+
+def validate_entry(entry: dict):
+    """Raises TypeError or ValueError if entry is not a valid vault entry.
+
+    Valid entry is a dictionary holding only string values for the keys listed
+    in ENTRY_FIELDS, with non empty title.
+    """
+
+    if not isinstance(entry, dict):
+        raise TypeError(
+            'Trying to pass non \'dict\' value as argument \'{0}({1})\''
+            .format(type(entry).__name__, entry)
+            )
+
+    for field, value in entry.items():
+        if field not in ENTRY_FIELDS:
+            raise ValueError('Unsupported entry field "{0}"'.format(field))
+
+        if not isinstance(value, str):
+            raise TypeError(
+                'Trying to pass non \'string\' value as entry field '
+                + '\'{0}({1})\''.format(field, type(value).__name__)
+                )
+
+    if not entry.get('title'):
+        raise ValueError('Entry title must be a non empty string')
+
+
+# ==============================================================================
+# Data Key Section
+# ==============================================================================
+
+def new_data_key() -> bytes:
+    """Returns new random data key in the form accepted by KeyMaterial.
+    """
+
+    return b64.urlsafe_b64encode(os.urandom(DATA_KEY_SIZE))
+
+def wrap_key(material: kc.KeyMaterial, data_key: bytes) -> bytes:
+    """Returns data key wrapped with given (passphrase) key material.
+
+    Args:
+        material (KeyMaterial): passphrase key material.
+        data_key (bytes): data key as returned by new_data_key().
+
+    Returns:
+        bytes: wrapped data key, WRAPPED_KEY_SIZE bytes long.
+    """
+
+    return keywrap.aes_key_wrap(
+        bytes(material.subkey(WRAP_LABEL)),
+        b64.urlsafe_b64decode(data_key)
+        )
+
+def unwrap_key(material: kc.KeyMaterial, wrapped) -> bytes:
+    """Returns data key unwrapped with given (passphrase) key material.
+    Raises ValueError if the data key was wrapped with other key material or
+    if the wrapped key is corrupted.
+
+    Args:
+        material (KeyMaterial): passphrase key material.
+        wrapped: wrapped data key as any bytes-like object.
+
+    Returns:
+        bytes: data key.
+    """
+
+    try:
+        data_key = keywrap.aes_key_unwrap(
+            bytes(material.subkey(WRAP_LABEL)),
+            bytes(wrapped)
+            )
+    except keywrap.InvalidUnwrap:
+        raise ValueError('Invalid passphrase or corrupted vault key') from None
+
+    return b64.urlsafe_b64encode(data_key)
+
+def key_locator(material: kc.KeyMaterial, salt: bytes) -> bytes:
+    """Returns locator of the key slot of the member with given passphrase
+    key material.
+
+    Args:
+        material (KeyMaterial): passphrase key material.
+        salt (bytes): vault salt.
+
+    Returns:
+        bytes: key slot locator.
+    """
+
+    return hmac.new(
+        material.subkey(SLOT_LABEL),
+        salt,
+        hl.sha256
+        ).digest()[:TAG_SIZE]
+
+def member_tag(salt: bytes, name: str) -> bytes:
+    """Returns tag identifying vault member with given name.
+
+    Args:
+        salt (bytes): vault salt.
+        name (str): member name.
+
+    Returns:
+        bytes: member tag.
+    """
+
+    if not isinstance(name, str) or not name:
+        raise ValueError('Member name must be a non empty string')
+
+    return hmac.new(salt, name.encode('utf-8'), hl.sha256).digest()[:TAG_SIZE]
+
+def _probe(locator: bytes, capacity: int):
+    """Yields positions of the key slot table probed for given locator.
+    """
+
+    start = int.from_bytes(locator[:4], 'big') & (capacity - 1)
+
+    for step in range(capacity):
+        yield (start + step) & (capacity - 1)
+
+def _key_table(capacity: int, key_slots: list) -> list:
+    """Returns key slot table of given capacity holding given key slots.
+    """
+
+    table = [(_EMPTY, _EMPTY, bytes(WRAPPED_KEY_SIZE))] * capacity
+
+    for key_slot in key_slots:
+        for position in _probe(key_slot[0], capacity):
+            if table[position][0] == _EMPTY:
+                table[position] = key_slot
+                break
+
+    return table
+
+
+# ==============================================================================
+# Record Sealing Section
+# ==============================================================================
+
+def entry_tag(material: kc.KeyMaterial, title: str) -> bytes:
+    """Returns index tag for given entry title.
+
+    Args:
+        material (KeyMaterial): vault key material.
+        title (str): entry title.
+
+    Returns:
+        bytes: index tag.
+    """
+
+    return hmac.new(
+        material.subkey(INDEX_LABEL),
+        title.encode('utf-8'),
+        hl.sha256
+        ).digest()[:TAG_SIZE]
+
+def seal_entry(
+        material: kc.KeyMaterial,
+        entry: dict,
+        codec: str = vc.DEFAULT_CODEC,
+        cipher: str = vcp.DEFAULT_CIPHER
+        ) -> tuple:
+    """Returns sealed entry, i.e. its index tag, raw encrypted record and blind
+    index tokens, ready to be staged with Vault.add_sealed().
+
+    Sealing does not depend on the vault state, so entries can be sealed in
+    worker processes and staged in the vault afterwards.
+
+    Args:
+        material (KeyMaterial): vault key material.
+        entry (dict): vault entry.
+        codec (str): name of the codec compressing the record (see
+            vault_codecs.py).
+        cipher (str): name of the cipher encrypting the record (see
+            vault_ciphers.py).
+
+    Returns:
+        tuple: (tag, raw record, sorted blind index tokens).
+    """
+
+    validate_entry(entry)
+
+    plain = vc.encode(
+        codec,
+        json.dumps(entry, separators=(',', ':')).encode('utf-8')
+        )
+
+    return (
+        entry_tag(material, entry['title']),
+        vcp.encrypt(material, cipher, plain),
+        sorted(bi.entry_tokens(material.subkey(bi.BLIND_INDEX_LABEL), entry))
+        )
+
+def open_entry(
+        material: kc.KeyMaterial,
+        raw,
+        cipher: str = vcp.DEFAULT_CIPHER
+        ) -> dict:
+    """Returns entry decrypted from given raw record. Raises ValueError if
+    record can not be decrypted with given key material.
+
+    Args:
+        material (KeyMaterial): vault key material.
+        raw: raw record as any bytes-like object.
+        cipher (str): name of the cipher the record is encrypted with.
+
+    Returns:
+        dict: vault entry.
+    """
+
+    plain = vcp.decrypt(material, cipher, raw)
+
+    return json.loads(vc.decode(plain).decode('utf-8'))
+
+def _leaf_hash(tag: bytes, value: bytes) -> int:
+    """Returns hash of the sync leaf of an entry as an integer. Sync digest
+    of a vault is the sum of the hashes of all its leaves, so it is updated
+    leaf by leaf as entries change.
+    """
+
+    return int.from_bytes(
+        hl.blake2b(
+            tag + value,
+            digest_size=SYNC_DIGEST_SIZE,
+            person=SYNC_LABEL
+            ).digest(),
+        'big'
+        )
+
+
+# ==============================================================================
+# Vault Class Section
+# ==============================================================================
+
+class VaultHeader():
+    """Preamble and header of a vault file.
+
+    Preamble and header make up a block at the start of the file, which
+    describes everything needed to plan all other reads: the parameters of
+    key derivation, record codec and cipher, the number of records and a
+    table of sections, i.e. the key slot tables, the log up to the latest
+    checkpoint, the latest checkpoint (index) and its history frame. It is
+    read in one piece, e.g. by read_header() to inspect a vault file without
+    opening it. Preamble changes only when the vault is rewritten, while
+    header is updated with every checkpoint, not with every save:
+
+        preamble:  magic (8 bytes) | format version (uint16) | oldest format
+                   version able to read the file (uint16) | size of the
+                   preamble and header (uint16) | record codec (uint8) |
+                   record cipher (uint8) | key derivation function (uint8) |
+                   key derivation cost (uint32) | key slot count (uint32) |
+                   salt (16 bytes)
+        header:    record count at the latest checkpoint (uint32) | section
+                   count (uint8) | section table entries of section id
+                   (uint8) | offset (uint64) | size (uint64), padded to the
+                   header size | CRC32 of the preceding header bytes (uint32)
+
+    Header is self-describing: readers accept a larger header and ignore
+    sections they do not know, so later format features can add sections of
+    their own without scanning the file. Writer updating the header of such
+    a file keeps only the sections it knows, which are always rebuilt from
+    the log. Reader accepts files of its own and older format versions back
+    to READABLE_VERSION, and newer files that still name its own format
+    version as readable. File can be recognized by its SIGNATURE, the magic;
+    format versions are checked only by the reader.
+
+    Use class method 'from_bytes()', or function 'read_header()', to obtain
+    VaultHeader object. Header that fails its CRC check is reported as not
+    intact, with no record count and no sections, while the preamble is
+    always valid. Header is written at checkpoints only, so
+    'checkpoint_count' and 'sections' describe the vault as of its latest
+    checkpoint; frames saved since are found by replaying the log that
+    follows the index section. Sections are known sections only, keyed by
+    section id.
+    """
+
+    def __init__(
+            self: VaultHeader,
+            codec: str,
+            cipher: str,
+            kdf_parameters: kdf.KdfParameters,
+            capacity: int,
+            checkpoint_count: int = None,
+            sections: dict = None,
+            version: int = FORMAT_VERSION,
+            size: int = HEADER_SIZE
+            ):
+        self.codec = codec
+        self.cipher = cipher
+        self.kdf_parameters = kdf_parameters
+        self.capacity = capacity
+        self.checkpoint_count = checkpoint_count
+        self.sections = sections or dict()
+        self.version = version
+        self.size = size
+
+    @classmethod
+    def from_bytes(cls, data) -> VaultHeader:
+        """Return header read from the start of the vault file, which has to
+        hold the whole header (see header_size()). Raises ValueError if data
+        does not start with a valid preamble, or if the file can not be read
+        by this format version.
+        """
+
+        size = header_size(data)
+
+        if len(data) < size:
+            raise ValueError('File is not a password vault')
+
+        _, version, _, _, codec, cipher, kdf_id, cost, capacity, salt \
+            = _PREAMBLE.unpack_from(data, 0)
+
+        if capacity < 1 or capacity & (capacity - 1):
+            raise ValueError('Vault key slots are corrupted')
+
+        header = cls(
+            vc.codec_name(codec),
+            vcp.cipher_name(cipher),
+            kdf.KdfParameters(kdf.kdf_name(kdf_id), cost, salt),
+            capacity,
+            version=version,
+            size=size
+            )
+        end = size - _CRC.size
+        (crc, ) = _CRC.unpack_from(data, end)
+
+        if crc != zlib.crc32(data[HEADER_OFFSET:end]):
+            return header
+
+        count, sections = _HEADER.unpack_from(data, HEADER_OFFSET)
+        start = HEADER_OFFSET + _HEADER.size
+
+        if start + sections * _SECTION.size > end:
+            return header
+
+        header.checkpoint_count = count
+        header.sections = {
+            section: (offset, length)
+            for section, offset, length in _SECTION.iter_unpack(
+                data[start:start + sections * _SECTION.size]
+                )
+            if section in _SECTIONS
+            }
+
+        return header
+
+    @property
+    def intact(self: VaultHeader) -> bool:
+        """Return whether or not the header passed its CRC check.
+        """
+
+        return self.checkpoint_count is not None
+
+
+def header_size(data) -> int:
+    """Return size of the preamble and header of the vault file, given at
+    least its first HEADER_SIZE bytes. Raises ValueError if data does not
+    start with a vault preamble, or if the file can not be read by this
+    format version.
+
+    Args:
+        data (bytes): start of the vault file.
+
+    Returns:
+        int: size of the preamble and header.
+    """
+
+    if len(data) < HEADER_SIZE:
+        raise ValueError('File is not a password vault')
+
+    magic, version, compatible, size, *_ = _PREAMBLE.unpack_from(data, 0)
+
+    if magic != MAGIC:
+        raise ValueError('File is not a password vault')
+
+    if version < READABLE_VERSION or compatible > FORMAT_VERSION \
+            or compatible > version:
+        raise ValueError(
+            'Unsupported vault format version {0}'.format(version)
+            )
+
+    if size < HEADER_SIZE:
+        raise ValueError('Vault header is corrupted')
+
+    return size
+
+
+def read_header(path: str) -> VaultHeader:
+    """Returns preamble and header of the vault file, read in a single read
+    of HEADER_SIZE bytes, followed by a read of the rest of the header if the
+    file has a larger one. Raises ValueError if file is not a valid vault.
+
+    Args:
+        path (str): path of the vault file.
+
+    Returns:
+        VaultHeader: vault header.
+    """
+
+    with open(path, 'rb') as vault_file:
+        data = vault_file.read(HEADER_SIZE)
+        size = header_size(data)
+
+        if size > len(data):
+            data += vault_file.read(size - len(data))
+
+        return VaultHeader.from_bytes(data)
+
+
+class Vault():
+    """Log structured, record level encrypted password vault.
+
+    Use class methods 'create()' and 'open()' to obtain Vault object. Both
+    take key material derived from the passphrase, which is used only to
+    unwrap the data key; use 'material' to get key material of the data key.
+    Changes made through 'add()', 'update()' and 'delete()' are staged in
+    memory and are appended to the vault file on 'save()'. Closing the vault
+    discards unsaved changes and wipes the data key. Use 'compact()' to
+    reclaim space taken by superseded records and tombstones.
+    """
+
+    def __init__(self: Vault, path: str, material: kc.KeyMaterial):
+        if not isinstance(material, kc.KeyMaterial):
+            raise TypeError(
+                'Trying to pass non \'KeyMaterial\' object as argument '
+                + '\'{0}({1})\''.format(type(material).__name__, material)
+                )
+
+        self._path = path
+        self._passphrase_material = material
+        self._file = None
+        self._map = None
+        self._view = None
+
+        # Index of the latest checkpoint, a view of the sorted slots, and its
+        # blind index, a view of the sorted postings.
+        self._count = 0
+        self._index = b''
+        self._posting_count = 0
+        self._postings = b''
+        self._checkpoint_size = 0
+        self._checkpoint_at = None
+
+        # Sorted tags and versions of the entries removed before the latest
+        # checkpoint, a view of the checkpoint.
+        self._removed_count = 0
+        self._removed = b''
+
+        # Changes logged after the latest checkpoint, mapping tags to
+        # (offset, size) of the record frame or to None for tombstones, blind
+        # index tokens of the records and versions of the tombstones logged
+        # after the checkpoint.
+        self._overlay = dict()
+        self._tail_postings = dict()
+        self._tail_removed = dict()
+        self._tail = 0
+
+        # End of the last complete frame in the log, number of live records
+        # stored in the log and the sum of sync leaf hashes of all entries
+        # stored in the log (see sync_digest).
+        self._end = 0
+        self._live = 0
+        self._digest = 0
+
+        # Unsaved changes, mapping tags to (raw record, blind index tokens) or
+        # to None for removed entries. Only these records are written on save.
+        self._pending = dict()
+
+        # Offset and size of the latest history frame and of the history delta
+        # frames logged after it, password history read from them (or new
+        # one) on first use, and whether or not it has to be written on save.
+        # Passwords of unsaved changes, mapping tags to passwords, are added to
+        # the history on save.
+        self._history_at = None
+        self._history_deltas = list()
+        self._history = None
+        self._history_changed = False
+        self._staged_passwords = dict()
+
+        # Trigram index of all entries, built on first fuzzy search.
+        self._trigrams = None
+
+        # Data key material and its subkeys, set once the data key is
+        # unwrapped, and the tag of the member whose key slot was unwrapped.
+        self._material = None
+        self._log_key = None
+        self._search_key = None
+        self._member = None
+
+        # Vault salt, passphrase key derivation parameters (sharing the
+        # salt), the size of the preamble and header, the number of slots in
+        # a key slot table, the name of the codec compressing new records and
+        # the name of the record cipher.
+        self._salt = None
+        self._kdf = None
+        self._header_size = HEADER_SIZE
+        self._capacity = 0
+        self._codec = vc.DEFAULT_CODEC
+        self._cipher = vcp.DEFAULT_CIPHER
+
+    def __enter__(self: Vault) -> Vault:
+        return self
+
+    def __exit__(self: Vault, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self: Vault) -> int:
+        count = self._live
+
+        for tag, raw in self._pending.items():
+            stored = self._stored_slot(tag) is not None
+            if raw is None and stored:
+                count -= 1
+            elif raw is not None and not stored:
+                count += 1
+
+        return count
+
+    def __contains__(self: Vault, title: str) -> bool:
+        return self._exists(self._tag(title))
+
+    # --------------------------------------------------------------------------
+    # Construction
+    # --------------------------------------------------------------------------
+
+    @classmethod
+    def _create(
+            cls,
+            path: str,
+            material: kc.KeyMaterial,
+            kdf_parameters: kdf.KdfParameters,
+            member: bytes,
+            codec: str,
+            cipher: str
+            ) -> Vault:
+        """Create new empty vault file with given key derivation parameters,
+        whose salt is the vault salt, a single member, record codec and record
+        cipher, and return it opened.
+        """
+
+        if codec not in vc.CODECS:
+            raise ValueError('Unsupported record codec {0}'.format(codec))
+
+        if cipher not in vcp.CIPHERS:
+            raise ValueError('Unsupported record cipher {0}'.format(cipher))
+
+        vault = cls(path, material)
+        vault._salt = kdf_parameters.salt
+        vault._kdf = kdf_parameters
+        vault._codec = codec
+        vault._cipher = cipher
+        vault._capacity = DEFAULT_KEY_SLOTS
+        vault._member = member
+
+        data_key = new_data_key()
+        vault._unlock(data_key)
+        key_slot = (
+            key_locator(material, vault._salt),
+            member,
+            wrap_key(material, data_key)
+            )
+
+        with open(path, 'xb') as vault_file:
+            vault._write_log(vault_file, [key_slot])
+
+        fsync_directory(path)
+        vault._load()
+
+        return vault
+
+    @classmethod
+    def create(
+            cls,
+            path: str,
+            material: kc.KeyMaterial,
+            member: str = OWNER,
+            codec: str = vc.DEFAULT_CODEC,
+            cipher: str = vcp.DEFAULT_CIPHER,
+            kdf_parameters: kdf.KdfParameters = None
+            ) -> Vault:
+        """Create new empty vault file, with the given member as the only
+        member, whose records are compressed with given codec and encrypted
+        with given cipher, and return it opened. Raises FileExistsError if
+        file with given path already exists.
+
+        Key material of the member has to be derived with given key derivation
+        parameters, which are stored in the vault and whose salt becomes the
+        vault salt. New parameters with default cost are used if none are
+        given.
+        """
+
+        if kdf_parameters is None:
+            kdf_parameters = kdf.KdfParameters.new()
+
+        return cls._create(
+            path,
+            material,
+            kdf_parameters,
+            member_tag(kdf_parameters.salt, member),
+            codec,
+            cipher
+            )
+
+    @classmethod
+    def create_from(
+            cls,
+            path: str,
+            material: kc.KeyMaterial,
+            source: Vault,
+            cipher: str = None
+            ) -> Vault:
+        """Create new empty vault file with a new data key, for the member
+        who opened the source vault, and return it opened. Other members of
+        the source vault are not members of the new vault. New vault uses the
+        key derivation parameters and codec of the source vault and given
+        cipher, or the cipher of the source vault if none is given.
+        """
+
+        vault = cls._create(
+            path,
+            material,
+            source._kdf,
+            source._member,
+            source._codec,
+            cipher or source._cipher
+            )
+        vault._history = source._password_history().copy()
+        vault._history_changed = True
+        vault.save()
+
+        return vault
+
+    @classmethod
+    def open(cls, path: str, material: kc.KeyMaterial) -> Vault:
+        """Open existing vault file. Raises ValueError if file is not a valid
+        vault or if it can not be decrypted with given key material.
+        """
+
+        vault = cls(path, material)
+        vault._load()
+
+        return vault
+
+    def _unlock(self: Vault, data_key: bytes):
+        """Set up data key material and its subkeys.
+        """
+
+        self._material = kc.KeyMaterial(data_key)
+        self._log_key = self._material.subkey(LOG_LABEL)
+        self._search_key = self._material.subkey(bi.BLIND_INDEX_LABEL)
+
+    def _unwrap(self: Vault):
+        """Find key slot of the passphrase and unwrap the data key from it.
+        """
+
+        position = self._find_key_slot(
+            key_locator(self._passphrase_material, self._salt)
+            )
+
+        if position is None:
+            raise ValueError('Invalid passphrase or corrupted vault key')
+
+        _, member, wrapped = self._key_slot(position)
+        self._unlock(unwrap_key(self._passphrase_material, wrapped))
+        self._member = member
+
+    @classmethod
+    def check_passphrase(cls, path: str, material: kc.KeyMaterial) -> bool:
+        """Return whether or not the vault file can be unlocked with given
+        (passphrase) key material. Only the preamble and the key slots on the
+        probe path of the key slot locator are read, so a wrong passphrase is
+        rejected right after key derivation, whatever the vault size. Raises
+        ValueError if file is not a valid vault.
+        """
+
+        vault = cls(path, material)
+
+        try:
+            vault._map_file()
+            vault._read_header()
+
+            try:
+                vault._unwrap()
+            except ValueError:
+                return False
+
+            return True
+
+        finally:
+            vault.close()
+
+    def _read_header(self: Vault) -> VaultHeader:
+        """Read vault parameters from the preamble of the mapped file and
+        return its header.
+        """
+
+        header = VaultHeader.from_bytes(
+            self._view[:header_size(self._view[:HEADER_SIZE])]
+            )
+
+        if len(self._view) \
+                < self._log_start_for(header.capacity, header.size):
+            raise ValueError('Vault key slots are corrupted')
+
+        self._header_size = header.size
+        self._capacity = header.capacity
+        self._salt = header.kdf_parameters.salt
+        self._kdf = header.kdf_parameters
+        self._codec = header.codec
+        self._cipher = header.cipher
+
+        return header
+
+    def _load(self: Vault):
+        """Map vault file into memory, unwrap the data key, read the latest
+        checkpoint and replay the log tail.
+        """
+
+        self._unmap()
+
+        try:
+            self._map_file()
+            header = self._read_header()
+
+            if self._material is None:
+                self._unwrap()
+
+            checkpoint = header.sections.get(SECTION_INDEX, (0, 0))[0]
+
+            # Damaged header only costs us a replay of the whole log.
+            if checkpoint < self._log_start or checkpoint >= len(self._view):
+                checkpoint = self._log_start
+
+            self._replay(checkpoint)
+            self._pending.clear()
+            self._history = None
+            self._history_changed = False
+            self._staged_passwords.clear()
+
+        except Exception:
+            self.close()
+            raise
+
+    def _replay(self: Vault, start: int):
+        """Read log frames from given offset to the end of the log and rebuild
+        index state from them.
+        """
+
+        self._release_index()
+        self._overlay.clear()
+        self._tail_postings.clear()
+        self._tail_removed.clear()
+        self._tail = 0
+        self._live = 0
+        self._digest = 0
+        self._history_at = None
+        self._history_deltas = list()
+
+        # Frames of the current group, applied once its commit frame is read.
+        group = list()
+        offset = start
+        committed = start
+        size = len(self._view)
+
+        while offset + _FRAME.size <= size:
+            kind, tag, length = _FRAME.unpack_from(self._view, offset)
+            payload = offset + _FRAME.size
+
+            # Frame cut short by a crash ends the log.
+            if payload + length > size or kind not in (
+                    FRAME_RECORD,
+                    FRAME_TOMBSTONE,
+                    FRAME_CHECKPOINT,
+                    FRAME_COMMIT,
+                    FRAME_HISTORY,
+                    FRAME_HISTORY_DELTA
+                    ):
+                break
+
+            if kind == FRAME_RECORD:
+                slot = (offset, _FRAME.size + length)
+                group.append((self._apply, (tag, slot, self._tokens(slot))))
+
+            elif kind == FRAME_TOMBSTONE:
+                if length != _VERSION.size + MAC_SIZE:
+                    raise ValueError('Vault log is corrupted')
+
+                version = self._view[payload:payload + _VERSION.size]
+                self._verify_mac(
+                    self._view[payload + _VERSION.size:payload + length],
+                    b'tombstone' + tag,
+                    version
+                    )
+                group.append((
+                    self._apply,
+                    (tag, None, (), _VERSION.unpack(version)[0])
+                    ))
+
+            elif kind == FRAME_HISTORY:
+                group.append((
+                    self._apply_history,
+                    ((offset, _FRAME.size + length), )
+                    ))
+
+            elif kind == FRAME_HISTORY_DELTA:
+                group.append((
+                    self._apply_history_delta,
+                    ((offset, _FRAME.size + length), )
+                    ))
+
+            elif kind == FRAME_COMMIT:
+                if length != _COUNT.size + MAC_SIZE:
+                    raise ValueError('Vault log is corrupted')
+
+                (count, ) = _COUNT.unpack_from(self._view, payload)
+                self._verify_mac(
+                    self._view[payload + _COUNT.size:payload + length],
+                    b'commit',
+                    _COMMIT.pack(count, offset)
+                    )
+                if count != len(group):
+                    raise ValueError('Vault log is corrupted')
+
+                for apply, frame in group:
+                    apply(*frame)
+                group.clear()
+                committed = payload + length
+
+            else:
+                # Checkpoint covers the frames preceding it.
+                group.clear()
+                self._load_checkpoint(payload, length)
+                self._overlay.clear()
+                self._tail_postings.clear()
+                self._tail_removed.clear()
+                self._tail = 0
+                self._live = self._count
+                committed = payload + length
+
+            offset = payload + length
+
+        # Frames of an uncommitted group are overwritten by the next save.
+        self._end = committed
+
+    def _apply(
+            self: Vault,
+            tag: bytes,
+            slot: tuple,
+            tokens,
+            version: int = 0
+            ):
+        """Bring index state up to date with a frame logged after the latest
+        checkpoint. Slot is (offset, size) of the record frame or None for a
+        tombstone of given version.
+        """
+
+        live = slot is not None
+        stored = self._stored_slot(tag)
+        old = self._leaf(tag, stored)
+
+        self._overlay[tag] = slot
+        if live:
+            self._tail_removed.pop(tag, None)
+        else:
+            self._tail_removed[tag] = version
+        if old is not None:
+            self._digest -= _leaf_hash(tag, old)
+        self._digest = (self._digest + _leaf_hash(tag, self._leaf(tag, slot))) \
+            % _DIGEST_MODULUS
+        for token in tokens:
+            self._tail_postings.setdefault(token, set()).add(tag)
+        self._tail += 1
+        self._live += live - (stored is not None)
+
+    def _apply_history(self: Vault, slot: tuple):
+        """Make history frame at given slot, logged after the latest
+        checkpoint, the current one.
+        """
+
+        self._history_at = slot
+        self._history_deltas = list()
+        self._tail += 1
+
+    def _apply_history_delta(self: Vault, slot: tuple):
+        """Add history delta frame at given slot, logged after the latest
+        checkpoint, to the changes of the current history frame.
+        """
+
+        self._history_deltas.append(slot)
+        self._tail += 1
+
+    def _load_checkpoint(self: Vault, payload: int, length: int):
+        """Verify checkpoint frame payload at given offset and make its index
+        and blind index current.
+        """
+
+        if length < _CHECKPOINT.size + MAC_SIZE:
+            raise ValueError('Vault checkpoint is corrupted')
+
+        end = payload + length - MAC_SIZE
+        count, history_offset, history_size, removed, digest \
+            = _CHECKPOINT.unpack_from(self._view, payload)
+        index = payload + _CHECKPOINT.size
+        postings = index + count * _SLOT.size + removed * _REMOVED_ENTRY.size
+
+        if postings > end or (end - postings) % _POSTING.size \
+                or history_offset + history_size > payload:
+            raise ValueError('Vault checkpoint is corrupted')
+
+        self._verify_mac(
+            self._view[end:end + MAC_SIZE],
+            b'checkpoint',
+            self._view[payload:end]
+            )
+
+        self._map_checkpoint(payload, length)
+        self._history_at = (history_offset, history_size) if history_size \
+            else None
+        self._history_deltas = list()
+        self._digest = int.from_bytes(digest, 'big')
+
+    def _map_checkpoint(self: Vault, payload: int, length: int):
+        """Make index and blind index of the checkpoint frame payload at given
+        offset current. Checkpoint has to be verified already.
+        """
+
+        end = payload + length - MAC_SIZE
+        count, _, _, removed, _ = _CHECKPOINT.unpack_from(self._view, payload)
+        index = payload + _CHECKPOINT.size
+        removed_at = index + count * _SLOT.size
+        postings = removed_at + removed * _REMOVED_ENTRY.size
+
+        self._release_index()
+        self._count = count
+        self._index = self._view[index:removed_at]
+        self._removed_count = removed
+        self._removed = self._view[removed_at:postings]
+        self._posting_count = (end - postings) // _POSTING.size
+        self._postings = self._view[postings:end]
+        self._checkpoint_size = _FRAME.size + length
+        self._checkpoint_at = (payload, length)
+
+    def _release_index(self: Vault):
+        """Release views of the checkpoint index, removed entries and blind
+        index.
+        """
+
+        for view in (self._index, self._removed, self._postings):
+            if isinstance(view, memoryview):
+                view.release()
+
+        self._count = 0
+        self._index = b''
+        self._removed_count = 0
+        self._removed = b''
+        self._posting_count = 0
+        self._postings = b''
+        self._checkpoint_size = 0
+        self._checkpoint_at = None
+
+    def _map_file(self: Vault):
+        """Open vault file and map it into memory.
+        """
+
+        self._file = open(self._path, 'rb')
+
+        if os.fstat(self._file.fileno()).st_size < HEADER_SIZE:
+            raise ValueError('File is not a password vault')
+
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+    def _remap(self: Vault):
+        """Map vault file again after frames were appended to it. Index state
+        is kept, only the views of the latest checkpoint are renewed.
+        """
+
+        checkpoint = self._checkpoint_at
+
+        self._unmap()
+        self._map_file()
+
+        if checkpoint is not None:
+            self._map_checkpoint(*checkpoint)
+
+    def _unmap(self: Vault):
+        """Release all views of the vault file, unmap it and close it.
+        """
+
+        self._release_index()
+
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Some record view is still referenced (e.g. from a traceback).
+                # Mapping is then closed once the last view is collected.
+                pass
+            self._map = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @contextlib.contextmanager
+    def _locked(self: Vault):
+        """Open vault file for writing and hold an exclusive lock on it for
+        the duration of the context, yielding the open file. Every writer
+        takes the lock, so writers in other processes (e.g. the agent and
+        a CLI command) never write at the same time. Raises ValueError if
+        another writer changed the vault file since it was read.
+        """
+
+        with open(self._path, 'r+b') as vault_file:
+            fcntl.flock(vault_file.fileno(), fcntl.LOCK_EX)
+
+            try:
+                self._check_unchanged(vault_file)
+                yield vault_file
+
+            finally:
+                fcntl.flock(vault_file.fileno(), fcntl.LOCK_UN)
+
+    def _check_unchanged(self: Vault, vault_file):
+        """Raise ValueError if the locked vault file was replaced, or a group
+        or checkpoint was logged after the end of the log read by this vault.
+        Frames after the end that no commit frame closes were cut short by a
+        crash and are overwritten by the next save.
+        """
+
+        stat = os.fstat(vault_file.fileno())
+
+        if self._file is None \
+                or stat.st_ino != os.fstat(self._file.fileno()).st_ino \
+                or stat.st_ino != os.stat(self._path).st_ino \
+                or stat.st_size < self._end:
+            raise ValueError(
+                'Vault file was changed by another writer, open it again'
+                )
+
+        vault_file.seek(self._end)
+        tail = vault_file.read()
+        offset = 0
+
+        while offset + _FRAME.size <= len(tail):
+            kind, _, length = _FRAME.unpack_from(tail, offset)
+            offset += _FRAME.size + length
+
+            if offset <= len(tail) \
+                    and kind in (FRAME_COMMIT, FRAME_CHECKPOINT):
+                raise ValueError(
+                    'Vault file was changed by another writer, open it again'
+                    )
+
+    # --------------------------------------------------------------------------
+    # Key slots
+    # --------------------------------------------------------------------------
+
+    @staticmethod
+    def _log_start_for(capacity: int, size: int = HEADER_SIZE) -> int:
+        """Return offset of the first log frame for given key slot count and
+        given size of the preamble and header.
+        """
+
+        return size + KEY_COPIES * capacity * _KEY_SLOT.size
+
+    @property
+    def _log_start(self: Vault) -> int:
+        return self._log_start_for(self._capacity, self._header_size)
+
+    def _key_slot_offset(self: Vault, copy: int, position: int) -> int:
+        """Return offset of the key slot at given position of given copy of
+        the key slot table.
+        """
+
+        return self._header_size \
+            + (copy * self._capacity + position) * _KEY_SLOT.size
+
+    def _key_slot(self: Vault, position: int) -> tuple:
+        """Return (locator, member tag, wrapped key) of the key slot at given
+        position, taken from the last table copy where the slot is intact.
+        Slot with no intact copy is reported as removed.
+        """
+
+        for copy in reversed(range(KEY_COPIES)):
+            start = self._key_slot_offset(copy, position)
+            raw = self._view[start:start + _KEY_SLOT.size]
+            locator, member, wrapped, crc = _KEY_SLOT.unpack(raw)
+
+            if crc == zlib.crc32(raw[:-_CRC.size]):
+                return locator, member, wrapped
+
+        return _REMOVED, _EMPTY, bytes(WRAPPED_KEY_SIZE)
+
+    def _key_slots(self: Vault) -> list:
+        """Return list of key slots of all members.
+        """
+
+        return [
+            key_slot
+            for key_slot in map(self._key_slot, range(self._capacity))
+            if key_slot[0] not in (_EMPTY, _REMOVED)
+            ]
+
+    def _find_key_slot(self: Vault, locator: bytes):
+        """Return position of the key slot with given locator or None if
+        there is no such slot.
+        """
+
+        for position in _probe(locator, self._capacity):
+            found = self._key_slot(position)[0]
+            if found == locator:
+                return position
+            if found == _EMPTY:
+                return None
+
+        return None
+
+    def _free_key_slot(self: Vault, locator: bytes) -> int:
+        """Return position where key slot with given locator is to be
+        written.
+        """
+
+        for position in _probe(locator, self._capacity):
+            if self._key_slot(position)[0] in (_EMPTY, _REMOVED):
+                return position
+
+        raise ValueError('Vault key slot table is full')
+
+    def _write_key_slot(
+            self: Vault,
+            vault_file,
+            position: int,
+            key_slot: tuple
+            ):
+        """Write key slot at given position of all table copies of the locked
+        vault file, the last copy first, syncing the file after every copy.
+        """
+
+        data = _KEY_SLOT.pack(*key_slot, 0)[:-_CRC.size]
+        data += _CRC.pack(zlib.crc32(data))
+
+        for copy in reversed(range(KEY_COPIES)):
+            vault_file.seek(self._key_slot_offset(copy, position))
+            vault_file.write(data)
+            vault_file.flush()
+            os.fsync(vault_file.fileno())
+
+    def _reserve_key_slot(self: Vault):
+        """Make sure that a key slot can be added while keeping the table at
+        most half full. Table is grown, and removed slots dropped, by
+        rewriting the vault file. Staged changes are saved first.
+        """
+
+        used = sum(
+            self._key_slot(position)[0] != _EMPTY
+            for position in range(self._capacity)
+            )
+
+        if (used + 1) * 2 <= self._capacity:
+            return
+
+        key_slots = self._key_slots()
+        capacity = self._capacity
+
+        while (len(key_slots) + 1) * 2 > capacity:
+            capacity *= 2
+
+        self.save()
+        self._rewrite(key_slots, capacity)
+
+    # --------------------------------------------------------------------------
+    # Record access
+    # --------------------------------------------------------------------------
+
+    def _tag(self: Vault, title: str) -> bytes:
+        """Return index tag for given entry title.
+        """
+
+        return entry_tag(self._material, title)
+
+    def _exists(self: Vault, tag: bytes) -> bool:
+        """Return whether or not record with given tag exists, taking staged
+        changes into account.
+        """
+
+        if tag in self._pending:
+            return self._pending[tag] is not None
+
+        return self._stored_slot(tag) is not None
+
+    def _mac(self: Vault, label: bytes, data=b'') -> bytes:
+        """Return MAC of given label and data keyed with the log key.
+        """
+
+        mac = hmac.new(self._log_key, label, hl.sha256)
+        mac.update(data)
+
+        return mac.digest()
+
+    def _verify_mac(self: Vault, mac, label: bytes, data=b''):
+        """Raise ValueError if given MAC does not match label and data.
+        """
+
+        if not hmac.compare_digest(bytes(mac), self._mac(label, data)):
+            raise ValueError('Invalid passphrase or corrupted vault log')
+
+    def _slot(self: Vault, position: int) -> tuple:
+        """Return (tag, offset, size) of the record frame in the checkpoint
+        index slot at given position.
+        """
+
+        return _SLOT.unpack_from(self._index, position * _SLOT.size)
+
+    def _find_slot(self: Vault, tag: bytes) -> tuple:
+        """Return (offset, size) of the record frame with given tag in the
+        latest checkpoint or None if there is no such record.
+        """
+
+        low, high = 0, self._count
+
+        while low < high:
+            middle = (low + high) // 2
+            current = bytes(self._index[
+                middle * _SLOT.size:middle * _SLOT.size + TAG_SIZE
+                ])
+
+            if current < tag:
+                low = middle + 1
+            elif current > tag:
+                high = middle
+            else:
+                return self._slot(middle)[1:]
+
+        return None
+
+    def _stored_slot(self: Vault, tag: bytes) -> tuple:
+        """Return (offset, size) of the live record frame with given tag stored
+        in the vault file or None if there is no such record.
+        """
+
+        if tag in self._overlay:
+            return self._overlay[tag]
+
+        return self._find_slot(tag)
+
+    def _stored_slots(self: Vault):
+        """Yields (tag, (offset, size)) for all live record frames stored in
+        the vault file.
+        """
+
+        for position in range(self._count):
+            tag, offset, length = self._slot(position)
+            if tag not in self._overlay:
+                yield tag, (offset, length)
+
+        for tag, slot in self._overlay.items():
+            if slot is not None:
+                yield tag, slot
+
+    def _frame_payload(self: Vault, slot: tuple) -> tuple:
+        """Return (token count, payload offset, record end) of the record
+        frame at given slot, after checking the MAC of the frame. Payload
+        offset is the offset of the blind index tokens, record end the offset
+        of the frame MAC.
+        """
+
+        offset, size = slot
+        end = offset + size - MAC_SIZE
+
+        if offset + size > len(self._view) or size \
+                < _FRAME.size + _VERSION.size + _COUNT16.size + MAC_SIZE:
+            raise ValueError('Vault record is truncated')
+
+        payload = offset + _FRAME.size + _VERSION.size
+        (count, ) = _COUNT16.unpack_from(self._view, payload)
+
+        if payload + _COUNT16.size + count * bi.TOKEN_SIZE > end:
+            raise ValueError('Vault record is corrupted')
+
+        _, tag, _ = _FRAME.unpack_from(self._view, offset)
+        self._verify_mac(
+            self._view[end:end + MAC_SIZE],
+            b'record' + tag,
+            self._view[offset + _FRAME.size:end]
+            )
+
+        return count, payload + _COUNT16.size, end
+
+    def _record_version(self: Vault, slot: tuple) -> int:
+        """Return version of the record frame at given slot.
+        """
+
+        self._frame_payload(slot)
+
+        return _VERSION.unpack_from(self._view, slot[0] + _FRAME.size)[0]
+
+    def _find_removed(self: Vault, tag: bytes) -> int:
+        """Return version of the entry with given tag removed before the
+        latest checkpoint or None if there is no such entry.
+        """
+
+        low, high = 0, self._removed_count
+
+        while low < high:
+            middle = (low + high) // 2
+            current, version = _REMOVED_ENTRY.unpack_from(
+                self._removed,
+                middle * _REMOVED_ENTRY.size
+                )
+
+            if current < tag:
+                low = middle + 1
+            elif current > tag:
+                high = middle
+            else:
+                return version
+
+        return None
+
+    def _version(self: Vault, tag: bytes) -> int:
+        """Return version of the entry with given tag stored in the vault
+        file, whether it is live or removed, or 0 if there never was such an
+        entry.
+        """
+
+        slot = self._stored_slot(tag)
+
+        if slot is not None:
+            return self._record_version(slot)
+
+        if tag in self._tail_removed:
+            return self._tail_removed[tag]
+
+        return self._find_removed(tag) or 0
+
+    def _current_removed(self: Vault) -> list:
+        """Return sorted (tag, version) of all removed entries.
+        """
+
+        removed = {
+            tag: version
+            for tag, version in _REMOVED_ENTRY.iter_unpack(self._removed)
+            if tag not in self._overlay
+            }
+        removed.update(self._tail_removed)
+
+        return sorted(removed.items())
+
+    def _leaf(self: Vault, tag: bytes, slot: tuple) -> bytes:
+        """Return sync leaf value of the entry with given tag, whose live
+        record frame is at given slot, or of the removed entry if slot is
+        None. Returns None if there never was such an entry.
+        """
+
+        if slot is None:
+            version = self._tail_removed.get(tag)
+            if version is None:
+                version = self._find_removed(tag)
+
+            if version is None:
+                return None
+
+            return _VERSION.pack(version) + bytes(MAC_SIZE)
+
+        offset, size = slot
+        _, _, end = self._frame_payload(slot)
+
+        # Record frame ends with its MAC.
+        return bytes(self._view[
+            offset + _FRAME.size:offset + _FRAME.size + _VERSION.size
+            ]) + bytes(self._view[end:end + MAC_SIZE])
+
+    def _record(self: Vault, slot: tuple) -> memoryview:
+        """Return raw record of the frame at given slot as a view of the
+        mapped vault file.
+        """
+
+        count, tokens, end = self._frame_payload(slot)
+
+        return self._view[tokens + count * bi.TOKEN_SIZE:end]
+
+    def _tokens(self: Vault, slot: tuple) -> list:
+        """Return blind index tokens of the record frame at given slot.
+        """
+
+        count, tokens, _ = self._frame_payload(slot)
+
+        end = tokens + count * bi.TOKEN_SIZE
+
+        return [
+            bytes(self._view[start:start + bi.TOKEN_SIZE])
+            for start in range(tokens, end, bi.TOKEN_SIZE)
+            ]
+
+    def _frame_view(self: Vault, slot: tuple) -> memoryview:
+        """Return complete record frame at given slot as a view of the mapped
+        vault file.
+        """
+
+        offset, size = slot
+
+        return self._view[offset:offset + size]
+
+    def _decrypt(self: Vault, raw) -> dict:
+        """Return entry decrypted from given raw record. Record can be given
+        as any bytes-like object.
+        """
+
+        return open_entry(self._material, raw, self._cipher)
+
+    def _raw_record(self: Vault, tag: bytes):
+        """Return raw record for given tag, taking staged changes into account,
+        or None if there is no such record.
+        """
+
+        if tag in self._pending:
+            pending = self._pending[tag]
+            return None if pending is None else pending[0]
+
+        slot = self._stored_slot(tag)
+
+        if slot is None:
+            return None
+
+        return self._record(slot)
+
+    # --------------------------------------------------------------------------
+    # Log writing
+    # --------------------------------------------------------------------------
+
+    def _frame(self: Vault, kind: int, tag: bytes, length: int) -> bytes:
+        """Return frame header for payload of given length.
+        """
+
+        return _FRAME.pack(kind, tag, length)
+
+    def _write_record(
+            self: Vault,
+            vault_file,
+            tag: bytes,
+            version: int,
+            raw,
+            tokens: list
+            ) -> tuple:
+        """Append record frame at the current position of the vault file and
+        return its (offset, size). Record frame payload is:
+
+            version (uint32) | token count (uint16) | blind index tokens |
+            JSON encoded entry compressed with a record codec and encrypted
+            with the record cipher | HMAC of the tag and all of the above
+
+        Tag is HMAC-SHA256 of the entry title truncated to 16 bytes (see
+        entry_tag()). Every record names the codec it was compressed with,
+        while new records use the codec named in the preamble. HMAC is
+        checked whenever the frame is read, so version can not be raised to
+        make a stale record win a sync.
+        """
+
+        offset = vault_file.tell()
+        payload = _VERSION.pack(version) + _COUNT16.pack(len(tokens)) \
+            + b''.join(tokens) + bytes(raw)
+        payload += self._mac(b'record' + tag, payload)
+
+        vault_file.write(self._frame(FRAME_RECORD, tag, len(payload)))
+        vault_file.write(payload)
+
+        return offset, _FRAME.size + len(payload)
+
+    def _write_tombstone(self: Vault, vault_file, tag: bytes, version: int):
+        """Append tombstone frame of given version at the current position of
+        the vault file. Tombstone frame payload is version (uint32) | HMAC of
+        the tag and the version.
+        """
+
+        payload = _VERSION.pack(version)
+        payload += self._mac(b'tombstone' + tag, payload)
+
+        vault_file.write(self._frame(FRAME_TOMBSTONE, tag, len(payload)))
+        vault_file.write(payload)
+
+    def _write_commit(self: Vault, vault_file, count: int):
+        """Append commit frame closing the group of given number of frames at
+        the current position of the vault file. Commit frame payload is frame
+        count (uint32) | HMAC of the frame count and the commit frame offset.
+        """
+
+        offset = vault_file.tell()
+        payload = _COUNT.pack(count) \
+            + self._mac(b'commit', _COMMIT.pack(count, offset))
+
+        vault_file.write(
+            self._frame(FRAME_COMMIT, bytes(TAG_SIZE), len(payload))
+            )
+        vault_file.write(payload)
+
+    def _write_history(self: Vault, vault_file, delta: bool = False) -> tuple:
+        """Append history frame holding encrypted password history, or history
+        delta frame holding its changes since the history frame and deltas
+        already logged, at the current position of the vault file and return
+        its (offset, size). Payload of either frame is compressed and
+        encrypted with the record cipher.
+
+        History is written whole only by checkpoints and compaction, and by
+        the first save of a vault without one; checkpoints point to the latest
+        history frame. Passwords new to the history are saved as a history
+        delta frame, holding only the bits they set and the stages they
+        started, in the same group as the records whose passwords it
+        remembers, so saving a password costs the same whatever the vault
+        size. History is read, decrypted as a whole and brought up to date
+        with the deltas logged since, only when an entry is added or its
+        password changes. New history is sized for HISTORY_PER_ENTRY
+        passwords per entry of the vault, and grows as it fills up.
+        """
+
+        offset = vault_file.tell()
+        raw = vcp.encrypt(
+            self._material,
+            self._cipher,
+            zlib.compress(
+                self._history.changes() if delta
+                else self._history.to_bytes()
+                )
+            )
+
+        vault_file.write(self._frame(
+            FRAME_HISTORY_DELTA if delta else FRAME_HISTORY,
+            bytes(TAG_SIZE),
+            len(raw)
+            ))
+        vault_file.write(raw)
+
+        return offset, _FRAME.size + len(raw)
+
+    def _write_checkpoint(
+            self: Vault,
+            vault_file,
+            slots: list,
+            removed: list,
+            postings: list,
+            history: tuple
+            ) -> tuple:
+        """Append checkpoint frame with given sorted slots, removed entries
+        and postings, (offset, size) of the history frame or None, and the
+        current sync digest, at the current position of the vault file and
+        return (offset, size) of the frame. Checkpoint frame payload is:
+
+            slot count (uint32) | history frame offset (uint64) | history
+            frame size (uint32) | removed entry count (uint32) | sync digest
+            (32 bytes) | sorted slots of tag (16 bytes) | frame offset
+            (uint64) | frame size (uint32) | sorted removed entries of tag
+            (16 bytes) | version (uint32) | sorted postings of blind index
+            token (8 bytes) | tag (16 bytes) | HMAC of all of the above
+        """
+
+        index = _CHECKPOINT.pack(
+            len(slots),
+            *(history or (0, 0)),
+            len(removed),
+            self.sync_digest
+            ) \
+            + b''.join(_SLOT.pack(*slot) for slot in slots) \
+            + b''.join(_REMOVED_ENTRY.pack(*entry) for entry in removed) \
+            + b''.join(_POSTING.pack(*posting) for posting in postings)
+        payload = index + self._mac(b'checkpoint', index)
+        offset = vault_file.tell()
+
+        vault_file.write(
+            self._frame(FRAME_CHECKPOINT, bytes(TAG_SIZE), len(payload))
+            )
+        vault_file.write(payload)
+
+        return offset, _FRAME.size + len(payload)
+
+    def _write_header(
+            self: Vault,
+            vault_file,
+            count: int,
+            checkpoint: tuple,
+            history: tuple
+            ):
+        """Write vault header holding given record count and pointing to
+        given checkpoint and history frame (or None), which are (offset, size)
+        tuples. Header is padded to the header size of the file, any sections
+        of a newer format version are dropped.
+        """
+
+        sections = [
+            (
+                SECTION_KEYS,
+                self._header_size,
+                self._log_start - self._header_size
+                ),
+            (
+                SECTION_LOG,
+                self._log_start,
+                checkpoint[0] - self._log_start
+                ),
+            (SECTION_INDEX, *checkpoint),
+            ]
+
+        if history is not None:
+            sections.append((SECTION_HISTORY, *history))
+
+        header = _HEADER.pack(count, len(sections)) \
+            + b''.join(_SECTION.pack(*section) for section in sections)
+        header += bytes(
+            self._header_size - HEADER_OFFSET - len(header) - _CRC.size
+            )
+
+        vault_file.seek(HEADER_OFFSET)
+        vault_file.write(header + _CRC.pack(zlib.crc32(header)))
+
+    def _write_key_table(self: Vault, vault_file, key_slots: list):
+        """Write preamble and all copies of the key slot table holding given
+        key slots.
+
+        Vault file holds KEY_COPIES copies of the key slot table, each of key
+        slot count slots of locator (16 bytes) | member tag (16 bytes) |
+        wrapped data key (40 bytes) | CRC32 (uint32). Data key is wrapped
+        (AES key wrap, RFC 3394) with a subkey of the member's passphrase key
+        material; key wrap is authenticated, so unwrapping the data key also
+        verifies the passphrase.
+
+        Key slot table is a hash table with linear probing, addressed by slot
+        locators, keyed hashes of the vault salt computed from the passphrase
+        key material. Opening the vault therefore visits only the slots on
+        the probe path of its locator, however many members the vault has.
+        Locator also serves as a key check value: wrong passphrase finds no
+        slot with its locator and is rejected after reading the preamble and
+        a key slot or two. Table grows (doubles) by rewriting the vault file
+        once it gets half full. Member tags are keyed hashes of member names
+        and the vault salt; they do not reveal member names, but a guessed
+        name can be confirmed by anyone holding the vault file. Removed member
+        who kept a copy of the data key can still read the vault file, so
+        removal should be followed by a rekey when that matters.
+        """
+
+        vault_file.seek(0)
+        vault_file.write(_PREAMBLE.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            COMPATIBLE_VERSION,
+            self._header_size,
+            vc.CODECS[self._codec],
+            vcp.CIPHERS[self._cipher],
+            kdf.KDFS[self._kdf.algorithm],
+            self._kdf.cost,
+            self._capacity,
+            self._salt
+            ))
+
+        table = b''
+
+        for key_slot in _key_table(self._capacity, key_slots):
+            data = _KEY_SLOT.pack(*key_slot, 0)[:-_CRC.size]
+            table += data + _CRC.pack(zlib.crc32(data))
+
+        vault_file.seek(self._header_size)
+        vault_file.write(table * KEY_COPIES)
+
+    def _current_postings(self: Vault) -> list:
+        """Return sorted (token, tag) postings of all live records stored in
+        the vault file.
+        """
+
+        postings = {
+            posting
+            for posting in _POSTING.iter_unpack(self._postings)
+            if posting[1] not in self._overlay
+            }
+
+        for tag, slot in self._overlay.items():
+            if slot is not None:
+                postings.update((token, tag) for token in self._tokens(slot))
+
+        return sorted(postings)
+
+    def _write_log(self: Vault, vault_file, key_slots: list):
+        """Write complete vault, holding given key slots and all live records
+        followed by a checkpoint, to an empty vault file, in the layout of
+        this format version. Record frames are copied verbatim.
+        """
+
+        self._header_size = HEADER_SIZE
+        self._write_key_table(vault_file, key_slots)
+
+        slots = list()
+        history = None
+        vault_file.seek(self._log_start)
+
+        # History with deltas is written whole, with the deltas applied.
+        if self._history_deltas:
+            self._password_history()
+            history = self._write_history(vault_file)
+
+        elif self._history_at is not None:
+            history = (vault_file.tell(), self._history_at[1])
+            vault_file.write(self._frame_view(self._history_at))
+
+        for tag, slot in sorted(self._stored_slots()):
+            offset = vault_file.tell()
+            vault_file.write(self._frame_view(slot))
+            slots.append((tag, offset, slot[1]))
+
+        checkpoint = self._write_checkpoint(
+            vault_file,
+            slots,
+            self._current_removed(),
+            self._current_postings(),
+            history
+            )
+        vault_file.flush()
+        os.fsync(vault_file.fileno())
+
+        self._write_header(vault_file, len(slots), checkpoint, history)
+        vault_file.flush()
+        os.fsync(vault_file.fileno())
+
+    # --------------------------------------------------------------------------
+    # Public interface
+    # --------------------------------------------------------------------------
+
+    @property
+    def path(self: Vault) -> str:
+        """Return path of the vault file.
+        """
+
+        return self._path
+
+    @property
+    def material(self: Vault) -> kc.KeyMaterial:
+        """Return key material of the data key.
+        """
+
+        return self._material
+
+    @property
+    def codec(self: Vault) -> str:
+        """Return name of the codec compressing new records.
+        """
+
+        return self._codec
+
+    @property
+    def cipher(self: Vault) -> str:
+        """Return name of the cipher encrypting records.
+        """
+
+        return self._cipher
+
+    @property
+    def kdf_parameters(self: Vault) -> kdf.KdfParameters:
+        """Return passphrase key derivation parameters.
+        """
+
+        return self._kdf
+
+    @property
+    def modified(self: Vault) -> bool:
+        """Return whether or not vault has unsaved changes.
+        """
+
+        return bool(self._pending) or self._history_changed
+
+    @property
+    def garbage(self: Vault) -> float:
+        """Return fraction of the vault file taken by superseded records,
+        tombstones and old checkpoints, i.e. space that would be reclaimed by
+        compaction.
+        """
+
+        live = sum(slot[1] for _, slot in self._stored_slots())
+
+        if self._history_at is not None:
+            live += self._history_at[1]
+        live += sum(slot[1] for slot in self._history_deltas)
+        total = self._end - self._log_start - self._checkpoint_size
+
+        if total <= 0:
+            return 0.0
+
+        return max(0.0, 1.0 - live / total)
+
+    def get(self: Vault, title: str) -> dict:
+        """Return entry with given title. Raises KeyError if there is no such
+        entry.
+        """
+
+        raw = self._raw_record(self._tag(title))
+
+        if raw is None:
+            raise KeyError(title)
+
+        entry = self._decrypt(raw)
+
+        if entry.get('title') != title:
+            raise KeyError(title)
+
+        return entry
+
+    def entries(self: Vault):
+        """Yields all entries stored in the vault. Every record is decrypted,
+        so use it only when all entries are needed.
+        """
+
+        for tag, slot in self._stored_slots():
+            if tag not in self._pending:
+                yield self._decrypt(self._record(slot))
+
+        for pending in self._pending.values():
+            if pending is not None:
+                yield self._decrypt(pending[0])
+
+    def raw_records(self: Vault):
+        """Yields (tag, raw record) for all entries stored in the vault file,
+        ordered by tag. Records are not decrypted and unsaved changes are not
+        included. Raw records are copied out of the mapped file, so they can be
+        passed to other processes.
+        """
+
+        for tag, slot in sorted(self._stored_slots()):
+            yield tag, bytes(self._record(slot))
+
+    @property
+    def sync_digest(self: Vault) -> bytes:
+        """Return digest of the stored state of all entries, the sum modulo
+        2 ** 256 of the hashes of their sync leaves (see sync_leaves()).
+        Copies of the vault holding the same entries have the same digest,
+        however their files are laid out. Digest is stored in checkpoints and
+        kept up to date frame by frame, so it costs nothing to read. Unsaved
+        changes are not included.
+        """
+
+        return self._digest.to_bytes(SYNC_DIGEST_SIZE, 'big')
+
+    def sync_leaves(self: Vault) -> list:
+        """Return sorted (tag, value) of all entries stored in the vault file,
+        live or removed, for comparison with another copy of the vault (see
+        vault_sync.py). Value is the entry version (uint32) followed by the
+        MAC of its record frame, or by zeros for a removed entry, so that
+        copies are compared without decrypting any record. Unsaved changes
+        are not included.
+        """
+
+        leaves = [
+            (tag, self._leaf(tag, slot))
+            for tag, slot in self._stored_slots()
+            ]
+        leaves.extend(
+            (tag, _VERSION.pack(version) + bytes(MAC_SIZE))
+            for tag, version in self._current_removed()
+            )
+        leaves.sort()
+
+        return leaves
+
+    def search(self: Vault, field: str, query: str, prefix: bool = False):
+        """Yields entries whose field matches the query.
+
+        Candidates are looked up in the blind index, so only the records of
+        matching entries are decrypted. With prefix set, entries having a word
+        in the field value that starts with the query are matched, otherwise
+        the complete field value has to match. Searchable fields are listed in
+        blind_index.SEARCH_FIELDS.
+        """
+
+        token = bi.search_token(self._search_key, field, query, prefix)
+        candidates = set(self._tail_postings.get(token, ()))
+
+        # Postings are sorted by token, so matching ones form a contiguous
+        # range found by binary search.
+        low, high = 0, self._posting_count
+        while low < high:
+            middle = (low + high) // 2
+            start = middle * _POSTING.size
+            if bytes(self._postings[start:start + bi.TOKEN_SIZE]) < token:
+                low = middle + 1
+            else:
+                high = middle
+
+        for posting in range(low, self._posting_count):
+            current, tag = _POSTING.unpack_from(
+                self._postings,
+                posting * _POSTING.size
+                )
+            if current != token:
+                break
+            candidates.add(tag)
+
+        # Unsaved changes are few, so they are simply checked one by one.
+        for tag in candidates | set(self._pending):
+            raw = self._raw_record(tag)
+            if raw is None:
+                continue
+
+            entry = self._decrypt(raw)
+            if bi.matches(entry, field, query, prefix):
+                yield entry
+
+    def fuzzy_search(
+            self: Vault,
+            query: str,
+            limit: int = ti.DEFAULT_LIMIT
+            ) -> list:
+        """Returns (title, score) tuples of entries whose title or URL
+        resembles the query, best matches first.
+
+        First fuzzy search decrypts all entries to build the trigram index,
+        later ones only look it up until entries change.
+        """
+
+        if self._trigrams is None:
+            self._trigrams = ti.TrigramIndex(self.entries())
+
+        return self._trigrams.search(query, limit)
+
+    def add(self: Vault, entry: dict):
+        """Stage new entry. Raises ValueError if entry with the same title
+        already exists.
+        """
+
+        validate_entry(entry)
+
+        if entry['title'] in self:
+            raise ValueError(
+                'Entry "{0}" already exists'.format(entry['title'])
+                )
+
+        tag, raw, tokens = seal_entry(
+            self._material,
+            entry,
+            self._codec,
+            self._cipher
+            )
+        self._pending[tag] = (raw, tokens)
+        self._stage_password(tag, entry.get('password'))
+        self._trigrams = None
+
+    def add_sealed(self: Vault, sealed: tuple, password: str = None):
+        """Stage new entry sealed with seal_entry(). Raises ValueError if entry
+        with the same title already exists. Password of the entry, if given, is
+        added to the password history.
+        """
+
+        tag, raw, tokens = sealed
+
+        if self._exists(tag):
+            raise ValueError('Entry with the same title already exists')
+
+        self._pending[tag] = (raw, tokens)
+        self._stage_password(tag, password)
+        self._trigrams = None
+
+    def _password_history(self: Vault) -> ph.PasswordHistory:
+        """Return password history, reading it from the vault file on first
+        use.
+        """
+
+        if self._history is None:
+            if self._history_at is None:
+                self._history = ph.PasswordHistory.new(max(
+                    ph.DEFAULT_CAPACITY,
+                    HISTORY_PER_ENTRY * len(self)
+                    ))
+            else:
+                self._history = ph.PasswordHistory.from_bytes(
+                    self._history_frame(self._history_at)
+                    )
+
+                for slot in self._history_deltas:
+                    self._history.apply_changes(self._history_frame(slot))
+
+        return self._history
+
+    def _history_frame(self: Vault, slot: tuple) -> bytes:
+        """Return decrypted payload of the history (delta) frame at given
+        slot.
+        """
+
+        offset, size = slot
+
+        return zlib.decompress(vcp.decrypt(
+            self._material,
+            self._cipher,
+            self._view[offset + _FRAME.size:offset + size]
+            ))
+
+    def _stage_password(self: Vault, tag: bytes, password: str):
+        """Stage addition of the password of the entry with given tag to the
+        password history.
+        """
+
+        if password:
+            self._staged_passwords[tag] = password
+        else:
+            self._staged_passwords.pop(tag, None)
+
+    def used_password(self: Vault, password: str) -> bool:
+        """Return whether or not the password was ever stored in the vault,
+        including unsaved changes. False positives are possible, but rare (see
+        password_history.py).
+        """
+
+        return password in self._password_history() \
+            or password in self._staged_passwords.values()
+
+    def update(self: Vault, entry: dict):
+        """Stage replacement of an existing entry. Raises KeyError if there is
+        no entry with the same title and ValueError if the new password of the
+        entry was stored in the vault before.
+        """
+
+        validate_entry(entry)
+
+        if entry['title'] not in self:
+            raise KeyError(entry['title'])
+
+        tag = self._tag(entry['title'])
+        slot = self._stored_slot(tag)
+
+        self._trigrams = None
+
+        stored = None if slot is None else self._decrypt(self._record(slot))
+
+        # Entry changed back to its stored value needs no record at all.
+        if stored == entry:
+            self._pending.pop(tag, None)
+            self._staged_passwords.pop(tag, None)
+            return
+
+        if tag in self._pending:
+            stored = self._decrypt(self._raw_record(tag))
+
+        password = entry.get('password')
+        current = stored.get('password')
+
+        if password and password != current and self.used_password(password):
+            raise ValueError(
+                'Password of entry "{0}" was used before'.format(
+                    entry['title']
+                    )
+                )
+
+        tag, raw, tokens = seal_entry(
+            self._material,
+            entry,
+            self._codec,
+            self._cipher
+            )
+        self._pending[tag] = (raw, tokens)
+        self._stage_password(tag, password)
+
+    def delete(self: Vault, title: str):
+        """Stage removal of an entry. Raises KeyError if there is no such
+        entry.
+        """
+
+        if title not in self:
+            raise KeyError(title)
+
+        tag = self._tag(title)
+        self._trigrams = None
+
+        # Entry that was never saved needs no tombstone.
+        if self._stored_slot(tag) is None:
+            del self._pending[tag]
+            self._staged_passwords.pop(tag, None)
+        else:
+            self._pending[tag] = None
+
+    def save(self: Vault):
+        """Append staged changes to the vault file.
+
+        Only staged entries are written: changed entries are appended as new
+        records and removed entries as tombstones, while records of untouched
+        entries stay where they are. Index is brought up to date with the
+        written frames in memory, so the cost of saving depends only on the
+        size of the changes. Once enough frames accumulate after the latest
+        checkpoint, a new checkpoint is written as well.
+        """
+
+        if not self._pending and not self._history_changed:
+            return
+
+        # Passwords already in the history, e.g. of entries whose other
+        # fields changed, leave it as it is.
+        if self._staged_passwords:
+            history = self._password_history()
+            for password in self._staged_passwords.values():
+                if history.add(password):
+                    self._history_changed = True
+
+        self._append([
+            (tag, self._version(tag) + 1, pending)
+            for tag, pending in self._pending.items()
+            ])
+        self._pending.clear()
+        self._staged_passwords.clear()
+
+        if self._tail >= CHECKPOINT_INTERVAL:
+            self.checkpoint()
+
+    def _append(self: Vault, changes: list):
+        """Append given changes, and changes of the password history if any,
+        to the vault file as a single group and bring index state up to date
+        with them. History is appended whole only if the vault has none yet. Changes are (tag, version, (raw record, blind index tokens))
+        tuples, or (tag, version, None) for removed entries. Does not write a
+        checkpoint.
+        """
+
+        written = list()
+
+        with self._locked() as vault_file:
+            # Discard any group cut short by an earlier crash.
+            vault_file.truncate(self._end)
+            vault_file.seek(self._end)
+
+            for tag, version, change in changes:
+                if change is None:
+                    self._write_tombstone(vault_file, tag, version)
+                    written.append((tag, None, (), version))
+                else:
+                    slot = self._write_record(
+                        vault_file,
+                        tag,
+                        version,
+                        *change
+                        )
+                    written.append((tag, slot, change[1]))
+
+            if self._history_changed:
+                history_slot = self._write_history(
+                    vault_file,
+                    self._history_at is not None
+                    )
+
+            self._write_commit(
+                vault_file,
+                len(written) + self._history_changed
+                )
+            end = vault_file.tell()
+            vault_file.flush()
+            os.fsync(vault_file.fileno())
+
+        self._remap()
+        self._end = end
+        self._trigrams = None
+
+        for frame in written:
+            self._apply(*frame)
+
+        if self._history_changed:
+            if self._history_at is None:
+                self._apply_history(history_slot)
+            else:
+                self._apply_history_delta(history_slot)
+            self._history.clear_changes()
+            self._history_changed = False
+
+    def _checkpoint(self: Vault, vault_file):
+        """Append checkpoint of the current index to the end of the log of
+        the locked vault file and point the header to it.
+        """
+
+        slots = sorted(
+            (tag, ) + slot for tag, slot in self._stored_slots()
+            )
+
+        vault_file.truncate(self._end)
+        vault_file.seek(self._end)
+        history = self._history_at
+
+        # Checkpoint folds the history deltas into a new history frame.
+        if self._history_deltas:
+            self._password_history()
+            history = self._write_history(vault_file)
+
+        checkpoint = self._write_checkpoint(
+            vault_file,
+            slots,
+            self._current_removed(),
+            self._current_postings(),
+            history
+            )
+        vault_file.flush()
+        os.fsync(vault_file.fileno())
+
+        self._write_header(
+            vault_file,
+            len(slots),
+            checkpoint,
+            history
+            )
+        vault_file.flush()
+        os.fsync(vault_file.fileno())
+
+    def checkpoint(self: Vault):
+        """Save staged changes and write a checkpoint, so that reopening the
+        vault does not have to replay any log frames.
+        """
+
+        self.save()
+
+        if self._tail:
+            with self._locked() as vault_file:
+                self._checkpoint(vault_file)
+
+            self._load()
+
+    def _rewrite(self: Vault, key_slots: list, capacity: int):
+        """Rewrite the vault with given key slots in a table of given capacity
+        and live records only. Vault is written to a temporary file which then
+        atomically replaces the vault file.
+        """
+
+        tmp_path = self._path + '.tmp'
+        old_capacity = self._capacity
+        old_header_size = self._header_size
+
+        with self._locked():
+            self._capacity = capacity
+
+            try:
+                with open(tmp_path, 'wb') as vault_file:
+                    self._write_log(vault_file, key_slots)
+
+            except BaseException:
+                self._capacity = old_capacity
+                self._header_size = old_header_size
+                raise
+
+            self._unmap()
+            os.replace(tmp_path, self._path)
+            fsync_directory(self._path)
+
+        self._load()
+
+    def replace_file(self: Vault, path: str):
+        """Atomically replace the vault file with a complete vault file at
+        given path, e.g. a rekeyed copy of the vault, and close the vault.
+        Raises ValueError if another writer changed the vault file since it
+        was read, in which case the vault file is kept.
+        """
+
+        with self._locked():
+            self._unmap()
+            os.replace(path, self._path)
+            fsync_directory(self._path)
+
+        self.close()
+
+    def compact(self: Vault):
+        """Save staged changes and rewrite the vault with live records only.
+
+        Compacted vault is written to a temporary file which then atomically
+        replaces the vault file, so the vault stays readable and consistent
+        for the whole duration of the compaction.
+        """
+
+        self.save()
+        self._rewrite(self._key_slots(), self._capacity)
+
+    def merge(self: Vault, source: Vault, tags):
+        """Copy stored state of the entries with given tags from another copy
+        of the vault, opened with the same data key, and merge its password
+        history into this one. Records are copied encrypted, together with
+        their blind index tokens and versions; entries removed in the source
+        are removed here as well. Changes are appended as a single group.
+        Raises ValueError if either vault has unsaved changes.
+        """
+
+        if self.modified or source.modified:
+            raise ValueError('Vault has unsaved changes')
+
+        changes = list()
+
+        for tag in tags:
+            slot = source._stored_slot(tag)
+
+            if slot is None:
+                changes.append((tag, source._version(tag), None))
+            else:
+                changes.append((
+                    tag,
+                    source._record_version(slot),
+                    (source._record(slot), source._tokens(slot))
+                    ))
+
+        if source._history_at is not None:
+            theirs = source._password_history()
+
+            if self._history_at is None:
+                self._history = theirs.copy()
+                self._history_changed = True
+
+            else:
+                try:
+                    self._history_changed = \
+                        self._password_history().merge(theirs)
+
+                # Histories started independently on both copies can not be
+                # combined, so this copy keeps its own.
+                except ValueError:
+                    pass
+
+        if not changes and not self._history_changed:
+            return
+
+        self._append(changes)
+
+        if self._tail >= CHECKPOINT_INTERVAL:
+            self.checkpoint()
+
+    @property
+    def members(self: Vault) -> int:
+        """Return number of vault members.
+        """
+
+        return len(self._key_slots())
+
+    def _check_material(self: Vault, material: kc.KeyMaterial) -> bytes:
+        """Return key slot locator for given passphrase key material. Raises
+        ValueError if some member already uses the passphrase.
+        """
+
+        if not isinstance(material, kc.KeyMaterial):
+            raise TypeError(
+                'Trying to pass non \'KeyMaterial\' object as argument '
+                + '\'{0}({1})\''.format(type(material).__name__, material)
+                )
+
+        locator = key_locator(material, self._salt)
+
+        if self._find_key_slot(locator) is not None:
+            raise ValueError('Passphrase is already used by a vault member')
+
+        return locator
+
+    def add_member(self: Vault, name: str, material: kc.KeyMaterial):
+        """Give new member access to the vault by wrapping the data key with
+        the member's passphrase key material. Writes a single key slot, unless
+        the key slot table has to grow. Raises ValueError if member with given
+        name exists or if the passphrase is already used by another member.
+
+        Args:
+            name (str): member name.
+            material (KeyMaterial): key material of the member's passphrase.
+        """
+
+        member = member_tag(self._salt, name)
+        locator = self._check_material(material)
+
+        if any(key_slot[1] == member for key_slot in self._key_slots()):
+            raise ValueError('Member "{0}" already exists'.format(name))
+
+        self._reserve_key_slot()
+
+        with self._locked() as vault_file:
+            self._write_key_slot(
+                vault_file,
+                self._free_key_slot(locator),
+                (locator, member, wrap_key(material, self._material.key))
+                )
+
+    def remove_member(self: Vault, name: str):
+        """Remove member's access to the vault. Writes a single key slot.
+        Raises KeyError if there is no member with given name and ValueError
+        if it is the last member of the vault.
+
+        Args:
+            name (str): member name.
+        """
+
+        member = member_tag(self._salt, name)
+
+        with self._locked() as vault_file:
+            for position in range(self._capacity):
+                locator, found, _ = self._key_slot(position)
+                if locator not in (_EMPTY, _REMOVED) and found == member:
+                    break
+            else:
+                raise KeyError(name)
+
+            if self.members == 1:
+                raise ValueError(
+                    'Can not remove the last member of the vault'
+                    )
+
+            self._write_key_slot(
+                vault_file,
+                position,
+                (_REMOVED, _EMPTY, bytes(WRAPPED_KEY_SIZE))
+                )
+
+    def change_passphrase(self: Vault, material: kc.KeyMaterial):
+        """Wrap the data key with key material derived from the new
+        passphrase. Key slot for the new passphrase is written before the
+        old one is removed, so a crash leaves the vault accessible with
+        either old or new passphrase.
+
+        Args:
+            material (KeyMaterial): key material of the new passphrase.
+        """
+
+        locator = self._check_material(material)
+        self._reserve_key_slot()
+
+        with self._locked() as vault_file:
+            old = self._find_key_slot(
+                key_locator(self._passphrase_material, self._salt)
+                )
+
+            if old is None:
+                raise ValueError('Vault member was removed')
+
+            self._write_key_slot(
+                vault_file,
+                self._free_key_slot(locator),
+                (locator, self._member, wrap_key(material, self._material.key))
+                )
+            self._write_key_slot(
+                vault_file,
+                old,
+                (_REMOVED, _EMPTY, bytes(WRAPPED_KEY_SIZE))
+                )
+
+        self._passphrase_material = material
+
+    def close(self: Vault):
+        """Close the vault file and wipe the data key. Unsaved changes are
+        discarded.
+        """
+
+        self._unmap()
+        self._pending.clear()
+        self._trigrams = None
+        self._history = None
+        self._history_changed = False
+        self._staged_passwords.clear()
+
+        if self._material is not None:
+            self._material.wipe()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""vault_ciphers.py - Encryption of vault records.
+
+Vault records are encrypted with the data key using one of three ciphers,
+selected when the vault is created and named in its preamble:
+
+    fernet              Fernet token (AES-128-CBC and HMAC-SHA256) stored
+                        without its base64 encoding: version (1 byte) |
+                        timestamp (8 bytes) | IV (16 bytes) | ciphertext |
+                        HMAC (32 bytes).
+    aes-gcm             AES-256-GCM: nonce (12 bytes) | ciphertext | tag
+                        (16 bytes).
+    chacha20-poly1305   ChaCha20-Poly1305, laid out as AES-GCM.
+
+AEAD ciphers authenticate and encrypt in a single pass and add 28 bytes to a
+record instead of 57 to 72, so they are several times faster than Fernet on
+records of a few hundred bytes. AES-GCM is the fastest on processors with
+AES instructions, ChaCha20-Poly1305 on those without. Every record gets a
+random 96 bit nonce, which is safe for far more records than any vault will
+ever write under one data key. AEAD keys are subkeys of the data key, so the
+same data key serves any cipher. Use 'python3 benchmarks.py ciphers' to
+compare ciphers on records of a given size.
+
+Example:
+    >>> decrypt(material, 'aes-gcm', encrypt(material, 'aes-gcm', b'data'))
+    b'data'
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * vault_ciphers.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import (
+    AESGCM,
+    ChaCha20Poly1305
+    )
+import base64 as b64
+import os
+import key_cache as kc
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+# Cipher names mapped to the ids stored in the vault file.
+CIPHERS = {
+    'fernet': 0,
+    'aes-gcm': 1,
+    'chacha20-poly1305': 2,
+    }
+DEFAULT_CIPHER = 'aes-gcm'
+
+NONCE_SIZE = 12
+TAG_SIZE = 16
+
+# AEAD classes and labels of their subkeys of the data key.
+_AEADS = {
+    'aes-gcm': (AESGCM, b'vault-record-aes-gcm'),
+    'chacha20-poly1305': (ChaCha20Poly1305, b'vault-record-chacha20-poly1305'),
+    }
+
+
+# ==============================================================================
+# Functions Section
+# ==============================================================================
+
+def cipher_name(cipher_id: int) -> str:
+    """Returns name of the cipher with given id. Raises ValueError if there
+    is no such cipher.
+    """
+
+    for name, number in CIPHERS.items():
+        if number == cipher_id:
+            return name
+
+    raise ValueError('Unsupported record cipher {0}'.format(cipher_id))
+
+def _aead(material: kc.KeyMaterial, cipher: str):
+    """Returns AEAD object of given cipher keyed with the data key.
+    """
+
+    if cipher not in _AEADS:
+        raise ValueError('Unsupported record cipher {0}'.format(cipher))
+
+    return material.aead(*_AEADS[cipher])
+
+def encrypt(material: kc.KeyMaterial, cipher: str, plain: bytes) -> bytes:
+    """Returns raw record of plain data encrypted with given cipher.
+
+    Args:
+        material (KeyMaterial): vault key material.
+        cipher (str): cipher name, one of CIPHERS.
+        plain (bytes): data to be encrypted.
+
+    Returns:
+        bytes: raw encrypted record.
+    """
+
+    if cipher == 'fernet':
+        return b64.urlsafe_b64decode(material.fernet.encrypt(plain))
+
+    nonce = os.urandom(NONCE_SIZE)
+
+    return nonce + _aead(material, cipher).encrypt(nonce, plain, None)
+
+def decrypt(material: kc.KeyMaterial, cipher: str, raw) -> bytes:
+    """Returns plain data of the raw record encrypted with given cipher.
+    Raises ValueError if record can not be decrypted with given key material.
+
+    Args:
+        material (KeyMaterial): vault key material.
+        cipher (str): cipher name, one of CIPHERS.
+        raw: raw record as any bytes-like object.
+
+    Returns:
+        bytes: decrypted data.
+    """
+
+    try:
+        if cipher == 'fernet':
+            return material.fernet.decrypt(b64.urlsafe_b64encode(raw))
+
+        aead = _aead(material, cipher)
+
+        if len(raw) < NONCE_SIZE + TAG_SIZE:
+            raise InvalidTag()
+
+        return aead.decrypt(raw[:NONCE_SIZE], raw[NONCE_SIZE:], None)
+
+    except (InvalidToken, InvalidTag):
+        raise ValueError(
+            'Invalid passphrase or corrupted vault record'
+            ) from None
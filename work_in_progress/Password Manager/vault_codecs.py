@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""vault_codecs.py - Compression of vault records before encryption.
+
+Every record of the vault is compressed before it is encrypted, since
+ciphertext does not compress. Encoded record starts with the id of the codec
+it was compressed with, so records written with different codecs can live in
+the same vault and are always decoded correctly; the codec of a vault only
+selects how new records are written. Record that does not get smaller is
+stored uncompressed.
+
+Codecs produce raw streams (deflate without zlib header and checksum, LZMA2
+without the xz container), since records are authenticated by encryption
+anyway and container overhead would eat most of the gain on records of a few
+hundred bytes. Use 'python3 benchmarks.py codecs' to compare codecs on
+records of a given size. On vault entries zlib compresses about as well as
+lzma at a fraction of its cost, so it is the default.
+
+Compression makes the length of a record depend on its content. Records are
+padded to whole cipher blocks and hold a single entry each, so this reveals
+little, but it is a tradeoff to be aware of.
+
+Example:
+    >>> decode(encode('zlib', b'{"title":"github"}'))
+    b'{"title":"github"}'
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * vault_codecs.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+import lzma
+import zlib
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+# Codec names mapped to the ids stored in the vault file.
+CODECS = {
+    'none': 0,
+    'zlib': 1,
+    'lzma': 2,
+    }
+DEFAULT_CODEC = 'zlib'
+
+ZLIB_LEVEL = 6
+LZMA_PRESET = 6
+
+# Records are small, so a small dictionary loses nothing, while the default
+# one of the preset (8 MiB) takes longer to set up than to compress a record.
+# Raw LZMA2 streams do not record it, so it is part of the file format.
+LZMA_DICT_SIZE = 1 << 16
+
+_WBITS = -zlib.MAX_WBITS
+_LZMA_FILTERS = [{
+    'id': lzma.FILTER_LZMA2,
+    'preset': LZMA_PRESET,
+    'dict_size': LZMA_DICT_SIZE
+    }]
+
+
+# ==============================================================================
+# Functions Section
+# ==============================================================================
+
+def codec_name(codec_id: int) -> str:
+    """Returns name of the codec with given id. Raises ValueError if there is
+    no such codec.
+    """
+
+    for name, number in CODECS.items():
+        if number == codec_id:
+            return name
+
+    raise ValueError('Unsupported record codec {0}'.format(codec_id))
+
+def _compress(codec_id: int, data: bytes) -> bytes:
+    """Returns data compressed with the codec of given id.
+    """
+
+    if codec_id == CODECS['zlib']:
+        compressor = zlib.compressobj(ZLIB_LEVEL, zlib.DEFLATED, _WBITS)
+        return compressor.compress(data) + compressor.flush()
+
+    if codec_id == CODECS['lzma']:
+        return lzma.compress(
+            data,
+            format=lzma.FORMAT_RAW,
+            filters=_LZMA_FILTERS
+            )
+
+    return data
+
+def encode(codec: str, data: bytes) -> bytes:
+    """Returns record data compressed with given codec and prefixed with the
+    codec id. Data that does not get smaller is stored uncompressed.
+
+    Args:
+        codec (str): codec name, one of CODECS.
+        data (bytes): record data.
+
+    Returns:
+        bytes: encoded record.
+    """
+
+    if codec not in CODECS:
+        raise ValueError('Unsupported record codec {0}'.format(codec))
+
+    codec_id = CODECS[codec]
+    compressed = _compress(codec_id, data)
+
+    if len(compressed) >= len(data):
+        codec_id, compressed = CODECS['none'], data
+
+    return bytes((codec_id, )) + compressed
+
+def decode(data) -> bytes:
+    """Returns record data of the record encoded with encode(). Raises
+    ValueError if record is malformed.
+
+    Args:
+        data: encoded record as any bytes-like object.
+
+    Returns:
+        bytes: record data.
+    """
+
+    if not data:
+        raise ValueError('Vault record is corrupted')
+
+    codec_id = data[0]
+    payload = data[1:]
+
+    try:
+        if codec_id == CODECS['none']:
+            return bytes(payload)
+
+        if codec_id == CODECS['zlib']:
+            return zlib.decompress(payload, _WBITS)
+
+        if codec_id == CODECS['lzma']:
+            return lzma.decompress(
+                payload,
+                format=lzma.FORMAT_RAW,
+                filters=_LZMA_FILTERS
+                )
+
+    except (zlib.error, lzma.LZMAError):
+        raise ValueError('Vault record is corrupted') from None
+
+    raise ValueError('Unsupported record codec {0}'.format(codec_id))
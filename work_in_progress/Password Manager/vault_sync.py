@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""vault_sync.py - Merkle tree synchronization of two copies of a vault.
+
+Copies of the same vault (files sharing the data key, e.g. .bkp copies kept on
+several machines) are compared through Merkle trees built over the stored
+state of their entries. Every entry, live or removed, contributes a leaf of
+its tag, version and the MAC of its record frame (see
+Vault.sync_leaves()), so trees are built from the vault files alone, without
+decrypting any record. Leaves are split into buckets by the leading bits of
+their tags, FANOUT_BITS bits per tree level, and every node hashes the digests
+of its non-empty children.
+
+Identical copies are recognized by their sync digests alone (see
+Vault.sync_digest), which every vault keeps up to date as it changes, so
+comparing them neither reads nor hashes a single record. Otherwise trees of
+both copies are built and comparison descends from the roots only into
+subtrees whose digests differ, so copies differing in a few entries cost a few
+paths from the root to the differing buckets. Only entries of differing
+buckets are compared one by one.
+
+Every entry carries a version counter, one more than the version it replaced,
+so the copy holding the higher version of a differing entry wins, whether the
+entry was changed or removed there. Entries changed independently on both
+copies since their last sync have the same version on both; such conflicts are
+resolved in favour of the record with the larger MAC, which both copies agree
+on, and are counted in the sync report. Winning records are copied encrypted
+to the other copy, which therefore never has to encrypt anything either.
+Password histories of both copies are merged as well.
+
+Example:
+    >>> with Vault.open('laptop.bkp', m) as first, \
+    >>>         Vault.open('desktop.bkp', m) as second:
+    >>>     report = sync(first, second)
+    >>>     report.to_first, report.to_second, report.conflicts
+    (3, 1, 0)
+"""
+
+# ==============================================================================
+#
+# Copyright (C) 2026 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# This file is part of Password Manager.
+#
+# Password Manager is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by the Free
+# Software Foundation, either version 3 of the License, or (at your option) any
+# later version.
+#
+# Password Manager is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# Foobar. If not, see <https://www.gnu.org/licenses/>.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+#
+# 2026-10-18 Ljubomir Kurij <ljubomir_kurij@protonmail.com>
+#
+# * vault_sync.py: created.
+#
+# ==============================================================================
+
+
+# ==============================================================================
+# Modules Import Section
+# ==============================================================================
+
+from __future__ import annotations
+import hashlib as hl
+import hmac
+import vault as vt
+
+
+# ==============================================================================
+# Constants Section
+# ==============================================================================
+
+FANOUT_BITS = 4
+MAX_DEPTH = 6
+DIGEST_SIZE = 32
+
+# Leaf values start with the entry version (uint32).
+VERSION_SIZE = 4
+
+# Tree gets deeper until buckets hold about this many leaves on average.
+BUCKET_SIZE = 4
+
+_PREFIX_BITS = 32
+
+
+# ==============================================================================
+# Classes Section
+# ==============================================================================
+
+class MerkleTree():
+    """Merkle tree over sorted (tag, value) leaves.
+
+    Tree of given depth has 2 ** (FANOUT_BITS * depth) buckets. Only
+    non-empty nodes are stored, so an empty node has no digest (None).
+    """
+
+    def __init__(self: MerkleTree, leaves: list, depth: int):
+        if not 0 < depth <= MAX_DEPTH:
+            raise ValueError('Invalid Merkle tree depth')
+
+        self._depth = depth
+        self._buckets = dict()
+        shift = _PREFIX_BITS - FANOUT_BITS * depth
+
+        for tag, value in leaves:
+            self._buckets.setdefault(
+                int.from_bytes(tag[:_PREFIX_BITS // 8], 'big') >> shift,
+                list()
+                ).append((tag, value))
+
+        level = {
+            number: hl.blake2b(
+                b''.join(tag + value for tag, value in bucket),
+                digest_size=DIGEST_SIZE
+                ).digest()
+            for number, bucket in self._buckets.items()
+            }
+        self._levels = [level]
+
+        for _ in range(depth):
+            children = dict()
+
+            for number in sorted(level):
+                children.setdefault(number >> FANOUT_BITS, list()).append(
+                    bytes((number & ((1 << FANOUT_BITS) - 1), ))
+                    + level[number]
+                    )
+
+            level = {
+                number: hl.blake2b(
+                    b''.join(digests),
+                    digest_size=DIGEST_SIZE
+                    ).digest()
+                for number, digests in children.items()
+                }
+            self._levels.insert(0, level)
+
+    @property
+    def depth(self: MerkleTree) -> int:
+        """Return depth of the tree.
+        """
+
+        return self._depth
+
+    @property
+    def root(self: MerkleTree) -> bytes:
+        """Return root digest, or None for a tree without leaves.
+        """
+
+        return self._levels[0].get(0)
+
+    def bucket(self: MerkleTree, number: int) -> dict:
+        """Return mapping of tags to values of the leaves in given bucket.
+        """
+
+        return dict(self._buckets.get(number, ()))
+
+    def diff(self: MerkleTree, other: MerkleTree) -> list:
+        """Return sorted numbers of the buckets whose digests differ from the
+        other tree of the same depth. Only subtrees with differing digests are
+        visited.
+        """
+
+        if self._depth != other._depth:
+            raise ValueError('Merkle trees differ in depth')
+
+        differing = list()
+        stack = [(0, 0)]
+
+        while stack:
+            level, number = stack.pop()
+
+            if self._levels[level].get(number) \
+                    == other._levels[level].get(number):
+                continue
+
+            if level == self._depth:
+                differing.append(number)
+                continue
+
+            first = number << FANOUT_BITS
+            stack.extend(
+                (level + 1, child)
+                for child in range(first, first + (1 << FANOUT_BITS))
+                )
+
+        return sorted(differing)
+
+
+class SyncReport():
+    """Outcome of a vault sync.
+
+    Holds numbers of entries copied to the first and to the second vault, and
+    number of conflicting entries, changed on both copies since their last
+    sync.
+    """
+
+    def __init__(self: SyncReport):
+        self.to_first = 0
+        self.to_second = 0
+        self.conflicts = 0
+
+
+# ==============================================================================
+# Functions Section
+# ==============================================================================
+
+def tree_depth(count: int) -> int:
+    """Returns depth of the Merkle tree for given number of leaves.
+    """
+
+    depth = 1
+
+    while depth < MAX_DEPTH \
+            and count > BUCKET_SIZE << (FANOUT_BITS * depth):
+        depth += 1
+
+    return depth
+
+def sync(first: vt.Vault, second: vt.Vault) -> SyncReport:
+    """Bring two copies of the vault to the same state. Entries differing
+    between the copies are copied to the copy holding the older version.
+
+    Args:
+        first (Vault): first copy of the vault.
+        second (Vault): second copy of the vault, opened with the same data
+            key.
+
+    Returns:
+        SyncReport: numbers of copied and conflicting entries.
+
+    Raises:
+        ValueError: if the vaults do not share the data key or have unsaved
+            changes.
+    """
+
+    if not hmac.compare_digest(first.material.key, second.material.key):
+        raise ValueError('Vaults do not share the data key')
+
+    if first.modified or second.modified:
+        raise ValueError('Vault has unsaved changes')
+
+    report = SyncReport()
+
+    if first.sync_digest == second.sync_digest:
+        return report
+
+    first_leaves = first.sync_leaves()
+    second_leaves = second.sync_leaves()
+    depth = tree_depth(max(len(first_leaves), len(second_leaves)))
+    first_tree = MerkleTree(first_leaves, depth)
+    second_tree = MerkleTree(second_leaves, depth)
+
+    if first_tree.root == second_tree.root:
+        return report
+
+    to_first, to_second = list(), list()
+
+    for number in first_tree.diff(second_tree):
+        mine = first_tree.bucket(number)
+        theirs = second_tree.bucket(number)
+
+        for tag in sorted(mine.keys() | theirs.keys()):
+            value, other = mine.get(tag), theirs.get(tag)
+
+            if value == other:
+                continue
+
+            if value is not None and other is not None \
+                    and value[:VERSION_SIZE] == other[:VERSION_SIZE]:
+                report.conflicts += 1
+
+            # Value starts with the big endian version, so the higher version
+            # wins and equal versions are decided by the MAC.
+            if other is None or (value is not None and value > other):
+                to_second.append(tag)
+            else:
+                to_first.append(tag)
+
+    first.merge(second, to_first)
+    second.merge(first, to_second)
+    report.to_first = len(to_first)
+    report.to_second = len(to_second)
+
+    return report